@@ -93,34 +93,84 @@ const MainApp = () => {
     }
   };
 
+  // Reads a text/event-stream response, calling onEvent(event, data) per event
+  const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = "message";
+        let data = "";
+        frame.split("\n").forEach((line) => {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) data += line.slice(5).trim();
+        });
+        if (data) onEvent(event, JSON.parse(data));
+      }
+    }
+  };
+
   const sendMessage = (message) => {
     if (message.trim() !== "") {
-      // 1) Add user message to chat
-      setMessages([...messages, { text: message, sender: "user" }]);
-  
-      // 2) Call the backend
-      fetch("http://localhost:8000/chat", {
+      // 1) Add user message to chat, plus the bot reply the stream fills in
+      const replyId = `${Date.now()}-${Math.random()}`;
+      setMessages([
+        ...messages,
+        { text: message, sender: "user" },
+        { id: replyId, text: "", sender: "bot", streaming: true, stage: null },
+      ]);
+
+      // Applies a change to this request's bot message
+      const updateReply = (update) => {
+        setMessages((prev) => prev.map((msg) => (
+          msg.id === replyId ? { ...msg, ...update(msg) } : msg
+        )));
+      };
+
+      // 2) Call the backend; stage events and reply text arrive as they happen
+      fetch("http://localhost:8000/chat/stream", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
         },
         body: JSON.stringify({ message: message }),
       })
-        .then((res) => res.json())
-        .then((data) => {
-          // No need to add artificial delay since we now have typing animation
-          // Add the bot message to the messages array
-          setMessages((prev) => [
-            ...prev,
-            { text: data.reply, sender: "bot" },
-          ]);
+        .then((res) => {
+          if (!res.ok) throw new Error(`HTTP ${res.status}`);
+          return readEventStream(res, (event, data) => {
+            if (event === "stage") {
+              // After a reset the server streams the reply again from the start
+              updateReply(() => (data.stage === "reset" ? { stage: data.stage, text: "" } : { stage: data.stage }));
+            } else if (event === "delta") {
+              updateReply((msg) => ({ text: msg.text + data.text }));
+            } else if (event === "done") {
+              // The final reply replaces the streamed preview
+              updateReply(() => ({ text: data.reply, streaming: false }));
+            } else if (event === "error") {
+              throw new Error(data.detail);
+            }
+          });
+        })
+        .then(() => {
+          // The connection closed without a done event
+          updateReply((msg) => (msg.streaming ? {
+            text: msg.text || "Oops, something went wrong with the AI service.",
+            streaming: false,
+          } : {}));
         })
         .catch((error) => {
           console.error("Error calling AI endpoint:", error);
-          setMessages((prev) => [
-            ...prev,
-            { text: "Oops, something went wrong with the AI service.", sender: "bot" },
-          ]);
+          updateReply(() => ({
+            text: "Oops, something went wrong with the AI service.",
+            streaming: false,
+          }));
         });
     }
   };
@@ -15,7 +15,6 @@ import {
 
 const Analytics = () => {
   const [hubspotData, setHubspotData] = useState({ top: [], bottom: [] });
-  const [emailsData, setEmailsData] = useState("");
   const [loadingHubspot, setLoadingHubspot] = useState(false);
   const [loadingEmails, setLoadingEmails] = useState(false);
   const [activeTab, setActiveTab] = useState("hubspot");
@@ -29,48 +28,29 @@ const Analytics = () => {
     setLoadingHubspot(true);
     setRefreshing({...refreshing, hubspot: true});
     try {
-      const response = await fetch("http://localhost:8000/chat", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ message: "retrieve hubspot contacts" }),
+      // Newest and oldest five, as typed JSON straight from HubSpot
+      const fetchContacts = async (order) => {
+        const params = new URLSearchParams({ limit: 5, order, fields: "firstname,lastname,email" });
+        const response = await fetch(`http://localhost:8000/api/contacts/recent?${params}`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        // HubSpot leaves missing properties null; the tables and modal expect strings
+        return (await response.json()).contacts.map((contact) => ({
+          firstname: contact.firstname || "",
+          lastname: contact.lastname || "",
+          email: contact.email || "",
+        }));
+      };
+      const [topContacts, bottomContacts] = await Promise.all([
+        fetchContacts("newest"),
+        fetchContacts("oldest"),
+      ]);
+
+      setHubspotData({
+        top: topContacts,
+        bottom: bottomContacts
       });
-      
-      const data = await response.json();
-      if (data.reply) {
-        // Parse the text response to extract the contact data
-        const topMatches = data.reply.match(/📋 \*\*Top 5 Newest Contacts:\*\*\n((?:👤 .*\n?)*)/);
-        const bottomMatches = data.reply.match(/📁 \*\*Bottom 5 Oldest Contacts:\*\*\n((?:👤 .*\n?)*)/);
-        
-        const parseContacts = (text) => {
-          if (!text) return [];
-          return text.split('\n')
-            .filter(line => line.trim().startsWith('👤'))
-            .map(line => {
-              const match = line.match(/👤 (.*) (.*) - (.*)/);
-              if (match) {
-                return {
-                  firstname: match[1],
-                  lastname: match[2],
-                  email: match[3]
-                };
-              }
-              return null;
-            })
-            .filter(contact => contact !== null);
-        };
-        
-        const topContacts = topMatches ? parseContacts(topMatches[1]) : [];
-        const bottomContacts = bottomMatches ? parseContacts(bottomMatches[1]) : [];
-        
-        setHubspotData({
-          top: topContacts,
-          bottom: bottomContacts
-        });
-        
-        setLastRefreshed({...lastRefreshed, hubspot: new Date()});
-      }
+
+      setLastRefreshed({...lastRefreshed, hubspot: new Date()});
     } catch (error) {
       console.error("Error fetching HubSpot data:", error);
     } finally {
@@ -83,65 +63,14 @@ const Analytics = () => {
     setLoadingEmails(true);
     setRefreshing({...refreshing, emails: true});
     try {
-      // Add a timestamp to ensure we're getting fresh data each time
-      const timestamp = new Date().getTime();
-      const response = await fetch("http://localhost:8000/chat", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ 
-          message: `get my latest emails timestamp=${timestamp}`,
-          dialog_context: { force_refresh: true }
-        }),
-      });
-      
+      // Headers and Gmail's snippet only: no GPT summaries on the dashboard
+      const params = new URLSearchParams({ limit: 5, fields: "id,subject,from,date,snippet" });
+      const response = await fetch(`http://localhost:8000/api/emails/recent?${params}`);
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
       const data = await response.json();
-      if (data.reply) {
-        setEmailsData(data.reply);
-        
-        // Improved regex pattern to better handle multiline content
-        const emailRegex = /Email #\d+\s*\nSubject:\s*(.*?)\s*\nFrom:\s*(.*?)\s*\nDate:\s*(.*?)\s*\nSummary:\s*(.*?)\s*\n-{5,}/gs;
-        const emails = [];
-        let match;
-        
-        while ((match = emailRegex.exec(data.reply)) !== null) {
-          if (match.length >= 5) {
-            emails.push({
-              subject: match[1].trim(),
-              from: match[2].trim(),
-              date: match[3].trim(),
-              summary: match[4].trim()
-            });
-          }
-        }
-        
-        // If no emails were parsed but we have a reply, try a fallback method
-        if (emails.length === 0 && data.reply.includes("Email #")) {
-          console.log("Using fallback email parsing method");
-          const emailBlocks = data.reply.split("Email #").filter(block => block.trim().length > 0);
-          
-          for (const block of emailBlocks) {
-            const subjectMatch = block.match(/Subject:\s*(.*?)\s*\n/);
-            const fromMatch = block.match(/From:\s*(.*?)\s*\n/);
-            const dateMatch = block.match(/Date:\s*(.*?)\s*\n/);
-            const summaryMatch = block.match(/Summary:\s*(.*?)(?:\n-{5,}|\n\n|$)/s);
-            
-            if (subjectMatch && fromMatch && dateMatch && summaryMatch) {
-              emails.push({
-                subject: subjectMatch[1].trim(),
-                from: fromMatch[1].trim(),
-                date: dateMatch[1].trim(),
-                summary: summaryMatch[1].trim()
-              });
-            }
-          }
-        }
-        
-        console.log(`Parsed ${emails.length} emails from response`);
-        setParsedEmails(emails);
-        setLastRefreshed({...lastRefreshed, emails: new Date()});
-      }
+      setParsedEmails(data.emails);
+      setLastRefreshed({...lastRefreshed, emails: new Date()});
     } catch (error) {
       console.error("Error fetching email data:", error);
     } finally {
@@ -482,9 +411,9 @@ const Analytics = () => {
                       <span className="detail-value">{modalContent.data.date}</span>
                     </div>
                     <div className="detail-row full">
-                      <span className="detail-label">Summary:</span>
+                      <span className="detail-label">{modalContent.data.summary ? "Summary:" : "Preview:"}</span>
                       <div className="summary-box">
-                        {modalContent.data.summary}
+                        {modalContent.data.summary || modalContent.data.snippet}
                       </div>
                     </div>
                     <div className="detail-actions">
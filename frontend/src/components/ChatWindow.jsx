@@ -3,6 +3,14 @@ import { motion, AnimatePresence } from "framer-motion";
 import ChatMessage from "./ChatMessage";
 import { FaRobot } from "react-icons/fa";
 
+// Shown for a streamed reply before (and under) its text
+const STAGE_LABELS = {
+  classified: "Working on it...",
+  parsed: "Got the details...",
+  sending: "Sending...",
+  reset: "Redrafting...",
+};
+
 const ChatWindow = ({ messages }) => {
   const messagesEndRef = useRef(null);
   const [showWelcome, setShowWelcome] = useState(true);
@@ -11,6 +19,8 @@ const ChatWindow = ({ messages }) => {
   const [currentIndex, setCurrentIndex] = useState(0);
   const [currentMessage, setCurrentMessage] = useState("");
   const [displayedMessages, setDisplayedMessages] = useState([]);
+  // Bot reply that is still arriving from /chat/stream
+  const [streamingMessage, setStreamingMessage] = useState(null);
 
   // Function to scroll to the bottom
   const scrollToBottom = () => {
@@ -37,7 +47,16 @@ const ChatWindow = ({ messages }) => {
       // Check if there's a new bot message that needs to be animated
       const lastMessage = messages[messages.length - 1];
       
-      if (lastMessage.sender === "bot" && 
+      if (lastMessage.sender === "bot" && lastMessage.streaming !== undefined) {
+        // Streamed replies render live as they arrive, without the typing animation
+        if (lastMessage.streaming) {
+          setStreamingMessage(lastMessage);
+          setDisplayedMessages(messages.slice(0, messages.length - 1));
+        } else {
+          setStreamingMessage(null);
+          setDisplayedMessages(messages);
+        }
+      } else if (lastMessage.sender === "bot" && 
           (!displayedMessages.length || 
            displayedMessages[displayedMessages.length - 1]?.text !== lastMessage.text)) {
         // We have a new bot message to animate
@@ -90,7 +109,7 @@ const ChatWindow = ({ messages }) => {
   // Scroll to bottom whenever displayed messages or typing text changes
   useEffect(() => {
     scrollToBottom();
-  }, [displayedMessages, typingText]);
+  }, [displayedMessages, typingText, streamingMessage]);
 
   // Group messages by sender for better visual representation
   const getGroupedMessages = () => {
@@ -134,7 +153,7 @@ const ChatWindow = ({ messages }) => {
           <div>
             <h2 className="chat-header-title">WorkflowX Assistant</h2>
             <p className="chat-header-status">
-              {isTyping ? "Typing..." : "Online"}
+              {isTyping || streamingMessage ? "Typing..." : "Online"}
             </p>
           </div>
         </div>
@@ -199,6 +218,26 @@ const ChatWindow = ({ messages }) => {
           </div>
         )}
         
+        {/* Show the streamed reply as it arrives */}
+        {streamingMessage && (
+          <div className="message-group bot-group">
+            <div className="chat-message bot">
+              <div className="message-avatar bot-avatar">
+                <FaRobot />
+              </div>
+              <div className="message-content">
+                <p>
+                  {streamingMessage.text || STAGE_LABELS[streamingMessage.stage] || "Thinking..."}
+                  <span className="typing-cursor">|</span>
+                </p>
+                {streamingMessage.text && STAGE_LABELS[streamingMessage.stage] && (
+                  <span className="message-timestamp">{STAGE_LABELS[streamingMessage.stage]}</span>
+                )}
+              </div>
+            </div>
+          </div>
+        )}
+        
         {/* Invisible div to ensure scrolling happens correctly */}
         <div ref={messagesEndRef} />
       </div>
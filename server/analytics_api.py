@@ -0,0 +1,118 @@
+# server/analytics_api.py
+"""
+JSON data endpoints for the Analytics dashboard, under /api.
+
+These read straight from the HubSpot and Gmail integrations: no text
+normalization, intent classification or reply formatting, and no GPT unless
+email summaries are explicitly asked for. Every list endpoint takes:
+  limit    page size
+  cursor   the next_cursor of the previous page
+  fields   comma-separated fields to return (default: all but the costly ones)
+"""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from bulkheads import BulkheadFull
+from gmail.gmail_integration import async_list_recent_emails
+from hubspot_integration import async_list_recent_hubspot_contacts
+
+router = APIRouter(prefix="/api", tags=["analytics"])
+
+CONTACT_FIELDS = ["id", "firstname", "lastname", "email", "createdAt"]
+# HubSpot properties behind the contact fields (id and createdAt always come back)
+CONTACT_PROPERTIES = {"firstname", "lastname", "email"}
+EMAIL_FIELDS = ["id", "thread_id", "from", "date", "subject", "snippet"]
+# Opt-in only: a GPT call per email
+EMAIL_EXTRA_FIELDS = ["summary"]
+
+
+class Contact(BaseModel):
+    id: Optional[str] = None
+    firstname: Optional[str] = None
+    lastname: Optional[str] = None
+    email: Optional[str] = None
+    createdAt: Optional[str] = None
+
+class ContactsPage(BaseModel):
+    contacts: List[Contact]
+    next_cursor: Optional[str] = None
+
+class Email(BaseModel):
+    id: Optional[str] = None
+    thread_id: Optional[str] = None
+    from_: Optional[str] = Field(default=None, alias="from")
+    date: Optional[str] = None
+    subject: Optional[str] = None
+    snippet: Optional[str] = None
+    summary: Optional[str] = None
+
+class EmailsPage(BaseModel):
+    emails: List[Email]
+    next_cursor: Optional[str] = None
+
+
+def _select_fields(fields, allowed, default):
+    """The requested field list, or an error message naming the unknown ones."""
+    if not fields:
+        return default, None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in allowed]
+    if unknown:
+        return None, f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed)}"
+    return selected, None
+
+
+@router.get("/contacts/recent", response_model=ContactsPage, response_model_exclude_unset=True)
+async def recent_contacts(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    order: Literal["newest", "oldest"] = "newest",
+):
+    """HubSpot contacts by creation date, newest first (or oldest first with order=oldest)."""
+    selected, error = _select_fields(fields, CONTACT_FIELDS, CONTACT_FIELDS)
+    if error:
+        return JSONResponse(status_code=400, content={"error": error})
+
+    page = await async_list_recent_hubspot_contacts(
+        limit=limit,
+        after=cursor,
+        properties=[field for field in selected if field in CONTACT_PROPERTIES],
+        newest_first=order == "newest",
+    )
+    if page is None:
+        return JSONResponse(status_code=502, content={"error": "HubSpot request failed"})
+    contacts = [Contact(**{field: contact.get(field) for field in selected}) for contact in page["results"]]
+    return ContactsPage(contacts=contacts, next_cursor=page["after"])
+
+
+@router.get("/emails/recent", response_model=EmailsPage, response_model_exclude_unset=True)
+async def recent_emails(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sender: Optional[str] = None,
+):
+    """Latest Inbox emails. Add summary to `fields` for GPT summaries (slower: one call per email)."""
+    selected, error = _select_fields(fields, EMAIL_FIELDS + EMAIL_EXTRA_FIELDS, EMAIL_FIELDS)
+    if error:
+        return JSONResponse(status_code=400, content={"error": error})
+
+    try:
+        page = await async_list_recent_emails(
+            max_results=limit,
+            page_token=cursor,
+            sender_filter=sender,
+            summarize="summary" in selected,
+        )
+    except BulkheadFull:
+        raise  # answered with 429/503 by main's handler
+    except Exception as e:
+        print(f"Gmail list error: {e}")
+        return JSONResponse(status_code=502, content={"error": "Gmail request failed"})
+    emails = [Email(**{field: email.get(field) for field in selected}) for email in page["emails"]]
+    return EmailsPage(emails=emails, next_cursor=page["next_page_token"])
@@ -49,6 +49,10 @@ async def get_user_manager(user_db=Depends(lambda: user_db)):
 # 5. FastAPIUsers instance
 fastapi_users = FastAPIUsers[User, str](get_user_manager, [auth_backend])
 
+# Dependencies for protected routes: a valid bearer token for an active user (or superuser, for /admin)
+current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
 
 # 6. Routes
 router = APIRouter()
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the WorkflowX server.
+Run them from the server/ directory, e.g. `python -m benchmarks.startup`.
+"""
@@ -0,0 +1,254 @@
+"""
+Bulkhead behaviour and backend isolation.
+
+1. Semantics, on a small Bulkhead (limit 2, queue 1), from threads and from
+   the event loop:
+     - calls beyond the limit wait and are served in arrival order;
+     - a call that finds the queue full fails at once with 429;
+     - a call that waits past max_wait_ms fails with 503;
+     - a waiter cancelled while queued doesn't leak its slot.
+2. HTTP: with HubSpot's bulkhead saturated, /chat answers a CRM request with
+   429 and Retry-After, /chat/stream ends with an error event carrying the
+   status, and a general-chat request still succeeds.
+3. Isolation: a flood of slow Gmail retrievals (--gmail-ms each) runs while
+   Calendar inserts (--calendar-ms each) are timed. With bulkheads the flood
+   beyond Gmail's limit and queue is shed, and Calendar latency stays at its
+   own cost. The same run in a subprocess with the bulkheads disabled and
+   the old shared 8-thread Google pool shows Calendar waiting behind Gmail.
+Exits non-zero if a semantics or HTTP check fails.
+
+Usage: python -m benchmarks.bulkheads [--gmail-ms 1000] [--calendar-ms 50] [--flood 120]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+from benchmarks.common import install_stub_models, latency_summary
+
+UNBOUNDED_CONFIG = json.dumps({
+    "gmail": {"limit": 10000, "queue": 10000, "max_wait_ms": 600000},
+    "gmail_listing": {"limit": 10000, "queue": 10000, "max_wait_ms": 600000},
+    "calendar": {"limit": 10000, "queue": 10000, "max_wait_ms": 600000},
+})
+
+
+def check_semantics(failures):
+    from bulkheads import Bulkhead, BulkheadFull
+
+    bulkhead = Bulkhead("check", limit=2, queue=1, max_wait_ms=300)
+    order = []
+    release = threading.Event()
+
+    def worker(name):
+        with bulkhead.hold():
+            order.append(name)
+            release.wait()
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ("a", "b", "c")]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    try:
+        with bulkhead.hold():
+            failures.append("4th call was admitted past limit + queue")
+    except BulkheadFull as e:
+        if e.status_code != 429 or e.retry_after_s < 1:
+            failures.append(f"queue full gave {e.status_code} retry {e.retry_after_s}")
+    release.set()
+    for thread in threads:
+        thread.join()
+    if order != ["a", "b", "c"]:
+        failures.append(f"queued call not served in order: {order}")
+
+    async def async_checks():
+        held = asyncio.Event()
+        done = asyncio.Event()
+
+        async def holder():
+            async with bulkhead.hold_async():
+                held.set()
+                await done.wait()
+
+        holders = [asyncio.create_task(holder()) for _ in range(2)]
+        await held.wait()
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        try:
+            async with bulkhead.hold_async():
+                failures.append("call admitted while both slots were held")
+        except BulkheadFull as e:
+            waited = time.perf_counter() - started
+            if e.status_code != 503 or not 0.25 < waited < 1:
+                failures.append(f"wait timeout gave {e.status_code} after {waited:.2f}s")
+
+        async def queued():
+            async with bulkhead.hold_async():
+                pass
+
+        waiter = asyncio.create_task(queued())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        done.set()
+        await asyncio.gather(*holders)
+
+    asyncio.run(async_checks())
+    snapshot = bulkhead.snapshot()
+    if snapshot["in_flight"] or snapshot["queued"]:
+        failures.append(f"slots leaked: {snapshot}")
+    return snapshot
+
+
+async def check_http(failures):
+    import httpx
+    import llm_client
+    import main
+    from bulkheads import bulkheads
+
+    class FakeCompletions:
+        async def create(self, stream=False, **kwargs):
+            message = types.SimpleNamespace(content="Hi!")
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    llm_client._async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=FakeCompletions()))
+
+    hubspot = bulkheads["hubspot"]
+    release = asyncio.Event()
+    ready = asyncio.Event()
+    in_use = []
+
+    async def occupy():
+        async with hubspot.hold_async():
+            in_use.append(1)
+            if len(in_use) == hubspot.limit:
+                ready.set()
+            await release.wait()
+
+    occupants = [asyncio.create_task(occupy()) for _ in range(hubspot.limit + hubspot.max_queue)]
+    await ready.wait()
+    await asyncio.sleep(0.01)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        response = await client.post("/chat", json={"message": "show me hubspot contacts"})
+        if response.status_code != 429 or "retry-after" not in response.headers:
+            failures.append(f"/chat with HubSpot saturated: {response.status_code} {dict(response.headers)}")
+        stream = await client.post("/chat/stream", json={"message": "show me hubspot contacts"})
+        if 'event: error' not in stream.text or '"status": 429' not in stream.text:
+            failures.append(f"/chat/stream with HubSpot saturated: {stream.text[-200:]}")
+        general = await client.post("/chat", json={"message": "hello there friend"})
+        if general.status_code != 200:
+            failures.append(f"general chat failed while HubSpot was saturated: {general.status_code}")
+        print(f"saturated HubSpot: /chat -> {response.status_code} Retry-After {response.headers.get('retry-after')}; "
+              f"general chat -> {general.status_code}")
+
+    release.set()
+    await asyncio.gather(*occupants)
+
+
+def install_google_stubs(gmail_s, calendar_s):
+    import calendar_integration
+    import gmail.gmail_integration as gmail_integration
+
+    class Request:
+        def __init__(self, seconds, value):
+            self.seconds, self.value = seconds, value
+
+        def execute(self):
+            time.sleep(self.seconds)
+            return self.value
+
+    messages = types.SimpleNamespace(list=lambda **kwargs: Request(gmail_s, {"messages": []}))
+    gmail_service = types.SimpleNamespace(users=lambda: types.SimpleNamespace(messages=lambda: messages))
+    gmail_integration.build = lambda *args, **kwargs: gmail_service
+    gmail_integration.get_gmail_credentials = lambda: None
+
+    events = types.SimpleNamespace(insert=lambda **kwargs: Request(calendar_s, {"htmlLink": "https://calendar.example"}))
+    calendar_service = types.SimpleNamespace(events=lambda: events)
+    calendar_integration.get_calendar_service = lambda: calendar_service
+
+
+async def isolation(gmail_ms, calendar_ms, flood):
+    from bulkheads import BulkheadFull
+    from calendar_integration import async_schedule_google_event
+    from gmail.gmail_integration import async_get_latest_emails
+
+    install_google_stubs(gmail_ms / 1000, calendar_ms / 1000)
+    outcomes = {"ok": 0, "shed": 0}
+
+    async def retrieve():
+        try:
+            await async_get_latest_emails(5)
+            outcomes["ok"] += 1
+        except BulkheadFull:
+            outcomes["shed"] += 1
+
+    started = time.perf_counter()
+    flood_tasks = [asyncio.create_task(retrieve()) for _ in range(flood)]
+    await asyncio.sleep(0.05)
+    latencies = []
+    for _ in range(10):
+        call_started = time.perf_counter()
+        await async_schedule_google_event("probe", "2025-07-01T09:00:00", "2025-07-01T10:00:00")
+        latencies.append((time.perf_counter() - call_started) * 1e6)
+    await asyncio.gather(*flood_tasks)
+    return {
+        "calendar": latency_summary(latencies),
+        "gmail": outcomes,
+        "flood_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gmail-ms", type=float, default=1000.0)
+    parser.add_argument("--calendar-ms", type=float, default=50.0)
+    parser.add_argument("--flood", type=int, default=120)
+    # Internal: run only the isolation test and print JSON (used for the unbounded run)
+    parser.add_argument("--isolation-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.isolation_only:
+        print(json.dumps(asyncio.run(isolation(args.gmail_ms, args.calendar_ms, args.flood))))
+        return
+
+    install_stub_models()
+    import refined_nlp
+    refined_nlp.api_key = None
+
+    failures = []
+    snapshot = check_semantics(failures)
+    print(f"semantics: {'ok' if not failures else 'FAILED'} (final state {snapshot})")
+    asyncio.run(check_http(failures))
+
+    bounded = asyncio.run(isolation(args.gmail_ms, args.calendar_ms, args.flood))
+    env = dict(os.environ, BULKHEAD_CONFIG=UNBOUNDED_CONFIG, GOOGLE_API_WORKERS="8")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bulkheads", "--isolation-only",
+         "--gmail-ms", str(args.gmail_ms), "--calendar-ms", str(args.calendar_ms), "--flood", str(args.flood)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    unbounded = json.loads(output.strip().splitlines()[-1])
+
+    print(f"\n{args.flood} Gmail retrievals ({args.gmail_ms:.0f} ms each) vs Calendar inserts ({args.calendar_ms:.0f} ms each)")
+    print(f"{'setup':<28}{'calendar p50 ms':>16}{'p95 ms':>10}{'gmail ok':>10}{'shed':>8}")
+    for name, result in (("bulkheads", bounded), ("shared pool, no bulkheads", unbounded)):
+        print(f"{name:<28}{result['calendar']['p50_us'] / 1000:>16.0f}{result['calendar']['p95_us'] / 1000:>10.0f}"
+              f"{result['gmail']['ok']:>10}{result['gmail']['shed']:>8}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Batch event creation against a local stub of the Google Calendar API.
+
+Starts an in-process HTTP server that implements events.insert and the
+multipart/mixed batch endpoint, with a configurable per-request delay that
+stands in for the round trip to Google. It then creates the same events one
+by one with schedule_google_event and again with
+schedule_google_events_batch. The run checks that:
+  - every event arrives with the same body (summary, times, recurrence,
+    attendees, conference request);
+  - links come back in input order;
+  - a part the stub rejects leaves None in that event's slot only;
+  - the batch path makes ceil(N / CALENDAR_BATCH_SIZE) HTTP requests.
+Exits non-zero on any failure.
+
+Usage: python -m benchmarks.calendar_batch [--events 120] [--rtt-ms 40]
+"""
+
+import argparse
+import email.parser
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httplib2
+from googleapiclient.discovery import build
+
+# Events with this title get a 400 from the stub
+REJECTED_TITLE = "reject me"
+
+
+class CalendarStub:
+    def __init__(self, rtt_ms):
+        self.rtt_ms = rtt_ms
+        self.http_requests = 0
+        self.events = []
+        self._lock = threading.Lock()
+
+    def insert(self, body):
+        if body.get("summary") == REJECTED_TITLE:
+            return 400, {"error": {"code": 400, "message": "Invalid event"}}
+        event = dict(body, id=uuid.uuid4().hex)
+        event["htmlLink"] = f"https://calendar.example/event?eid={event['id']}"
+        with self._lock:
+            self.events.append(body)
+        return 200, event
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                with stub._lock:
+                    stub.http_requests += 1
+                time.sleep(stub.rtt_ms / 1000)
+                content = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path.startswith("/batch/"):
+                    self._batch(content)
+                elif "/events" in self.path:
+                    status, payload = stub.insert(json.loads(content))
+                    self._reply(status, "application/json", json.dumps(payload).encode())
+                else:
+                    self._reply(404, "application/json", b'{"error": {"code": 404}}')
+
+            def _batch(self, content):
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                message = email.parser.BytesParser().parsebytes(header + content)
+                boundary = f"batch_{uuid.uuid4().hex}"
+                parts = []
+                for part in message.get_payload():
+                    request = part.get_payload()
+                    head, _, body = request.replace("\r\n", "\n").partition("\n\n")
+                    status, payload = stub.insert(json.loads(body))
+                    reason = "OK" if status == 200 else "Bad Request"
+                    parts.append(
+                        f"--{boundary}\r\nContent-Type: application/http\r\n"
+                        f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                        f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n\r\n"
+                        f"{json.dumps(payload)}\r\n"
+                    )
+                body = ("".join(parts) + f"--{boundary}--\r\n").encode()
+                self._reply(200, f"multipart/mixed; boundary={boundary}", body)
+
+            def _reply(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def sample_events(count):
+    modifiers = [None, {"meeting_type": "video"}, {"attendees": "sam@example.com, Priya"}, {"priority": "high"}]
+    events = []
+    for i in range(count):
+        day = 1 + i % 28
+        events.append({
+            "title": f"Imported meeting {i}",
+            "start_datetime": f"2025-07-{day:02d}T09:00:00-04:00",
+            "end_datetime": f"2025-07-{day:02d}T10:00:00-04:00",
+            "modifiers": modifiers[i % len(modifiers)],
+            "recurrence": "RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=8" if i % 5 == 0 else None,
+        })
+    return events
+
+
+def _comparable(body):
+    body = json.loads(json.dumps(body))
+    body.get("conferenceData", {}).get("createRequest", {}).pop("requestId", None)
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=120)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    import calendar_integration
+    from calendar_integration import CALENDAR_BATCH_SIZE, schedule_google_event, schedule_google_events_batch
+
+    stub = CalendarStub(args.rtt_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    root = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    service = build(
+        "calendar", "v3", http=httplib2.Http(), static_discovery=True,
+        client_options={"api_endpoint": root + "calendar/v3/"},
+    )
+    calendar_integration.CALENDAR_BATCH_URI = root + "batch/calendar/v3"
+
+    events = sample_events(args.events)
+    failures = []
+
+    started = time.perf_counter()
+    sequential_links = [
+        schedule_google_event(
+            e["title"], e["start_datetime"], e["end_datetime"], e["modifiers"], e["recurrence"], service=service
+        )
+        for e in events
+    ]
+    sequential_s = time.perf_counter() - started
+    sequential_requests, sequential_bodies = stub.http_requests, list(stub.events)
+
+    stub.http_requests, stub.events = 0, []
+    started = time.perf_counter()
+    batch_links = schedule_google_events_batch(events, service=service)
+    batch_s = time.perf_counter() - started
+    batch_requests, batch_bodies = stub.http_requests, list(stub.events)
+
+    expected_requests = -(-len(events) // CALENDAR_BATCH_SIZE)
+    if batch_requests != expected_requests:
+        failures.append(f"batch made {batch_requests} HTTP requests, expected {expected_requests}")
+    if None in batch_links or len(batch_links) != len(events):
+        failures.append("batch did not return a link for every event")
+    by_summary = {body["summary"]: _comparable(body) for body in batch_bodies}
+    for body in sequential_bodies:
+        if by_summary.get(body["summary"]) != _comparable(body):
+            failures.append(f"event {body['summary']!r} differs between the single and batch paths")
+    if any("recurrence" not in body for body in batch_bodies if body["summary"].endswith(("0", "5"))):
+        failures.append("recurrence missing from batched events")
+    if len({link for link in sequential_links}) != len(events):
+        failures.append("single inserts returned duplicate links")
+
+    # A rejected part only affects its own slot
+    mixed = sample_events(3)
+    mixed[1]["title"] = REJECTED_TITLE
+    mixed_links = schedule_google_events_batch(mixed, service=service)
+    if mixed_links[1] is not None or None in (mixed_links[0], mixed_links[2]):
+        failures.append(f"rejected part not isolated: {mixed_links}")
+
+    server.shutdown()
+
+    print(f"{'path':<12}{'events':>8}{'HTTP requests':>15}{'wall ms':>10}")
+    print(f"{'single':<12}{len(events):>8}{sequential_requests:>15}{sequential_s * 1000:>10.0f}")
+    print(f"{'batch':<12}{len(events):>8}{batch_requests:>15}{batch_s * 1000:>10.0f}")
+    print(f"(stub round trip {args.rtt_ms:.0f} ms, batch size {CALENDAR_BATCH_SIZE})")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
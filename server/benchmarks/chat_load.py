@@ -0,0 +1,238 @@
+"""
+Load test for /chat with stubbed backends: async pipeline vs the old
+threadpool-bound endpoint.
+
+Both endpoints run in-process on the real FastAPI app (httpx ASGITransport)
+with offline stub models, and every backend call (HubSpot, Slack) is a stub
+that takes --backend-ms:
+  legacy   a plain `def` route mirroring the old retrieve_crm and
+           retrieve_slack branches with blocking backend calls; FastAPI runs
+           it on its threadpool, so a request holds a thread while it waits
+  async    the real /chat, with the async HubSpot/Slack clients stubbed by
+           awaitable sleeps
+For each concurrency level the same request mix is fired at both endpoints,
+and the script reports throughput and latency percentiles.
+
+Then a slow-OpenAI case: /chat gets messages no local tier is sure about, so
+every request reaches the GPT intent tier, whose stub takes --gpt-ms (past
+its deadline by default). The general reply is stubbed at --backend-ms.
+The GPT tier is awaited on the event loop, so throughput should be about
+concurrency / deadline. When it held an NLP pool thread and a local_model
+slot, throughput was capped at local_model limit / deadline (about 1.6
+req/s) and the rest of the requests got 503s.
+
+Its levels (--gpt-concurrency) stay within the openai bulkhead's limit plus
+queue. Beyond that, extra GPT-tier calls are shed and fall back to the
+local answer, and these closed-loop clients come straight back, so they
+would only measure the local_model queue.
+
+Exits non-zero if any request fails, or if the slow-OpenAI case doesn't beat
+that cap at concurrency above the local_model limit.
+
+Usage: python -m benchmarks.chat_load [--backend-ms 200] [--gpt-ms 3000] [--concurrency 10 50 200]
+                                      [--gpt-concurrency 10 50] [--requests-per-worker 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+import types
+
+from benchmarks.common import install_stub_models, latency_summary
+
+MESSAGES = [
+    "show me hubspot contacts",
+    "check slack history in #general",
+]
+# Miss the regex tier; the stub embedding and NLI tiers never answer confidently
+SLOW_GPT_MESSAGES = [
+    "how is the quarter going",
+    "what should i focus on today",
+]
+
+
+def install_backends(main, backend_s):
+    """Stubs the async clients /chat uses and returns the blocking equivalents for the legacy route."""
+
+    async def async_contacts_dual(limit_each=5):
+        await asyncio.sleep(backend_s)
+        return {"top": [{"firstname": "Ada", "lastname": "Lovelace", "email": "ada@example.com"}], "bottom": []}
+
+    async def async_slack_messages(channel, limit=5):
+        await asyncio.sleep(backend_s)
+        return [{"user": "U1", "text": "hello", "ts": "1717500000.0"}]
+
+    def contacts_dual(limit_each=5):
+        time.sleep(backend_s)
+        return {"top": [{"firstname": "Ada", "lastname": "Lovelace", "email": "ada@example.com"}], "bottom": []}
+
+    def slack_messages(channel, limit=5):
+        time.sleep(backend_s)
+        return [{"user": "U1", "text": "hello", "ts": "1717500000.0"}]
+
+    main.async_get_hubspot_contacts_dual = async_contacts_dual
+    main.async_get_latest_slack_messages = async_slack_messages
+    return contacts_dual, slack_messages
+
+
+def install_slow_gpt(main, refined_nlp, gpt_s, reply_s):
+    """Stubs the GPT intent tier's AsyncOpenAI client (taking gpt_s) and the general-reply completion."""
+
+    class SlowCompletions:
+        async def create(self, **kwargs):
+            await asyncio.sleep(gpt_s)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="general"))])
+
+    class SlowClient:
+        chat = types.SimpleNamespace(completions=SlowCompletions())
+
+        def with_options(self, **kwargs):
+            return self
+
+    async def chat_completion(messages, **kwargs):
+        await asyncio.sleep(reply_s)
+        return "Here to help."
+
+    refined_nlp.api_key = "bench"
+    refined_nlp.get_async_openai = SlowClient
+    main.chat_completion = chat_completion
+
+
+def add_legacy_route(main, contacts_dual, slack_messages):
+    from refined_nlp import bert_classify
+    from nlp_datetime_cleaner import normalize_text
+
+    def legacy_chat(req: main.ChatRequest):
+        user_text = normalize_text(req.message)
+        classification_text = bert_classify(user_text)
+        if "retrieve_crm" in classification_text:
+            contacts = contacts_dual(limit_each=5)
+            return {"reply": "\n".join(f"{c['firstname']} {c['lastname']}" for c in contacts["top"])}
+        if "retrieve_slack" in classification_text:
+            channel, count, _ = main.extract_slack_retrieve_params(req.message)
+            messages = slack_messages(channel, count)
+            return {"reply": "\n".join(m["text"] for m in messages)}
+        return {"reply": classification_text}
+
+    main.app.add_api_route("/bench/legacy-chat", legacy_chat, methods=["POST"])
+
+
+async def fire(client, path, concurrency, total, messages=MESSAGES, ramp_s=0.0):
+    """Fires `total` requests from `concurrency` clients; with ramp_s, the clients start spread over ramp_s."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = []
+
+    async def one(i):
+        async with semaphore:
+            if i < concurrency and ramp_s:
+                await asyncio.sleep(ramp_s * i / concurrency)
+            started = time.perf_counter()
+            response = await client.post(path, json={"message": messages[i % len(messages)]})
+            latencies.append((time.perf_counter() - started) * 1e6)
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall_s = time.perf_counter() - started
+    return total / wall_s, latency_summary(latencies), sum(status != 200 for status in statuses)
+
+
+def print_rows(rows):
+    print(f"{'endpoint':<10}{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for name, concurrency, rps, summary, errors in rows:
+        print(f"{name:<10}{concurrency:>12}{rps:>10.1f}{summary['p50_us'] / 1000:>10.0f}"
+              f"{summary['p95_us'] / 1000:>10.0f}{errors:>8}")
+
+
+async def run(levels, per_worker):
+    import httpx
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    rows = []
+    # chat_endpoint prints every request; keep that out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            # Warm the classification cache on both routes
+            for path in ("/bench/legacy-chat", "/chat"):
+                for message in MESSAGES:
+                    await client.post(path, json={"message": message})
+
+            for concurrency in levels:
+                total = concurrency * per_worker
+                for name, path in (("legacy", "/bench/legacy-chat"), ("async", "/chat")):
+                    rows.append((name, concurrency) + await fire(client, path, concurrency, total))
+
+    print_rows(rows)
+    return rows
+
+
+async def run_slow_gpt(levels, per_worker, ramp_s):
+    """
+    /chat with every request waiting on the slow GPT tier (nothing is cached:
+    GPT never answers in time). Clients start spread over ramp_s rather than
+    in one burst, which would only measure the local_model bulkhead's queue.
+    """
+    import httpx
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for concurrency in levels:
+                total = concurrency * per_worker
+                rows.append(("slow-gpt", concurrency) + await fire(client, "/chat", concurrency, total, SLOW_GPT_MESSAGES, ramp_s))
+
+    print_rows(rows)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend-ms", type=float, default=200.0)
+    parser.add_argument("--gpt-ms", type=float, default=3000.0)
+    parser.add_argument("--gpt-concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests-per-worker", type=int, default=5)
+    args = parser.parse_args()
+
+    install_stub_models()
+    import main as main_module
+    import refined_nlp
+
+    refined_nlp.api_key = None
+    contacts_dual, slack_messages = install_backends(main_module, args.backend_ms / 1000)
+    add_legacy_route(main_module, contacts_dual, slack_messages)
+
+    rows = asyncio.run(run(args.concurrency, args.requests_per_worker))
+    print(f"(backend stubs take {args.backend_ms:.0f} ms; the legacy route shares FastAPI's default threadpool)")
+
+    from bulkheads import bulkheads
+
+    install_slow_gpt(main_module, refined_nlp, args.gpt_ms / 1000, args.backend_ms / 1000)
+    deadline_s = refined_nlp.intent_cascade.config["gpt"]["budget_ms"] / 1000
+    local_limit = bulkheads["local_model"].limit
+    pool_bound_rps = local_limit / min(deadline_s, args.gpt_ms / 1000)
+    print(f"\nslow OpenAI: GPT tier takes {args.gpt_ms:.0f} ms, deadline {deadline_s * 1000:.0f} ms; "
+          f"holding a local_model slot it would be capped at {pool_bound_rps:.1f} req/s")
+    slow_rows = asyncio.run(run_slow_gpt(args.gpt_concurrency, args.requests_per_worker, deadline_s))
+
+    failures = [f"{name} at {concurrency}: {errors} failed requests" for name, concurrency, _, _, errors in rows + slow_rows if errors]
+    failures += [
+        f"slow-gpt at {concurrency}: {rps:.1f} req/s, no better than the pool-bound {pool_bound_rps:.1f}"
+        for _, concurrency, rps, _, _ in slow_rows if concurrency > local_limit and rps <= pool_bound_rps
+    ]
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Shared helpers for the benchmark scripts: the versioned corpus, a frozen
+clock for the datetime parsers, latency summaries and offline model stubs.
+"""
+
+import contextlib
+import datetime
+import json
+import pathlib
+import time
+import types
+
+CORPUS_DIR = pathlib.Path(__file__).parent / "corpus"
+
+
+def load_corpus(version="v1"):
+    return json.loads((CORPUS_DIR / f"{version}.json").read_text())
+
+
+def frozen_datetime(now, tz_name):
+    """
+    A datetime subclass whose now() always returns `now` (naive ISO string,
+    interpreted in tz_name). Everything else behaves like datetime.
+    """
+    import pytz
+
+    local_tz = pytz.timezone(tz_name)
+    frozen = local_tz.localize(datetime.datetime.fromisoformat(now))
+
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen.astimezone(tz) if tz else frozen.replace(tzinfo=None)
+
+    return FrozenDatetime
+
+
+@contextlib.contextmanager
+def frozen_clock(module, now, tz_name, attribute="datetime"):
+    """
+    Swaps `module.<attribute>` for a frozen clock. The attribute can be the
+    datetime class (`from datetime import datetime`) or the datetime module
+    (`import datetime`), in which case only its datetime class is frozen.
+    """
+    original = getattr(module, attribute)
+    replacement = frozen_datetime(now, tz_name)
+    if isinstance(original, types.ModuleType):
+        replacement = types.SimpleNamespace(**{**vars(original), "datetime": replacement})
+    setattr(module, attribute, replacement)
+    try:
+        yield
+    finally:
+        setattr(module, attribute, original)
+
+
+def timed(fn, *args, **kwargs):
+    """Returns (result, elapsed microseconds)."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1e6
+
+
+def latency_summary(samples_us):
+    """p50/p95/p99/max in microseconds for a list of samples."""
+    if not samples_us:
+        return {"count": 0}
+    ordered = sorted(samples_us)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 1)
+
+    return {
+        "count": len(ordered),
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "max_us": round(ordered[-1], 1),
+    }
+
+
+def install_stub_models(nli_latency_ms=0.0):
+    """
+    Registers offline stand-ins for the registry models and marks them ready,
+    so the pipeline runs without downloading anything. The stubs are not meant
+    to be accurate: embedding and NLI never answer confidently, which makes the
+    cascade fall through to "general" for anything the regex tier misses.
+    Must run before anything calls registry.load_all().
+    """
+    from model_registry import registry
+
+    def nli_stub(texts, labels, batch_size=None):
+        texts_list = texts if isinstance(texts, list) else [texts]
+        if nli_latency_ms:
+            time.sleep(nli_latency_ms / 1000)
+        uniform = 1.0 / len(labels)
+        results = [{"sequence": t, "labels": list(labels), "scores": [uniform] * len(labels)} for t in texts_list]
+        return results if isinstance(texts, list) else results[0]
+
+    def embedder_stub(text):
+        return {"labels": ["general", "schedule_meeting"], "scores": [0.5, 0.5]}
+
+    def rewriter_stub(prompt, **kwargs):
+        return [{"generated_text": ""}]
+
+    stubs = {
+        "intent_embedder": embedder_stub,
+        "zero_shot_classifier": nli_stub,
+        "date_rewrite_pipeline": rewriter_stub,
+    }
+    for name, stub in stubs.items():
+        registry.register(name, lambda stub=stub: stub)
+        registry.load(name)
@@ -0,0 +1,72 @@
+"""
+Bulk datetime parsing (/datetime/parse-batch): which stage resolves each phrase.
+
+Runs a mix of phrases through nlp_datetime_cleaner.parse_datetime_batch
+without the model tier (use_model=False) and checks the stage and result
+of each:
+  rules       the grammar dates the phrase ("tomorrow at 3pm")
+  dateparser  no rule matches but dateparser finds a date; the event is
+              put at 3pm local time on that day
+  None        nothing resolves it (left for the model tier)
+Duplicates must come back in input order with identical results. Also
+reports the per-phrase cost of the batch.
+
+Exits non-zero on any mismatch.
+
+Usage: python -m benchmarks.datetime_batch [--repeat 20]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+CASES = [
+    ("tomorrow at 3pm", "rules"),
+    ("next monday at 10am for 2 hours", "rules"),
+    ("december 3rd", "dateparser"),
+    ("5 november 2026", "dateparser"),
+    ("2026-12-01", "dateparser"),
+    ("sometime after the offsite", None),
+    ("tomorrow at 3pm", "rules"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from nlp_datetime_cleaner import parse_datetime_batch
+
+    phrases = [phrase for phrase, _ in CASES]
+    results = parse_datetime_batch(phrases, use_model=False)
+    failures = []
+    print(f"{'phrase':<36}{'source':<12}{'start'}")
+    for (phrase, expected), result in zip(CASES, results):
+        print(f"{phrase:<36}{str(result['source']):<12}{result['start']}")
+        if result["phrase"] != phrase or result["source"] != expected:
+            failures.append(f"{phrase!r}: source {result['source']!r}, expected {expected!r}")
+        elif expected == "dateparser" and datetime.fromisoformat(result["start"]).hour != 15:
+            failures.append(f"{phrase!r}: dateparser result not at 3pm: {result['start']}")
+        elif expected is None and result["start"] is not None:
+            failures.append(f"{phrase!r}: resolved to {result['start']} without a source")
+    if results[0] != results[-1]:
+        failures.append("duplicate phrases got different results")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        parse_datetime_batch(phrases, use_model=False)
+    per_phrase_us = (time.perf_counter() - started) / (args.repeat * len(phrases)) * 1e6
+    print(f"\n{per_phrase_us:.0f} us per phrase (rules and dateparser, no model)")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Parity check and per-call benchmark for the compiled datetime grammar.
+
+Runs generated scheduling phrases, raw and after normalize_datetime_input,
+through intelligent_date_parse and slot_extractor.parse_event_time and through frozen
+copies of their previous implementations (a per-call list of regexes tried
+one by one). Several frozen reference clocks cover weekday wrap-around,
+month ends, the December -> January rollover and a DST change. Results
+(or raised exception types) must be identical. Exits non-zero on any
+mismatch.
+
+Usage: python -m benchmarks.datetime_grammar [--phrases 3000]
+"""
+
+import argparse
+import datetime as datetime_module
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+import dateparser
+import pytz
+
+from benchmarks.common import frozen_clock
+
+TIMEZONE = "America/Indiana/Indianapolis"
+FROZEN_NOWS = [
+    "2025-06-04T10:00:00",  # Wednesday morning
+    "2025-08-31T23:30:00",  # Sunday night, month end (next month has no 31st)
+    "2025-12-15T08:00:00",  # next month rolls over the year
+    "2026-03-07T14:00:00",  # Saturday before the DST change
+    "2025-02-28T12:00:00",  # end of February
+]
+
+PREFIXES = ["", "schedule a meeting ", "Book a call with sam ", "set up a 1:1 ", "meeting for ", "chat "]
+DATES = [
+    "next week {weekday}", "next {weekday}", "{weekday} next week", "tomorrow", "today", "{month} {day}",
+    "{day} {month}", "{day} of {month}", "in {n} days", "in 1 day", "next month on the {day}", "next month the {day}",
+    "on {weekday}", "for {weekday}", "next week on {weekday}", "next week at 3pm on {weekday}", "{month} 30",
+    "february 30", "31st of april", "next month on the 31st", "", "Next Friday", "TOMORROW",
+]
+TIMES = [
+    "at 3pm", "at 3 pm", "at 10:30am", "at 12pm", "at 12am", "at 6 p.m.", "at 9:05 a.m.", "at 7", "at 23",
+    "at 11:15 AM", "at 99", "", "around noon",
+]
+DURATIONS = [
+    "", "", "for 2 hours", "for 3h", "for 1 hr", "for 2 hrs", "2 hours long", "1 hour meeting", "2h meeting",
+    "for 45 minutes", "for 90 min",
+]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["january", "march", "june", "july", "september", "december"]
+DAYS = ["1", "2nd", "3rd", "15", "15th", "20th", "28", "31st"]
+
+
+def legacy_intelligent_date_parse(text):
+    """Frozen copy of intelligent_date_parse before the compiled grammar."""
+    local_tz = pytz.timezone("America/Indiana/Indianapolis")
+    now = datetime.now(local_tz)
+
+    time_pattern = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?'
+    day_of_week_pattern = r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+    month_pattern = r'(january|february|march|april|may|june|july|august|september|october|november|december)'
+    day_of_month_pattern = r'(\d{1,2})(?:st|nd|rd|th)?'
+
+    duration_hours = 1
+    duration_patterns = [
+        r'for\s+(\d+)\s*hours?',
+        r'for\s+(\d+)\s*h',
+        r'(\d+)\s*hours?\s+long',
+        r'(\d+)\s*hour\s+meeting',
+        r'(\d+)\s*h\s+meeting',
+        r'for\s+(\d+)\s*hr',
+        r'for\s+(\d+)\s*hrs',
+    ]
+    for pattern in duration_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            try:
+                duration_hours = int(match.group(1))
+                break
+            except:
+                pass
+
+    date_patterns = [
+        {'regex': r'next\s+week\s+' + day_of_week_pattern + r'\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_weekday(m.group(1), m.group(2), m.group(3), m.group(4), now, local_tz, "next_week")},
+        {'regex': r'next\s+' + day_of_week_pattern + r'\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_weekday(m.group(1), m.group(2), m.group(3), m.group(4), now, local_tz, "next")},
+        {'regex': day_of_week_pattern + r'\s+next\s+week\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_weekday(m.group(1), m.group(2), m.group(3), m.group(4), now, local_tz, "next_week")},
+        {'regex': r'tomorrow\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_offset(1, m.group(1), m.group(2), m.group(3), now, local_tz)},
+        {'regex': r'today\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_offset(0, m.group(1), m.group(2), m.group(3), now, local_tz)},
+        {'regex': month_pattern + r'\s+' + day_of_month_pattern + r'\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_month_day(m.group(1), m.group(2), m.group(3), m.group(4), m.group(5), now, local_tz)},
+        {'regex': day_of_month_pattern + r'\s+(?:of\s+)?' + month_pattern + r'\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_month_day(m.group(2), m.group(1), m.group(3), m.group(4), m.group(5), now, local_tz)},
+        {'regex': r'in\s+(\d+)\s+days?\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_offset(int(m.group(1)), m.group(2), m.group(3), m.group(4), now, local_tz)},
+        {'regex': r'next\s+month\s+(?:on\s+)?(?:the\s+)?' + day_of_month_pattern + r'\s+at\s+' + time_pattern,
+         'handler': lambda m: _legacy_next_month(m.group(1), m.group(2), m.group(3), m.group(4), now, local_tz)},
+        {'regex': r'at\s+' + time_pattern,
+         'handler': lambda m: _legacy_time_only(m.group(1), m.group(2), m.group(3), now, local_tz)},
+    ]
+
+    for pattern in date_patterns:
+        match = re.search(pattern['regex'], text, re.IGNORECASE)
+        if match:
+            start_dt = pattern['handler'](match)
+            if start_dt:
+                end_dt = start_dt + timedelta(hours=duration_hours)
+                return start_dt, end_dt
+
+    try:
+        time_match = re.search(r'at\s+' + time_pattern, text, re.IGNORECASE)
+        if time_match:
+            # Unreachable: the last date pattern above matches the same text and never returns None
+            raise AssertionError("time_match after the pattern loop")
+        # The zone name, as in the fixed nlp_datetime_cleaner: both sides reach dateparser the same way
+        date_settings = {'RETURN_AS_TIMEZONE_AWARE': True, 'TIMEZONE': local_tz.zone}
+        parsed_date = dateparser.parse(text, settings=date_settings)
+        if parsed_date:
+            naive_dt = datetime(parsed_date.year, parsed_date.month, parsed_date.day, 15, 0, 0, 0)
+            start_dt = local_tz.localize(naive_dt)
+            end_dt = start_dt + timedelta(hours=duration_hours)
+            return start_dt, end_dt
+    except Exception as e:
+        print(f"Error in dateparser: {e}")
+
+    return None, None
+
+
+# The previous parse_*_at_time helpers, folded together; same arithmetic
+def _legacy_hour(hour, am_pm):
+    hour = int(hour)
+    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
+        hour += 12
+    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
+        hour = 0
+    return hour
+
+
+def _legacy_at(target_date, hour, minute, am_pm, local_tz):
+    naive_dt = datetime(target_date.year, target_date.month, target_date.day,
+                        _legacy_hour(hour, am_pm), int(minute or 0), 0, 0)
+    return local_tz.localize(naive_dt)
+
+
+def _legacy_weekday(weekday, hour, minute, am_pm, now, local_tz, mode):
+    weekday_map = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
+    hour_24 = _legacy_hour(hour, am_pm)  # evaluated before the date, as the helpers did
+    days_to_add = (weekday_map[weekday.lower()] - now.weekday()) % 7
+    if mode == "next_week":
+        days_to_add += 7
+    elif days_to_add == 0:
+        days_to_add = 7
+    target_date = now + timedelta(days=days_to_add)
+    return local_tz.localize(datetime(target_date.year, target_date.month, target_date.day, hour_24, int(minute or 0), 0, 0))
+
+
+def _legacy_offset(days, hour, minute, am_pm, now, local_tz):
+    return _legacy_at(now + timedelta(days=days), hour, minute, am_pm, local_tz)
+
+
+def _legacy_month_day(month_name, day, hour, minute, am_pm, now, local_tz):
+    month_map = {
+        'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6, 'july': 7,
+        'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12
+    }
+    day = int(day)
+    hour_24 = _legacy_hour(hour, am_pm)
+    minute = int(minute or 0)
+    month = month_map[month_name.lower()]
+    year = now.year
+    if (month < now.month) or (month == now.month and day < now.day):
+        year += 1
+    try:
+        return local_tz.localize(datetime(year, month, day, hour_24, minute, 0, 0))
+    except:
+        return None
+
+
+def _legacy_next_month(day, hour, minute, am_pm, now, local_tz):
+    day = int(day)
+    hour_24 = _legacy_hour(hour, am_pm)
+    minute = int(minute or 0)
+    month = now.month + 1
+    year = now.year
+    if month > 12:
+        month = 1
+        year += 1
+    try:
+        return local_tz.localize(datetime(year, month, day, hour_24, minute, 0, 0))
+    except:
+        return None
+
+
+def _legacy_time_only(hour, minute, am_pm, now, local_tz):
+    localized_dt = _legacy_at(now, hour, minute, am_pm, local_tz)
+    if localized_dt < now:
+        localized_dt = localized_dt + timedelta(days=1)
+    return localized_dt
+
+
+def legacy_parse_event_time(user_text: str):
+    """Frozen copy of parse_event_time (then in main.py) before the compiled grammar."""
+    local_tz = pytz.timezone("America/Indiana/Indianapolis")
+    now_local = datetime_module.datetime.now(local_tz)
+    modified_text = user_text.lower()
+    duration_hours = 1
+
+    duration_patterns = [
+        r"for (\d+) hours?",
+        r"for (\d+)h",
+        r"(\d+) hours? long",
+        r"(\d+) hour meeting"
+    ]
+    for pattern in duration_patterns:
+        match = re.search(pattern, modified_text)
+        if match:
+            try:
+                duration_hours = int(match.group(1))
+                modified_text = re.sub(pattern, '', modified_text)
+                break
+            except Exception as e:
+                print("Duration extraction error:", e)
+
+    weekday_map = {
+        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+        "friday": 4, "saturday": 5, "sunday": 6
+    }
+    next_day_match = re.search(r'next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', modified_text)
+    alt_form_match = re.search(r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+next\s+week', modified_text)
+    next_week_day_match = re.search(r'next\s+week\s+(?:on\s+)?(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', modified_text)
+    next_week_at_day_match = re.search(r'next\s+week\s+at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?\s+on\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', modified_text)
+
+    weekday_str = None
+    if next_day_match:
+        weekday_str = next_day_match.group(1).lower()
+    elif alt_form_match:
+        weekday_str = alt_form_match.group(1).lower()
+    elif next_week_day_match:
+        weekday_str = next_week_day_match.group(1).lower()
+    elif next_week_at_day_match:
+        weekday_str = next_week_at_day_match.group(1).lower()
+
+    if weekday_str:
+        target_weekday = weekday_map[weekday_str]
+        current_weekday = now_local.weekday()
+        days_to_add = 7 - current_weekday + target_weekday
+        if days_to_add >= 7:
+            days_to_add = days_to_add % 7
+        days_to_add += 7
+        dt_local = now_local + datetime_module.timedelta(days=days_to_add)
+    else:
+        dt_local = now_local
+
+    time_match = re.search(r'at\s+(\d{1,2})(:(\d{2}))?\s*(am|pm)?', modified_text)
+    if time_match:
+        hour = int(time_match.group(1))
+        minute = int(time_match.group(3) or 0)
+        meridiem = time_match.group(4)
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        dt_local = dt_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    else:
+        dt_local = dt_local.replace(hour=15, minute=0, second=0, microsecond=0)
+
+    end_dt_local = dt_local + datetime_module.timedelta(hours=duration_hours)
+    return dt_local.isoformat(), end_dt_local.isoformat()
+
+
+def generate_phrases(count, seed=11):
+    rng = random.Random(seed)
+    phrases = []
+    for _ in range(count):
+        date = rng.choice(DATES).format(
+            weekday=rng.choice(WEEKDAYS), month=rng.choice(MONTHS), day=rng.choice(DAYS), n=rng.randint(2, 40),
+        )
+        parts = [rng.choice(PREFIXES) + date, rng.choice(TIMES), rng.choice(DURATIONS)]
+        rng.shuffle(parts[1:])
+        phrase = " ".join(part for part in parts if part).strip()
+        phrases.append(phrase.upper() if rng.random() < 0.05 else phrase)
+    return phrases
+
+
+def _outcome(fn, text):
+    try:
+        return fn(text)
+    except Exception as e:
+        return f"raised {type(e).__name__}"
+
+
+def _time(fn, phrases, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for phrase in phrases:
+            _outcome(fn, phrase)
+        best = min(best, time.perf_counter() - started)
+    return best / len(phrases) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phrases", type=int, default=3000)
+    args = parser.parse_args()
+
+    import nlp_datetime_cleaner
+    import slot_extractor
+    from nlp_datetime_cleaner import intelligent_date_parse, normalize_datetime_input
+
+    raw = generate_phrases(args.phrases)
+    phrases = raw + [normalize_datetime_input(p) for p in raw]
+    this_module = sys.modules[__name__]
+
+    pairs = [
+        ("intelligent_date_parse", legacy_intelligent_date_parse, intelligent_date_parse, nlp_datetime_cleaner, "datetime"),
+        ("parse_event_time", legacy_parse_event_time, slot_extractor.parse_event_time, slot_extractor, "datetime"),
+    ]
+    legacy_clock_attributes = {"intelligent_date_parse": "datetime", "parse_event_time": "datetime_module"}
+
+    mismatches = 0
+    timings = {}
+    for now in FROZEN_NOWS:
+        for name, legacy_fn, new_fn, module, attribute in pairs:
+            with frozen_clock(this_module, now, TIMEZONE, legacy_clock_attributes[name]), \
+                    frozen_clock(module, now, TIMEZONE, attribute):
+                for phrase in phrases:
+                    expected, got = _outcome(legacy_fn, phrase), _outcome(new_fn, phrase)
+                    if expected != got:
+                        mismatches += 1
+                        if mismatches <= 20:
+                            print(f"mismatch [{name} @ {now}] {phrase!r}: legacy={expected} grammar={got}")
+                if now == FROZEN_NOWS[0]:
+                    timings[name] = (_time(legacy_fn, phrases), _time(new_fn, phrases))
+
+    total = len(phrases) * len(FROZEN_NOWS) * len(pairs)
+    print(f"parity: {total - mismatches}/{total} identical\n")
+
+    print(f"{'function':<26}{'legacy us':>10}{'grammar us':>12}{'speedup':>9}")
+    for name, (legacy_us, grammar_us) in timings.items():
+        print(f"{name:<26}{legacy_us:>10.1f}{grammar_us:>12.1f}{legacy_us / grammar_us:>8.1f}x")
+    print("(phrases that reach dateparser cost the same on both sides and dominate the averages)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
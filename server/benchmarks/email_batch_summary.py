@@ -0,0 +1,196 @@
+"""
+Batched email summarization: one GPT request per batch vs one per email.
+
+A stub inbox with mixed body lengths (short notes, paragraphs and a few
+long threads) is summarized through get_latest_emails by a fake OpenAI that
+answers after --first-token-ms plus --token-ms per reply token. For each
+inbox size the same listing runs with SUMMARY_BATCH_MAX_EMAILS=1 (one
+request per email, as before) and with the configured batching, reporting
+requests, prompt tokens (every message of every call: system prompt,
+instructions, bodies and chat-format framing) and wall time.
+
+Checks, exiting non-zero on a failure:
+  - batches adapt to body length: a long email goes alone, and no batch
+    exceeds the token budget or the email limit;
+  - batches adapt to the number of emails: while every email fits the
+    fan-out (pending <= EMAIL_FANOUT_WIDTH) each gets its own request, and
+    larger listings share requests so all batches run in one round;
+  - a listing that batches sends fewer prompt tokens than one request per
+    email and isn't more than 1.5x slower; one that doesn't batch is the
+    same number of requests;
+  - batch replies are parsed from the requested object, a bare array, an
+    {id: summary} object, and JSON wrapped in a code fence; unknown ids and
+    empty summaries are ignored, and junk yields nothing;
+  - emails left out of a batch reply get their own request and still appear,
+    in order, in the listing.
+
+Usage: python -m benchmarks.email_batch_summary [--sizes 5 10 20 40] [--first-token-ms 400] [--token-ms 15]
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import random
+import sys
+import time
+
+from benchmarks.summary_store import FakeCollection, FakeInbox, FakeSummarizer
+
+SHORT = "Thanks, see you at 3pm."
+PARAGRAPH = (
+    "Hi team, following up on yesterday's planning call: the launch moves to the 14th, design owns the "
+    "landing page, and we still need legal sign-off on the pricing copy. Please flag blockers by Thursday. "
+)
+
+
+class MixedInbox(FakeInbox):
+    """Bodies vary: mostly short or a paragraph, every seventh a long thread."""
+
+    def __init__(self, count):
+        super().__init__(count)
+        rng = random.Random(7)
+        self.bodies = {}
+        for i, message_id in enumerate(self.ids):
+            if i % 7 == 6:
+                self.bodies[message_id] = PARAGRAPH * 80
+            else:
+                self.bodies[message_id] = rng.choice([SHORT, PARAGRAPH, PARAGRAPH * 3])
+
+    def service(self):
+        service = super().service()
+        messages = service.users().messages()
+        get = messages.get
+        inbox = self
+
+        def get_with_body(userId, id, format, metadataHeaders=None):
+            request = get(userId=userId, id=id, format=format, metadataHeaders=metadataHeaders)
+            if format == "full":
+                request.value["payload"]["body"] = {"data": base64.urlsafe_b64encode(inbox.bodies[id].encode()).decode()}
+            return request
+
+        messages.get = get_with_body
+        return service
+
+
+def check_packing(gmail_integration, failures):
+    items = [("a", SHORT), ("b", PARAGRAPH), ("c", PARAGRAPH * 80), ("d", SHORT)] + [(f"s{i}", SHORT) for i in range(12)]
+    batches = gmail_integration._pack_summary_batches(items)
+    if [message_id for batch in batches for message_id, _ in batch] != [message_id for message_id, _ in items]:
+        failures.append("packing changed the email order")
+    if ["c"] not in [[message_id for message_id, _ in batch] for batch in batches]:
+        failures.append(f"long email not alone: {[[i for i, _ in b] for b in batches]}")
+    for batch in batches:
+        tokens = sum(gmail_integration.count_tokens(content) for _, content in batch)
+        if len(batch) > gmail_integration.SUMMARY_BATCH_MAX_EMAILS or (len(batch) > 1 and tokens > gmail_integration.SUMMARY_BATCH_TOKEN_BUDGET):
+            failures.append(f"batch over limits: {len(batch)} emails, {tokens} tokens")
+
+
+def check_batch_size(gmail_integration, failures):
+    width, max_emails = gmail_integration.EMAIL_FANOUT_WIDTH, gmail_integration.SUMMARY_BATCH_MAX_EMAILS
+    for pending in (1, 2, 5, width, width + 1, width * 3, width * max_emails * 2):
+        size = gmail_integration._summary_batch_size(pending)
+        if not 1 <= size <= max_emails:
+            failures.append(f"{pending} pending: batch size {size}")
+        elif pending <= width and size != 1:
+            failures.append(f"{pending} pending: batches of {size} although each fits the fan-out")
+        elif -(-pending // size) > width and size < max_emails:
+            failures.append(f"{pending} pending: batches of {size} need more than one round of {width}")
+
+
+def check_parsing(gmail_integration, failures):
+    ids = {"m1", "m2"}
+    cases = [
+        ('{"summaries": [{"id": "m1", "summary": "one"}, {"id": "m2", "summary": "two"}]}', {"m1": "one", "m2": "two"}),
+        ('[{"id": "m1", "summary": "one"}, {"id": "m2", "summary": "two"}]', {"m1": "one", "m2": "two"}),
+        ('{"m1": "one", "m2": "two"}', {"m1": "one", "m2": "two"}),
+        ('```json\n{"summaries": [{"id": "m1", "summary": "one"}]}\n```', {"m1": "one"}),
+        ('{"summaries": [{"id": "m1", "summary": " "}, {"id": "zz", "summary": "x"}, {"id": "m2", "summary": 3}]}', {}),
+        ("Sorry, I can't do that.", {}),
+    ]
+    for text, expected in cases:
+        parsed = gmail_integration._parse_batch_summaries(text, ids)
+        if parsed != expected:
+            failures.append(f"parsed {text!r} as {parsed}, expected {expected}")
+
+
+def run(gmail_integration, size, batch_max, summarizer, version):
+    gmail_integration.SUMMARY_BATCH_MAX_EMAILS = batch_max
+    gmail_integration.SUMMARY_PROMPT_VERSION = version
+    gmail_integration.openai = summarizer
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        text = gmail_integration.get_latest_emails(size)
+    return text, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--first-token-ms", type=float, default=400.0)
+    parser.add_argument("--token-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    import gmail.gmail_integration as gmail_integration
+    from gmail.summary_store import summary_store
+
+    inbox = MixedInbox(max(args.sizes))
+    gmail_integration.build = lambda *a, **kw: inbox.service()
+    gmail_integration.get_gmail_credentials = lambda: None
+    summary_store.collection = FakeCollection()
+    batch_max = gmail_integration.SUMMARY_BATCH_MAX_EMAILS
+
+    failures = []
+    check_packing(gmail_integration, failures)
+    check_batch_size(gmail_integration, failures)
+    check_parsing(gmail_integration, failures)
+
+    dropped = inbox.ids[1:3]
+    summarizer = FakeSummarizer(drop=dropped)
+    text, _ = run(gmail_integration, 10, batch_max, summarizer, "bench-drop")
+    summaries = [line[len("Summary: "):] for line in text.splitlines() if line.startswith("Summary: ")]
+    for message_id, summary in zip(inbox.ids[:10], summaries):
+        body = inbox.bodies[message_id]
+        # Long threads are summarized map-reduce style (see benchmarks.email_preprocess)
+        long = gmail_integration.count_tokens(body) > gmail_integration.EMAIL_CHUNK_TOKENS
+        if (long and not summary.startswith("Summary: Part 1:")) or (not long and summary != f"Summary: {body.strip()}"):
+            failures.append(f"listing with dropped batch entries: wrong summary for {message_id}")
+    if len(summaries) != 10:
+        failures.append(f"listing with dropped batch entries has {len(summaries)} summaries")
+    singles = sum(1 for emails, _ in summarizer.requests if emails == 1)
+    if singles < len(dropped):
+        failures.append(f"{singles} single requests for {len(dropped)} dropped emails")
+    print(f"checks: {'ok' if not failures else 'FAILED'}")
+
+    print(f"\nfirst token {args.first_token_ms:.0f} ms, {args.token_ms:.0f} ms/reply token; "
+          f"budget {gmail_integration.SUMMARY_BATCH_TOKEN_BUDGET} tokens, up to {batch_max} emails per batch")
+    print(f"{'emails':>6}  {'mode':<10}{'requests':>9}{'prompt tok':>12}{'wall ms':>9}")
+    for size in args.sizes:
+        outputs, walls, requests, tokens = {}, {}, {}, {}
+        for mode, max_emails in (("per-email", 1), ("batched", batch_max)):
+            summary_store.cache.clear()
+            summarizer = FakeSummarizer(args.first_token_ms / 1000, args.token_ms / 1000)
+            outputs[mode], walls[mode] = run(gmail_integration, size, max_emails, summarizer, f"bench-{size}-{mode}")
+            requests[mode] = len(summarizer.requests)
+            tokens[mode] = sum(prompt for _, prompt in summarizer.requests)
+            print(f"{size:>6}  {mode:<10}{requests[mode]:>9}{tokens[mode]:>12}{walls[mode] * 1000:>9.0f}")
+        if outputs["per-email"] != outputs["batched"]:
+            failures.append(f"{size} emails: batched listing differs from per-email")
+        if requests["batched"] < requests["per-email"]:
+            if tokens["batched"] >= tokens["per-email"]:
+                failures.append(f"{size} emails: batching sent {tokens['batched']} prompt tokens vs {tokens['per-email']}")
+            if walls["batched"] > 1.5 * walls["per-email"]:
+                failures.append(f"{size} emails: batching took {walls['batched']:.1f}s vs {walls['per-email']:.1f}s per email")
+        elif requests["batched"] != requests["per-email"]:
+            failures.append(f"{size} emails: {requests['batched']} batched requests vs {requests['per-email']} per email")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Email composition for send_email: one structured call vs two sequential calls.
+
+A fake AsyncOpenAI client answers every completion after --first-token-ms,
+then streams the reply at --token-ms per token (~4 characters), so a call
+costs about first-token + output length. Modes, each run --runs times:
+  sequential   the old flow: subject completion, then body completion
+  structured   generate_email_content with a valid JSON-mode reply (one call)
+  fallback     generate_email_content when the JSON reply is unusable: the
+               failed structured call, then subject and body concurrently
+Checks, exiting non-zero on a failure:
+  - the structured reply yields the expected subject and body, and the body
+    streamed to /chat/stream (escapes, quotes, newlines) matches it;
+  - JsonStringFieldStream decodes the body fed one character at a time;
+  - invalid JSON falls back to the two-prompt path and still composes;
+  - a structured reply that streamed its body but lacks a subject sends a
+    "reset" stage before the fallback, so the preview after it is one draft;
+  - a shed structured call (BulkheadFull) is raised, not retried;
+  - formality and cc modifiers reach the prompt; send_gmail sets the Cc header.
+
+Usage: python -m benchmarks.email_compose [--first-token-ms 400] [--token-ms 15] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import email
+import io
+import json
+import sys
+import time
+import types
+
+from benchmarks.common import latency_summary
+
+SUBJECT = "Q3 report review on Friday"
+BODY = (
+    'Dear Ada Lovelace,\n\nCould we review the "Q3 report" on Friday? '
+    "I'd like your thoughts on the revenue section \\ forecast before it goes out.\n\n"
+    "Best regards,\nGrace"
+)
+
+
+class FakeCompletions:
+    def __init__(self, first_token_s, token_s, structured_ok=True, structured_reply=None, structured_error=None):
+        self.first_token_s = first_token_s
+        self.token_s = token_s
+        self.structured_ok = structured_ok
+        self.structured_reply = structured_reply
+        self.structured_error = structured_error
+        self.prompts = []
+
+    def _reply(self, messages, response_format):
+        if response_format:
+            if self.structured_reply is not None:
+                return self.structured_reply
+            return json.dumps({"subject": SUBJECT, "body": BODY}) if self.structured_ok else "Subject: " + SUBJECT
+        system = messages[0]["content"]
+        return SUBJECT if "subject" in system else BODY
+
+    async def create(self, model, messages, max_tokens, temperature, stream=False, response_format=None, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        if response_format and self.structured_error:
+            raise self.structured_error
+        text = self._reply(messages, response_format)
+        pieces = [text[i:i + 4] for i in range(0, len(text), 4)]
+        await asyncio.sleep(self.first_token_s)
+        if not stream:
+            await asyncio.sleep(self.token_s * len(pieces))
+            message = types.SimpleNamespace(content=text)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+        async def chunks():
+            for piece in pieces:
+                await asyncio.sleep(self.token_s)
+                delta = types.SimpleNamespace(content=piece)
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+        return chunks()
+
+
+def install_client(completions):
+    import llm_client
+    llm_client._async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+
+
+async def compose_sequential(instructions, recipient_email):
+    """The pre-change flow: the body prompt waits for the subject."""
+    from llm_client import chat_completion
+
+    subject = await chat_completion(
+        messages=[
+            {"role": "system", "content": "You are an AI specialized in writing short, professional email subjects."},
+            {"role": "user", "content": f"Create a concise email subject line for: '{instructions}'."},
+        ],
+        max_tokens=60,
+    )
+    body = await chat_completion(
+        messages=[
+            {"role": "system", "content": "You are an AI specialized in writing professional, well-structured email content."},
+            {"role": "user", "content": f"Write an email body with subject '{subject}' for: '{instructions}' to {recipient_email}."},
+        ],
+        max_tokens=300,
+    )
+    return subject, body
+
+
+async def measure(mode, args, runs):
+    from email_composer import generate_email_content
+
+    completions = FakeCompletions(args.first_token_ms / 1000, args.token_ms / 1000, structured_ok=(mode != "fallback"))
+    install_client(completions)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "sequential":
+                await compose_sequential("review the Q3 report on Friday", "ada.lovelace@example.com")
+            else:
+                await generate_email_content("review the Q3 report on Friday", sender_name="Grace",
+                                             recipient_email="ada.lovelace@example.com")
+        samples.append((time.perf_counter() - started) * 1e6)
+    return latency_summary(samples), len(completions.prompts) // runs
+
+
+async def stream(handler):
+    """(event, data) pairs /chat/stream would send for handler()."""
+    from chat_stream import stream_events
+
+    frames = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        async for frame in stream_events(handler):
+            frames.append(frame)
+    return [(frame.split("\n")[0][len("event: "):], json.loads(frame.split("\n")[1][len("data: "):])) for frame in frames]
+
+
+async def check_composition(failures):
+    from bulkheads import BulkheadFull
+    from email_composer import JsonStringFieldStream, generate_email_content
+
+    decoded = []
+    field_stream = JsonStringFieldStream("body", decoded.append)
+    for char in json.dumps({"subject": SUBJECT, "body": BODY}):
+        field_stream.feed(char)
+    if "".join(decoded) != BODY:
+        failures.append(f"JsonStringFieldStream decoded {''.join(decoded)!r}")
+
+    completions = FakeCompletions(0.001, 0.0005)
+    install_client(completions)
+    modifiers = {"formality": "formal", "cc": "grace.hopper@example.com"}
+
+    async def handler():
+        subject, body = await generate_email_content(
+            "review the Q3 report on Friday", sender_name="Grace",
+            recipient_email="ada.lovelace@example.com", modifiers=modifiers,
+        )
+        return {"subject": subject, "body": body}
+
+    events = await stream(handler)
+    streamed = "".join(data["text"] for event, data in events if event == "delta")
+    done = [data for event, data in events if event == "done"]
+    if not done or done[0] != {"subject": SUBJECT, "body": BODY}:
+        failures.append(f"structured composition returned {done}")
+    if streamed != BODY:
+        failures.append(f"streamed body differs: {streamed!r}")
+    if len(completions.prompts) != 1:
+        failures.append(f"structured composition made {len(completions.prompts)} calls")
+    prompt = completions.prompts[0] if completions.prompts else ""
+    if "formal" not in prompt or "grace.hopper@example.com" not in prompt:
+        failures.append(f"modifiers missing from prompt: {prompt!r}")
+
+    completions = FakeCompletions(0.001, 0.0005, structured_ok=False)
+    install_client(completions)
+    with contextlib.redirect_stdout(io.StringIO()):
+        composed = await generate_email_content("review the Q3 report", explicit_subject="Q3 report",
+                                                recipient_email="ada@example.com")
+    if composed != ("Q3 report", BODY):
+        failures.append(f"fallback composition returned {composed}")
+    if len(completions.prompts) != 2:
+        failures.append(f"fallback with an explicit subject made {len(completions.prompts)} calls, expected 2")
+
+    # The body streams before the missing subject is noticed
+    install_client(FakeCompletions(0.001, 0.0005, structured_reply=json.dumps({"body": BODY})))
+    events = await stream(handler)
+    resets = [i for i, (event, data) in enumerate(events) if event == "stage" and data.get("stage") == "reset"]
+    if not resets:
+        failures.append("fallback after a streamed body sent no reset")
+    else:
+        before = "".join(data["text"] for event, data in events[:resets[-1]] if event == "delta")
+        after = "".join(data["text"] for event, data in events[resets[-1]:] if event == "delta")
+        if before != BODY or after != BODY:
+            failures.append(f"preview around the reset: {before!r} then {after!r}")
+
+    completions = FakeCompletions(0.001, 0.0005, structured_error=BulkheadFull("openai", "queue_full", 1.0))
+    install_client(completions)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await generate_email_content("review the Q3 report", recipient_email="ada@example.com")
+        failures.append("a shed structured call composed anyway")
+    except BulkheadFull:
+        pass
+    if len(completions.prompts) != 1:
+        failures.append(f"a shed structured call was followed by {len(completions.prompts) - 1} more calls")
+
+
+def check_cc_header(failures):
+    import gmail.gmail_integration as gmail_integration
+
+    sent = []
+    messages = types.SimpleNamespace(
+        send=lambda userId, body: sent.append(body) or types.SimpleNamespace(execute=lambda: {"id": "1"})
+    )
+    service = types.SimpleNamespace(users=lambda: types.SimpleNamespace(messages=lambda: messages))
+    gmail_integration.build = lambda *args, **kwargs: service
+    gmail_integration.get_gmail_credentials = lambda: None
+
+    gmail_integration.send_gmail("ada@example.com", SUBJECT, BODY, cc="grace@example.com")
+    gmail_integration.send_gmail("ada@example.com", SUBJECT, BODY)
+    headers = [email.message_from_bytes(base64.urlsafe_b64decode(body["raw"])) for body in sent]
+    if headers[0]["cc"] != "grace@example.com" or headers[1]["cc"] is not None:
+        failures.append(f"Cc headers: {[message['cc'] for message in headers]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first-token-ms", type=float, default=400.0)
+    parser.add_argument("--token-ms", type=float, default=15.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    asyncio.run(check_composition(failures))
+    check_cc_header(failures)
+    print(f"checks: {'ok' if not failures else 'FAILED'}")
+
+    print(f"\nfirst token {args.first_token_ms:.0f} ms, {args.token_ms:.0f} ms/token, {args.runs} runs")
+    print(f"{'mode':<12}{'calls':>7}{'p50 ms':>10}{'max ms':>10}")
+    for mode in ("sequential", "structured", "fallback"):
+        summary, calls = asyncio.run(measure(mode, args, args.runs))
+        print(f"{mode:<12}{calls:>7}{summary['p50_us'] / 1000:>10.0f}{summary['max_us'] / 1000:>10.0f}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
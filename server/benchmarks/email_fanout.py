@@ -0,0 +1,194 @@
+"""
+Gmail retrieval fan-out: serial vs parallel fetch + summarize.
+
+get_latest_emails runs against a stub Gmail inbox whose list and get calls
+take --gmail-ms, with a fake OpenAI taking --summary-ms per summary. Each
+call adds up to --jitter-ms of random extra latency, so messages finish out
+of order. Summaries are one email per request here (SUMMARY_BATCH_MAX_EMAILS
+= 1) to measure the fan-out alone; benchmarks.email_batch_summary covers
+batching. Every run uses a fresh summary prompt version, so nothing comes from
+the summary store. For each inbox size the same listing runs with
+EMAIL_FANOUT_WIDTH=1 (the old one-at-a-time loop) and with --width, and the
+per-stage timings from the request trace are reported:
+  list         the messages.list call
+  get          summed messages.get time (calls overlap when parallel)
+  summarize    summed summary time
+  first        time until the first email block was yielded
+  wall         total time for the listing
+Then --listings listings of the largest size run at once through
+async_list_recent_emails, and the peak number of Gmail calls in flight is
+reported. Each call takes its own gmail bulkhead slot, so the peak must stay
+within the gmail limit however many listings fan out.
+
+Exits non-zero if the parallel output differs from the serial one (order
+included), or if the concurrent listings exceed the gmail limit.
+
+Usage: python -m benchmarks.email_fanout [--sizes 5 10 20] [--width 8] [--gmail-ms 80] [--summary-ms 600] [--jitter-ms 40]
+                                         [--listings 4]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import threading
+import time
+
+from benchmarks.summary_store import FakeCollection, FakeInbox, FakeSummarizer
+
+
+class SlowInbox(FakeInbox):
+    def __init__(self, count, gmail_s, jitter_s):
+        super().__init__(count)
+        self.gmail_s = gmail_s
+        self.jitter_s = jitter_s
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def service(self):
+        service = super().service()
+        messages = service.users().messages()
+        inbox = self
+
+        def slow(call):
+            def wrapper(*args, **kwargs):
+                request = call(*args, **kwargs)
+                execute = request.execute
+
+                def slow_execute():
+                    with inbox._lock:
+                        inbox.active += 1
+                        inbox.peak = max(inbox.peak, inbox.active)
+                    try:
+                        time.sleep(inbox.gmail_s + random.uniform(0, inbox.jitter_s))
+                        return execute()
+                    finally:
+                        with inbox._lock:
+                            inbox.active -= 1
+
+                request.execute = slow_execute
+                return request
+            return wrapper
+
+        messages.list = slow(messages.list)
+        messages.get = slow(messages.get)
+        return service
+
+
+def run(size, width, args, version):
+    import gmail.gmail_integration as gmail_integration
+    import tracing
+
+    gmail_integration.EMAIL_FANOUT_WIDTH = width
+    gmail_integration.SUMMARY_PROMPT_VERSION = version
+    trace = tracing.RequestTrace()
+    token = tracing._trace.set(trace)
+    try:
+        started = time.perf_counter()
+        first = None
+        blocks = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for block in gmail_integration.iter_latest_emails(size):
+                blocks.append(block)
+                if first is None and block.startswith("Email #"):
+                    first = time.perf_counter() - started
+        wall = time.perf_counter() - started
+    finally:
+        tracing._trace.reset(token)
+
+    stages = {}
+    for stage, seconds in trace.stages:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+    return "\n".join(blocks), {
+        "list": stages.get("gmail.list", 0.0),
+        "get": stages.get("gmail.get", 0.0),
+        "summarize": stages.get("openai.summarize", 0.0),
+        "first": first or 0.0,
+        "wall": wall,
+    }
+
+
+def check_concurrent_listings(inbox, size, listings, failures):
+    import asyncio
+
+    from bulkheads import bulkheads
+    from gmail.gmail_integration import async_list_recent_emails
+
+    async def run_all():
+        return await asyncio.gather(*(async_list_recent_emails(size) for _ in range(listings)))
+
+    inbox.peak = 0
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pages = asyncio.run(run_all())
+    wall = time.perf_counter() - started
+    limit = bulkheads["gmail"].limit
+    print(f"\n{listings} concurrent listings of {size}: peak {inbox.peak} Gmail calls in flight "
+          f"(gmail limit {limit}), {wall * 1000:.0f} ms")
+    if inbox.peak > limit:
+        failures.append(f"{listings} concurrent listings reached {inbox.peak} Gmail calls, over the limit of {limit}")
+    if any(len(page["emails"]) != size for page in pages):
+        failures.append(f"concurrent listings returned {[len(page['emails']) for page in pages]} emails")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--gmail-ms", type=float, default=80.0)
+    parser.add_argument("--summary-ms", type=float, default=600.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--listings", type=int, default=4)
+    args = parser.parse_args()
+
+    import gmail.gmail_integration as gmail_integration
+    from gmail.summary_store import summary_store
+
+    inbox = SlowInbox(max(args.sizes), args.gmail_ms / 1000, args.jitter_ms / 1000)
+    gmail_integration.build = lambda *a, **kw: inbox.service()
+    gmail_integration.get_gmail_credentials = lambda: None
+    summary_store.collection = FakeCollection()
+
+    gmail_integration.SUMMARY_BATCH_MAX_EMAILS = 1
+
+    class JitteredSummarizer(FakeSummarizer):
+        def create(self, **kwargs):
+            time.sleep(random.uniform(0, args.jitter_ms / 1000))
+            return super().create(**kwargs)
+
+    gmail_integration.openai = JitteredSummarizer(args.summary_ms / 1000)
+
+    failures = []
+    print(f"Gmail {args.gmail_ms:.0f} ms/call, summary {args.summary_ms:.0f} ms, jitter up to {args.jitter_ms:.0f} ms; times in ms")
+    print(f"{'emails':>6} {'width':>6}{'list':>8}{'get':>8}{'summarize':>11}{'first':>8}{'wall':>8}{'speedup':>9}")
+    for size in args.sizes:
+        results = {}
+        for width in (1, args.width):
+            summary_store.cache.clear()
+            results[width] = run(size, width, args, f"bench-{size}-{width}")
+        serial_wall = results[1][1]["wall"]
+        for width, (_, timings) in results.items():
+            print(f"{size:>6} {width:>6}" + "".join(
+                f"{timings[stage] * 1000:>{w}.0f}" for stage, w in
+                (("list", 8), ("get", 8), ("summarize", 11), ("first", 8), ("wall", 8))
+            ) + f"{serial_wall / timings['wall']:>8.1f}x")
+        if results[1][0] != results[args.width][0]:
+            failures.append(f"{size} emails: parallel output differs from serial")
+        if results[args.width][0].count("Email #") != size:
+            failures.append(f"{size} emails: {results[args.width][0].count('Email #')} blocks")
+
+    gmail_integration.EMAIL_FANOUT_WIDTH = args.width
+    check_concurrent_listings(inbox, max(args.sizes), args.listings, failures)
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed (parallel output identical to serial, in order)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Email body preprocessing before summarization: tokens saved, content kept.
+
+Runs a set of representative bodies (reply chains in Gmail and Outlook
+style, a newsletter, a signed message, a mobile reply, a confidentiality
+notice, a bare forward and a long report) through
+email_preprocess.prepare_email_body and reports tokens before and after.
+Each body lists phrases that must survive and phrases that must be gone.
+Then the long report is summarized through the real summarization path
+with a fake OpenAI. The check is that it is capped, split into chunks,
+summarized several chunks per request, and combined in a final reduce
+request, and that no map request exceeds the batch token budget by more
+than the instructions.
+
+Exits non-zero if a check fails.
+
+Usage: python -m benchmarks.email_preprocess
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+
+from benchmarks.summary_store import FakeCollection, FakeSummarizer
+
+HISTORY = "\n".join(
+    f"> {line}" for line in (
+        "Thanks for sending the draft over. I've left comments on sections two and three,",
+        "mostly about the rollout timeline and the staffing plan. Can we meet Thursday?",
+    ) * 12
+)
+
+SAMPLES = [
+    {
+        "name": "gmail reply chain",
+        "body": (
+            "Thursday at 2pm works. I'll book the small conference room.\n\n"
+            "On Mon, Jun 3, 2024 at 9:12 AM Ada Lovelace <ada@example.com> wrote:\n" + HISTORY + "\n"
+            "> On Sun, Jun 2, 2024 at 6:40 PM Grace Hopper <grace@example.com> wrote:\n>> " + "Draft attached. " * 80
+        ),
+        "keep": ["Thursday at 2pm works", "conference room"],
+        "drop": ["left comments", "Draft attached"],
+    },
+    {
+        "name": "wrapped gmail header",
+        "body": (
+            "Approved, go ahead with the vendor.\n\n"
+            "On Mon, Jun 3, 2024 at 9:12 AM Ada Lovelace from Procurement <\nada.lovelace@example.com> wrote:\n"
+            + HISTORY
+        ),
+        "keep": ["Approved, go ahead"],
+        "drop": ["left comments", "Procurement"],
+    },
+    {
+        "name": "outlook reply",
+        "body": (
+            "Numbers look right to me, please send the invoice.\n\n"
+            "From: Bob Smith <bob@example.com>\nSent: Monday, June 3, 2024 8:01 AM\nTo: Ada\nSubject: RE: Q2 invoice\n\n"
+            + "Here are the Q2 figures you asked for, broken down by region and product line. " * 30
+        ),
+        "keep": ["please send the invoice"],
+        "drop": ["Q2 figures you asked for", "Sent: Monday"],
+    },
+    {
+        "name": "newsletter",
+        "body": (
+            "This week in product: dark mode ships to all users on Tuesday, and the new export API is in beta.\n\n"
+            "Read the full release notes on our blog.\n\n"
+            "Join our webinar on June 12 to see the roadmap.\n\n"
+            "You are receiving this email because you signed up for product updates.\n"
+            "Unsubscribe | Manage your email preferences | View this email in your browser\n"
+            "Acme Inc, 123 Market Street, San Francisco, CA 94105\n"
+            "Privacy Policy | Terms of Service\n"
+            "(c) 2024 Acme Inc. All rights reserved.\n"
+        ),
+        "keep": ["dark mode ships", "webinar on June 12"],
+        "drop": ["Unsubscribe", "123 Market Street", "All rights reserved"],
+    },
+    {
+        "name": "signature",
+        "body": (
+            "Hi Ada,\n\nThe contract is signed; countersigned copy attached. Payment terms are net 30.\n\n"
+            "Best regards,\nGrace Hopper\nVP Engineering, Acme Inc\n+1 (555) 010-0100\nwww.acme.example\n"
+        ),
+        "keep": ["contract is signed", "net 30", "Best regards"],
+        "drop": ["VP Engineering", "555"],
+    },
+    {
+        "name": "mobile reply",
+        "body": "Running 10 minutes late, start without me.\n\nSent from my iPhone\n",
+        "keep": ["Running 10 minutes late"],
+        "drop": ["Sent from my iPhone"],
+    },
+    {
+        "name": "delimiter + confidentiality",
+        "body": (
+            "Please review the attached NDA before Friday's call.\n\n"
+            "-- \nLegal Team\nAcme Inc\n"
+            "This email and any attachments are confidential and intended solely for the addressee.\n"
+        ),
+        "keep": ["review the attached NDA"],
+        "drop": ["Legal Team", "confidential"],
+    },
+    {
+        "name": "bare forward",
+        "body": (
+            "---------- Forwarded message ---------\nFrom: Bob Smith <bob@example.com>\nDate: Mon, Jun 3, 2024\n\n"
+            "The server migration is moved to Saturday night."
+        ),
+        "keep": ["migration is moved to Saturday"],
+        "drop": [],
+    },
+    # Sign-offs and delimiters that aren't followed by a signature: nothing may be cut
+    {
+        "name": "opens with thanks",
+        "body": "Hi Sam,\n\nThanks!\nThe deploy moved to Friday 5pm.\nPlease confirm by noon.\n\nAlex",
+        "keep": ["deploy moved to Friday 5pm", "confirm by noon"],
+        "drop": [],
+    },
+    {
+        "name": "thank you, then details",
+        "body": "Thank you.\nInvoice #4411 is overdue.\nAmount: $12,400\nDue: Oct 30",
+        "keep": ["Invoice #4411 is overdue", "$12,400", "Oct 30"],
+        "drop": [],
+    },
+    {
+        "name": "-- as a separator",
+        "body": "Meeting notes\n-- \nAction: ship v2 on Monday",
+        "keep": ["Meeting notes", "ship v2 on Monday"],
+        "drop": [],
+    },
+    {
+        "name": "cheers, then more text",
+        "body": (
+            "Quick update on the migration.\n\nCheers\nwe also need the staging keys rotated\n"
+            "and the old bucket deleted by Friday"
+        ),
+        "keep": ["staging keys rotated", "old bucket deleted"],
+        "drop": [],
+    },
+]
+
+REPORT_PARAGRAPH = (
+    "Regional results: revenue grew in every region this quarter, led by EMEA, while APAC margins slipped "
+    "because of higher logistics costs. Headcount stayed flat and hiring resumes in the autumn. "
+)
+LONG_REPORT = "\n\n".join(REPORT_PARAGRAPH * 6 for _ in range(60))
+
+
+def check_samples(failures):
+    from gmail.email_preprocess import prepare_email_body
+
+    total_before = total_after = 0
+    print(f"{'sample':<30}{'before':>8}{'after':>8}{'saved':>8}")
+    for sample in SAMPLES:
+        prepared, before, after = prepare_email_body(sample["body"])
+        total_before += before
+        total_after += after
+        print(f"{sample['name']:<30}{before:>8}{after:>8}{1 - after / before:>8.0%}")
+        for phrase in sample["keep"]:
+            if phrase not in prepared:
+                failures.append(f"{sample['name']}: lost {phrase!r}")
+        for phrase in sample["drop"]:
+            if phrase in prepared:
+                failures.append(f"{sample['name']}: kept {phrase!r}")
+    print(f"{'total':<30}{total_before:>8}{total_after:>8}{1 - total_after / total_before:>8.0%}")
+
+
+def check_map_reduce(failures):
+    import gmail.gmail_integration as gmail_integration
+    from gmail.email_preprocess import EMAIL_BODY_TOKEN_BUDGET, EMAIL_CHUNK_TOKENS, count_tokens, prepare_email_body
+    from gmail.summary_store import summary_store
+
+    summary_store.collection = FakeCollection()
+    summarizer = FakeSummarizer()
+    gmail_integration.openai = summarizer
+
+    prepared, before, after = prepare_email_body(LONG_REPORT)
+    if after > EMAIL_BODY_TOKEN_BUDGET + 10:
+        failures.append(f"long report not capped: {after} tokens")
+    batches = gmail_integration._pack_summary_batches([("short", "See you then."), ("report", prepared), ("short2", "Ok!")])
+    if [[message_id for message_id, _ in batch] for batch in batches] != [["short"], ["report"], ["short2"]]:
+        failures.append(f"long report shared a batch: {batches}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = gmail_integration._summarize_and_store([("report", prepared)])["report"]
+    chunks = (after + EMAIL_CHUNK_TOKENS - 1) // EMAIL_CHUNK_TOKENS
+    map_requests = [emails for emails, _ in summarizer.requests[:-1]]
+    # The fake echoes whole chunks as their "summaries", so only map prompts are representative in size
+    largest_prompt = max(tokens for _, tokens in summarizer.requests[:-1])
+    print(f"\nlong report: {before} tokens -> {after} after the cap -> {sum(map_requests)} chunks of <= {EMAIL_CHUNK_TOKENS}")
+    print(f"requests: {len(map_requests)} map ({map_requests} chunks each) + 1 reduce; largest prompt ~{largest_prompt} tokens")
+    if not summary.startswith("Summary: Part 1:"):
+        failures.append(f"long report wasn't reduced from part summaries: {summary[:80]!r}")
+    if sum(map_requests) < chunks or len(map_requests) >= sum(map_requests):
+        failures.append(f"map step: {map_requests} for ~{chunks} chunks")
+    if largest_prompt > gmail_integration.SUMMARY_BATCH_TOKEN_BUDGET + 200:
+        failures.append(f"a request carried ~{largest_prompt} tokens")
+    for chunk in gmail_integration.split_into_chunks(prepared):
+        if count_tokens(chunk) > EMAIL_CHUNK_TOKENS:
+            failures.append(f"chunk of {count_tokens(chunk)} tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    from gmail.email_preprocess import _get_encoding
+
+    print(f"token counts: {'tiktoken' if _get_encoding() is not None else 'estimated (~4 chars/token)'}\n")
+    failures = []
+    check_samples(failures)
+    check_map_reduce(failures)
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Accuracy and latency of the embedding tier against the current NLI path.
+
+Runs the labelled utterance set from benchmarks.nli_backends through:
+  - nli:     zero-shot bart-large-mnli only (the previous path)
+  - cascade: embedding tier, falling back to NLI when the margin is low
+for each margin threshold given.
+
+Usage: python -m benchmarks.embedding_tier [--margins 0.04 0.08 0.12]
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.nli_backends import LABELLED_UTTERANCES
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _summary(name, predictions, latencies, fast_hits=None):
+    expected = [label for _, label in LABELLED_UTTERANCES]
+    accuracy = sum(p == e for p, e in zip(predictions, expected)) / len(expected)
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    fast = f"{fast_hits / len(expected):>9.0%}" if fast_hits is not None else f"{'-':>9}"
+    print(f"{name:<16}{accuracy:>9.0%}{statistics.mean(latencies):>10.1f}{p95:>9.1f}{fast}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.04, 0.08, 0.12])
+    args = parser.parse_args()
+
+    from embedding_classifier import EmbeddingIntentClassifier
+    from nli_backends import load_classifier
+    from refined_nlp import CANDIDATE_LABELS
+
+    nli = load_classifier()
+    embedder = EmbeddingIntentClassifier()
+    nli(LABELLED_UTTERANCES[0][0], CANDIDATE_LABELS)
+    embedder(LABELLED_UTTERANCES[0][0])
+
+    nli_results, nli_latencies = [], []
+    emb_results, emb_latencies = [], []
+    for text, _ in LABELLED_UTTERANCES:
+        result, ms = _timed(nli, text, CANDIDATE_LABELS)
+        nli_results.append(result["labels"][0])
+        nli_latencies.append(ms)
+        result, ms = _timed(embedder, text)
+        emb_results.append(result)
+        emb_latencies.append(ms)
+
+    print(f"{'path':<16}{'accuracy':>9}{'mean ms':>10}{'p95 ms':>9}{'fast tier':>9}")
+    _summary("nli", nli_results, nli_latencies)
+    _summary("embedding only", [r["labels"][0] for r in emb_results], emb_latencies, len(emb_results))
+
+    for margin in args.margins:
+        predictions, latencies, fast_hits = [], [], 0
+        for result, emb_ms, nli_label, nli_ms in zip(emb_results, emb_latencies, nli_results, nli_latencies):
+            if result["scores"][0] - result["scores"][1] >= margin:
+                predictions.append(result["labels"][0])
+                latencies.append(emb_ms)
+                fast_hits += 1
+            else:
+                predictions.append(nli_label)
+                latencies.append(emb_ms + nli_ms)
+        _summary(f"cascade @{margin:.2f}", predictions, latencies, fast_hits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Parity check and micro-benchmark for the compiled intent pattern matcher.
+
+Compares match_intent_pattern against the previous implementation (one
+re.search per pattern, in PATTERN_INTENTS order) on a few thousand generated
+messages: the winning intent and the matched span must be identical.
+Exits non-zero on any mismatch.
+
+Usage: python -m benchmarks.intent_matcher [--messages 5000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from intent_patterns import PATTERN_INTENTS, match_intent_pattern
+
+FRAGMENTS = [
+    "schedule a meeting", "set up a call", "book a slot", "next friday", "calendar event",
+    "create a hubspot contact", "add crm contact", "update hubspot contact id 42 to jane doe",
+    "change crm email for bob smith to bob@example.com", "modify a crm contact",
+    "send an email", "write a note", "draft a message", "email to", "alice@example.com",
+    "send a slack message", "post a note to slack", "message to #general", "post in #dev",
+    "get slack messages", "check channel history", "show me slack conversation",
+    "get my emails", "check inbox", "read my mail", "fetch emails",
+    "get hubspot contacts", "show me crm", "find customer", "retrieve contacts",
+    "please", "tomorrow at 3pm", "about the quarterly report", "with the team", "thanks!",
+    "what's the weather like", "tell me a joke", "for 2 hours", "asap", "\n",
+]
+
+# Free text without intent keywords: the common case that falls through to the model tiers
+NATURAL_FRAGMENTS = [
+    "can we", "meet up", "tomorrow afternoon", "to go over", "the roadmap", "what's the capital of france",
+    "let john know", "the report is ready", "anything new", "in my inbox", "who are our", "newest customers",
+    "catch me up", "on the engineering chat", "how does compound interest work", "thanks", "sometime next week",
+]
+
+
+def legacy_match(text):
+    text = text.lower()
+    for intent, patterns in PATTERN_INTENTS.items():
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match:
+                return intent, match.span()
+    return None
+
+
+def generate_messages(count, fragments, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(fragments, k=rng.randint(1, 6))) for _ in range(count)]
+
+
+def _time(fn, messages, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            fn(message)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    keyword_messages = generate_messages(args.messages, FRAGMENTS)
+    natural_messages = generate_messages(args.messages, NATURAL_FRAGMENTS)
+    messages = keyword_messages + natural_messages
+
+    mismatches = [(m, legacy_match(m), match_intent_pattern(m))
+                  for m in messages if legacy_match(m) != match_intent_pattern(m)]
+    for message, expected, got in mismatches[:20]:
+        print(f"mismatch {message!r}: legacy={expected} compiled={got}")
+    print(f"parity: {len(messages) - len(mismatches)}/{len(messages)} identical\n")
+
+    print(f"{'messages':<18}{'legacy us':>10}{'compiled us':>13}{'speedup':>9}")
+    for name, batch in (("keyword-heavy", keyword_messages), ("free text", natural_messages)):
+        legacy = _time(legacy_match, batch) / len(batch) * 1e6
+        compiled = _time(match_intent_pattern, batch) / len(batch) * 1e6
+        print(f"{name:<18}{legacy:>10.1f}{compiled:>13.1f}{legacy / compiled:>8.1f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Throughput of the NLI tier against concurrency, with and without micro-batching.
+
+By default the classifier is a stub whose cost is a fixed per-call overhead
+plus a smaller per-(message, label) cost, which is roughly how a padded
+forward batch behaves on CPU. Pass --real to use the configured NLI backend.
+
+First checks, exiting non-zero on a failure, that no caller is left
+waiting: a batch_fn returning too few results fails every caller in the
+batch, one failing partway through its results leaves the worker running,
+and a batch slower than the timeout raises TimeoutError in submit().
+
+Usage: python -m benchmarks.micro_batching [--real] [--max-batch-size 8] [--max-wait-ms 5]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from micro_batcher import MicroBatcher
+
+LABELS = [
+    "schedule_meeting", "create_crm", "update_crm", "send_email", "retrieve_email",
+    "retrieve_slack", "send_slack", "retrieve_crm", "general",
+]
+MESSAGE = "can we meet tomorrow afternoon to go over the roadmap"
+
+
+def stub_classifier(call_overhead_ms, pair_cost_ms):
+    # The lock stands in for the model saturating the CPU: calls don't overlap
+    lock = threading.Lock()
+
+    def classify(texts, labels, batch_size=None):
+        texts_list = texts if isinstance(texts, list) else [texts]
+        with lock:
+            time.sleep((call_overhead_ms + pair_cost_ms * len(texts_list) * len(labels)) / 1000)
+        results = [{"labels": list(labels), "scores": [1.0] + [0.0] * (len(labels) - 1)} for _ in texts_list]
+        return results if isinstance(texts, list) else results[0]
+    return classify
+
+
+def submit_all(batcher, items, wait_s=5):
+    """Outcome per item ("ok", an exception name, or "blocked") of submitting them from separate threads."""
+    outcomes = {}
+
+    def worker(item):
+        try:
+            batcher.submit(item)
+            outcomes[item] = "ok"
+        except Exception as e:
+            outcomes[item] = type(e).__name__
+
+    threads = [threading.Thread(target=worker, args=(item,), daemon=True) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(wait_s)
+    return [outcomes.get(item, "blocked") for item in items]
+
+
+def check_failures(failures):
+    short = MicroBatcher(lambda items: items[:-1], max_batch_size=8, max_wait_ms=50, timeout_s=2)
+    outcomes = submit_all(short, ["a", "b", "c"])
+    if outcomes != ["ValueError"] * 3:
+        failures.append(f"batch_fn returning too few results: {outcomes}")
+
+    def fails_partway(items):
+        yield items[0]
+        raise RuntimeError("model crashed")
+
+    partway = MicroBatcher(fails_partway, max_batch_size=8, max_wait_ms=50, timeout_s=2)
+    outcomes = submit_all(partway, ["a", "b"])
+    if outcomes != ["RuntimeError"] * 2:
+        failures.append(f"batch_fn failing partway: {outcomes}")
+    partway.batch_fn = lambda items: items
+    outcomes = submit_all(partway, ["c", "d"])
+    if outcomes != ["ok", "ok"]:
+        failures.append(f"after a failed batch: {outcomes}")
+
+    slow = MicroBatcher(lambda items: time.sleep(0.5) or items, max_batch_size=8, timeout_s=0.1)
+    try:
+        slow.submit("a")
+        failures.append("a batch slower than the timeout returned")
+    except TimeoutError:
+        pass
+
+
+def measure(batcher, concurrency, requests_per_worker):
+    total = concurrency * requests_per_worker
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: batcher.submit(MESSAGE), range(total)))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--real", action="store_true", help="use the configured NLI backend instead of a stub")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--requests-per-worker", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--call-overhead-ms", type=float, default=40)
+    parser.add_argument("--pair-cost-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    failures = []
+    check_failures(failures)
+    print(f"checks: {'ok' if not failures else 'FAILED'}\n")
+
+    if args.real:
+        from nli_backends import load_classifier
+        classifier = load_classifier()
+    else:
+        classifier = stub_classifier(args.call_overhead_ms, args.pair_cost_ms)
+
+    def batch_fn(texts):
+        results = classifier(texts, LABELS, batch_size=len(texts) * len(LABELS))
+        return [results] if isinstance(results, dict) else results
+
+    unbatched = MicroBatcher(batch_fn, max_batch_size=1)
+    batched = MicroBatcher(batch_fn, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    print(f"{'concurrency':>11}{'unbatched req/s':>17}{'batched req/s':>15}{'speedup':>9}")
+    for concurrency in args.concurrency:
+        base = measure(unbatched, concurrency, args.requests_per_worker)
+        fast = measure(batched, concurrency, args.requests_per_worker)
+        print(f"{concurrency:>11}{base:>17.1f}{fast:>15.1f}{fast / base:>8.1f}x")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Parity, latency and memory comparison of the zero-shot classifier backends.
+
+Each backend runs in its own subprocess (so peak RSS is measured in isolation)
+over a labelled set of utterances that miss the regex tier in bert_classify.
+The run fails if the ONNX backend's top label disagrees with PyTorch on more
+than the allowed fraction of utterances.
+
+Usage: python -m benchmarks.nli_backends [--backends pytorch onnx] [--min-agreement 1.0]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+# Utterances that don't hit any regex pattern, so they reach the NLI tier
+LABELLED_UTTERANCES = [
+    ("can we meet tomorrow afternoon to go over the roadmap", "schedule_meeting"),
+    ("put a sync with the design team on my calendar for friday", "schedule_meeting"),
+    ("i need thirty minutes with sarah sometime next week", "schedule_meeting"),
+    ("add jane doe as a new lead in our customer database", "create_crm"),
+    ("register a new customer record for acme corp", "create_crm"),
+    ("log a new prospect named tom baker", "create_crm"),
+    ("jane's phone number changed, fix her record", "update_crm"),
+    ("correct the last name on the acme customer entry", "update_crm"),
+    ("the customer record for bob has the wrong company", "update_crm"),
+    ("let john know the report is ready by mail", "send_email"),
+    ("shoot the client a note thanking them for the meeting", "send_email"),
+    ("reply to the vendor that we accept the quote", "send_email"),
+    ("anything new in my inbox?", "retrieve_email"),
+    ("did the recruiter write back to me", "retrieve_email"),
+    ("what did finance send me this morning", "retrieve_email"),
+    ("what has the team been saying in the dev channel", "retrieve_slack"),
+    ("catch me up on the engineering chat", "retrieve_slack"),
+    ("any updates posted in the marketing room today", "retrieve_slack"),
+    ("tell the engineering channel the deploy is done", "send_slack"),
+    ("let everyone in the team chat know standup is cancelled", "send_slack"),
+    ("ping the sales room that the demo moved", "send_slack"),
+    ("who are our newest customers", "retrieve_crm"),
+    ("list the leads we added this week", "retrieve_crm"),
+    ("pull up the people in our sales pipeline", "retrieve_crm"),
+    ("what's the capital of france", "general"),
+    ("tell me a joke", "general"),
+    ("how does compound interest work", "general"),
+]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(backend):
+    """Loads one backend, classifies every utterance and prints a JSON report."""
+    from nli_backends import load_classifier
+    from refined_nlp import CANDIDATE_LABELS
+
+    rss_before = _peak_rss_mb()
+    started = time.perf_counter()
+    classifier = load_classifier(backend)
+    load_seconds = time.perf_counter() - started
+
+    classifier(LABELLED_UTTERANCES[0][0], CANDIDATE_LABELS)  # warmup
+
+    predictions, latencies = [], []
+    for text, _ in LABELLED_UTTERANCES:
+        started = time.perf_counter()
+        result = classifier(text, CANDIDATE_LABELS)
+        latencies.append((time.perf_counter() - started) * 1000)
+        predictions.append(result["labels"][0])
+
+    print(json.dumps({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "model_rss_mb": _peak_rss_mb() - rss_before,
+        "latencies_ms": latencies,
+        "predictions": predictions,
+    }))
+
+
+def run_backend(backend):
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.nli_backends", "--worker", backend],
+        capture_output=True, text=True, check=True,
+    )
+    # The report is the last line; anything before it is model loading chatter
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "onnx"])
+    parser.add_argument("--min-agreement", type=float, default=1.0,
+                        help="minimum fraction of top labels that must match the first backend")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker)
+        return
+
+    expected = [label for _, label in LABELLED_UTTERANCES]
+    reports = [run_backend(backend) for backend in args.backends]
+    reference = reports[0]
+
+    print(f"{'backend':<10}{'load s':>8}{'rss MB':>9}{'p50 ms':>9}{'p95 ms':>9}{'accuracy':>10}{'agreement':>11}")
+    failed = False
+    for report in reports:
+        latencies = sorted(report["latencies_ms"])
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        accuracy = sum(p == e for p, e in zip(report["predictions"], expected)) / len(expected)
+        agreement = sum(p == r for p, r in zip(report["predictions"], reference["predictions"])) / len(expected)
+        print(f"{report['backend']:<10}{report['load_seconds']:>8.1f}{report['model_rss_mb']:>9.0f}"
+              f"{statistics.median(latencies):>9.1f}{p95:>9.1f}{accuracy:>10.0%}{agreement:>11.0%}")
+        if agreement < args.min_agreement:
+            failed = True
+
+    for report in reports[1:]:
+        for (text, _), ref, got in zip(LABELLED_UTTERANCES, reference["predictions"], report["predictions"]):
+            if ref != got:
+                print(f"  mismatch [{report['backend']}] {text!r}: {reference['backend']}={ref} {report['backend']}={got}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Equivalence check and benchmark for normalize_text.
+
+Compares the compiled normalizer in text_normalizer against a frozen copy of
+the previous implementation (~100 sequential re.sub passes) on generated
+messages full of typos and phrase variants, then times both, with and without
+memoization. Exits non-zero if any output differs.
+
+Usage: python -m benchmarks.normalize_text [--messages 5000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from text_normalizer import normalize_text
+
+FRAGMENTS = [
+    "sned a mail to bob@example.com", "send out an email", "send a slack message to #dev", "post to slack",
+    "slack msg", "message on slack", "get emails", "check slack", "show me contacts", "get hubspot contact",
+    "scheduel a meetinf", "nex week", "next weeks", "tmrw at 3pm", "on wed at 10:30am", "for 2h", "for 3 hrs",
+    "45 min", "90m", "teh report", "abuot the launch", "woth alice", "fomr carol", "retreive my conacts",
+    "Fri", "SUNDAY", "thurs at 9am", "yest", "tonigt", "please", "thanks!", "\n", "  extra   spaces  ",
+    "sed it", "sendd", "send send slack", "send a msg", "contact", "re: quarterly update",
+]
+
+
+def legacy_normalize_text(text: str) -> str:
+    """Frozen copy of normalize_text before the compiled rewrite engine."""
+    if not text:
+        return ""
+        
+    # Convert to lowercase
+    normalized = text.lower()
+    
+    # Fix common typos for all intents
+    typo_corrections = {
+        # General typos
+        r'\bnex\b': 'next',
+        r'\bwoth\b': 'with',
+        r'\bfro\b': 'for',
+        r'\bwiht\b': 'with',
+        r'\bfomr\b': 'from',
+        r'\bteh\b': 'the',
+        r'\babuot\b': 'about',
+        r'\bqucik\b': 'quick',
+        r'\bscheduel\b': 'schedule',
+        r'\bshcedule\b': 'schedule',
+        r'\bmeeting\b': 'meeting',
+        r'\bmeetinf\b': 'meeting',
+        r'\bmeetin\b': 'meeting',
+        r'\bschedul\b': 'schedule',
+        r'\bschdul\b': 'schedule',
+        r'\bemial\b': 'email',
+        r'\bemail\b': 'email',
+        r'\bemil\b': 'email',
+        r'\bsned\b': 'send',
+        r'\bsed\b': 'send',
+        r'\bsendd\b': 'send',
+        r'\bsalck\b': 'slack',
+        r'\bslak\b': 'slack',
+        r'\bslck\b': 'slack',
+        r'\bmesage\b': 'message',
+        r'\bmessg\b': 'message',
+        r'\bmsg\b': 'message',
+        r'\bretreive\b': 'retrieve',
+        r'\bretreve\b': 'retrieve',
+        r'\bretriev\b': 'retrieve',
+        r'\breatrieve\b': 'retrieve',
+        r'\bretrve\b': 'retrieve',
+        r'\bconacts\b': 'contacts',
+        r'\bcontcts\b': 'contacts',
+        r'\bcontact\b': 'contacts',
+        r'\btonigt\b': 'tonight',
+        r'\btomoro\b': 'tomorrow',
+        r'\btomorow\b': 'tomorrow',
+        r'\btmrw\b': 'tomorrow',
+        r'\btmr\b': 'tomorrow',
+        r'\btoday\b': 'today',
+        r'\btdy\b': 'today',
+        r'\byesterdy\b': 'yesterday',
+        r'\byestday\b': 'yesterday',
+        r'\byest\b': 'yesterday',
+        r'\bmonday\b': 'monday',
+        r'\bmon\b': 'monday',
+        r'\btuesday\b': 'tuesday',
+        r'\btue\b': 'tuesday',
+        r'\btues\b': 'tuesday',
+        r'\bwednesday\b': 'wednesday',
+        r'\bwed\b': 'wednesday',
+        r'\bthursday\b': 'thursday',
+        r'\bthu\b': 'thursday',
+        r'\bthur\b': 'thursday',
+        r'\bthurs\b': 'thursday',
+        r'\bfriday\b': 'friday',
+        r'\bfri\b': 'friday',
+        r'\bsaturday\b': 'saturday',
+        r'\bsat\b': 'saturday',
+        r'\bsunday\b': 'sunday',
+        r'\bsun\b': 'sunday',
+    }
+    
+    # Apply all typo corrections
+    for pattern, replacement in typo_corrections.items():
+        normalized = re.sub(pattern, replacement, normalized)
+    
+    # Standardize time formats
+    normalized = re.sub(r'(\d{1,2})pm', r'\1 pm', normalized)
+    normalized = re.sub(r'(\d{1,2})am', r'\1 am', normalized)
+    normalized = re.sub(r'(\d{1,2}):(\d{2})pm', r'\1:\2 pm', normalized)
+    normalized = re.sub(r'(\d{1,2}):(\d{2})am', r'\1:\2 am', normalized)
+    
+    # Standardize date phrases
+    normalized = re.sub(r'next\s+weeks?', 'next week', normalized)
+    normalized = re.sub(r'(\d+)\s*h(\s|$)', r'\1 hour\2', normalized)
+    normalized = re.sub(r'(\d+)\s*hr(\s|$)', r'\1 hour\2', normalized)
+    normalized = re.sub(r'(\d+)\s*hrs(\s|$)', r'\1 hours\2', normalized)
+    normalized = re.sub(r'(\d+)\s*min(\s|$)', r'\1 minute\2', normalized)
+    normalized = re.sub(r'(\d+)\s*m(\s|$)', r'\1 minute\2', normalized)
+    normalized = re.sub(r'(\d+)\s*mins(\s|$)', r'\1 minutes\2', normalized)
+    
+    # Standardize email related phrases
+    normalized = re.sub(r'send\s+mail', 'send email', normalized)
+    normalized = re.sub(r'send\s+a\s+mail', 'send email', normalized)
+    normalized = re.sub(r'send\s+a\s+email', 'send email', normalized)
+    normalized = re.sub(r'send\s+out\s+an?\s+email', 'send email', normalized)
+    
+    # Standardize slack related phrases
+    normalized = re.sub(r'send\s+a\s+slack', 'send slack', normalized)
+    normalized = re.sub(r'send\s+a\s+slack\s+message', 'send slack', normalized)
+    normalized = re.sub(r'post\s+to\s+slack', 'send slack', normalized)
+    normalized = re.sub(r'post\s+on\s+slack', 'send slack', normalized)
+    normalized = re.sub(r'slack\s+message', 'send slack', normalized)
+    
+    # Prevent duplication of "send" for slack messages
+    normalized = re.sub(r'send\s+send\s+slack', 'send slack', normalized)
+    normalized = re.sub(r'send\s+msg', 'send message', normalized)
+    normalized = re.sub(r'send\s+a\s+msg', 'send message', normalized)
+    
+    # Standardize slack message recognition with additional patterns
+    normalized = re.sub(r'slack\s+msg', 'send slack', normalized)
+    normalized = re.sub(r'message\s+on\s+slack', 'send slack', normalized)
+    normalized = re.sub(r'message\s+in\s+slack', 'send slack', normalized)
+    
+    # Standardize retrieval phrases
+    normalized = re.sub(r'get\s+emails?', 'retrieve email', normalized)
+    normalized = re.sub(r'check\s+emails?', 'retrieve email', normalized)
+    normalized = re.sub(r'show\s+me\s+emails?', 'retrieve email', normalized)
+    normalized = re.sub(r'get\s+slack\s+messages?', 'retrieve slack', normalized)
+    normalized = re.sub(r'check\s+slack', 'retrieve slack', normalized)
+    normalized = re.sub(r'show\s+me\s+slack\s+messages?', 'retrieve slack', normalized)
+    normalized = re.sub(r'get\s+contacts?', 'retrieve crm', normalized)
+    normalized = re.sub(r'show\s+me\s+contacts?', 'retrieve crm', normalized)
+    normalized = re.sub(r'get\s+hubspot\s+contacts?', 'retrieve crm', normalized)
+    normalized = re.sub(r'show\s+hubspot\s+contacts?', 'retrieve crm', normalized)
+    
+    return normalized.strip()
+
+
+def generate_messages(count, seed=11):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(FRAGMENTS, k=rng.randint(1, 7))) for _ in range(count)]
+
+
+def _time(fn, messages, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            fn(message)
+        best = min(best, time.perf_counter() - started)
+    return best / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    messages = generate_messages(args.messages)
+    uncached = normalize_text.__wrapped__
+
+    mismatches = [(m, legacy_normalize_text(m), uncached(m))
+                  for m in messages if legacy_normalize_text(m) != uncached(m)]
+    for message, expected, got in mismatches[:20]:
+        print(f"mismatch {message!r}:\n  legacy   {expected!r}\n  compiled {got!r}")
+    print(f"equivalence: {len(messages) - len(mismatches)}/{len(messages)} identical\n")
+
+    # A /chat request normalizes the same text up to four times
+    # (chat_endpoint, extract_email_and_message, the Slack extractors)
+    per_request = lambda fn: lambda message: [fn(message) for _ in range(4)]
+    normalize_text.cache_clear()
+    legacy = _time(per_request(legacy_normalize_text), messages, repeat=1)
+    compiled = _time(per_request(uncached), messages, repeat=1)
+    memoized = _time(per_request(normalize_text), messages, repeat=1)
+    print("per request (4 calls on the same text)")
+    print(f"  legacy          {legacy:8.1f} us")
+    print(f"  compiled        {compiled:8.1f} us  ({legacy / compiled:.1f}x)")
+    print(f"  compiled+memo   {memoized:8.1f} us  ({legacy / memoized:.1f}x)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Recurrence parsing check: phrases -> RRULE.
+
+Runs scheduling phrases through normalize_datetime_input and
+datetime_grammar.recurrence_rule with a fixed start (Thursday 2026-10-15,
+9am Indianapolis time) and compares the RRULE with the expected one:
+  - end dates in words, ISO and numeric form become UNTIL at the end of
+    that local day, in UTC
+  - an end date that can't be read, or has passed, gives a single event
+  - "weekly"/"monthly" alone name a kind of meeting; they only repeat with
+    a cue ("recurring") or a limit
+  - time ranges ("from 2 until 4 pm") aren't end dates
+
+Exits non-zero on any mismatch.
+
+Usage: python -m benchmarks.recurrence
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from datetime import datetime
+
+import pytz
+
+CASES = [
+    ("every weekday until 2026-12-01 at 9am", "RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR;UNTIL=20261202T045959Z"),
+    ("every monday until 12/1/2026 at 10am", "RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20261202T045959Z"),
+    ("every monday until 12/1 at 10am", "RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20261202T045959Z"),
+    ("every friday until dec 5, 2026 at 4pm", "RRULE:FREQ=WEEKLY;BYDAY=FR;UNTIL=20261206T045959Z"),
+    ("every day until 15 july at 9am", "RRULE:FREQ=DAILY;UNTIL=20270716T035959Z"),
+    ("every week until november 2nd", "RRULE:FREQ=WEEKLY;UNTIL=20261103T045959Z"),
+    ("every tuesday and thursday 8 times", "RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=8"),
+    ("every other week for the next 2 months", "RRULE:FREQ=WEEKLY;INTERVAL=2;UNTIL=20261215T045959Z"),
+    ("every tuesday from 2 until 4 pm", "RRULE:FREQ=WEEKLY;BYDAY=TU"),
+    ("every monday until further notice", "RRULE:FREQ=WEEKLY;BYDAY=MO"),
+    ("every monday until the launch", None),
+    ("every monday until 13/45/2026", None),
+    ("every monday until 2026-02-30", None),
+    ("every weekday until 2025-12-01", None),
+    ("weekly sync with design tomorrow at 3pm", None),
+    ("monthly review with finance", None),
+    ("recurring weekly sync with design", "RRULE:FREQ=WEEKLY"),
+    ("weekly sync 6 times", "RRULE:FREQ=WEEKLY;COUNT=6"),
+    ("biweekly 1:1 until dec 31", "RRULE:FREQ=WEEKLY;INTERVAL=2;UNTIL=20270101T045959Z"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    from datetime_grammar import recurrence_rule
+    from nlp_datetime_cleaner import LOCAL_TIMEZONE, normalize_datetime_input
+
+    local_tz = pytz.timezone(LOCAL_TIMEZONE)
+    starts = {"zoned": local_tz.localize(datetime(2026, 10, 15, 9)), "naive": datetime(2026, 10, 15, 9)}
+    failures = []
+    for phrase, expected in CASES:
+        for kind, start in starts.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = recurrence_rule(normalize_datetime_input(phrase), start, local_tz)
+            rrule = result and result[0]
+            if rrule != expected:
+                failures.append(f"{phrase!r} ({kind} start): {rrule!r}, expected {expected!r}")
+        print(f"{phrase:<45}{expected or 'single event'}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Latency and accuracy suite for the /chat NLP front end.
+
+Runs the versioned corpus (benchmarks/corpus/) through each stage of the hot
+path and reports per-stage latency distributions plus accuracy:
+  normalize_text   text normalizer (memoization bypassed)
+  regex            match_intent_pattern
+  nli              NLI tier through the micro-batcher
+  classify         full intent cascade, uncached (intent accuracy)
+  datetime         normalize_datetime_input + intelligent_date_parse, frozen clock
+  modifiers        extract_intent_modifiers with the labelled intent
+
+The report is compared against a stored baseline (benchmarks/baseline.json by
+default); a stage whose p50 or p95 got slower than the tolerance allows, or
+any accuracy drop, fails the run. Baselines are machine specific: record one
+with --save-baseline on the machine that runs the comparison.
+
+--stub-models swaps the registry models for offline stubs and disables the
+GPT tier, so the suite runs without network access or model downloads.
+
+Usage: python -m benchmarks.run [--stub-models] [--corpus v1] [--repeat 20]
+                                [--baseline PATH] [--save-baseline] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+
+from benchmarks.common import frozen_clock, install_stub_models, latency_summary, load_corpus, timed
+
+DEFAULT_BASELINE = pathlib.Path(__file__).parent / "baseline.json"
+
+# Differences below this many microseconds are timer noise, not regressions
+MIN_REGRESSION_US = 5.0
+
+
+def run_stages(corpus, repeat):
+    import nlp_datetime_cleaner
+    import refined_nlp
+    from intent_patterns import match_intent_pattern
+    from nlp_datetime_cleaner import extract_intent_modifiers, intelligent_date_parse, normalize_datetime_input
+    from text_normalizer import normalize_text
+
+    intents = corpus["intents"]
+    samples = {stage: [] for stage in ("normalize_text", "regex", "nli", "classify", "datetime", "modifiers")}
+    predictions = {}
+    regex_hits = 0
+    parsed_datetimes = {}
+    extracted_modifiers = {}
+
+    for _ in range(repeat):
+        for item in intents:
+            text = item["text"]
+            _, elapsed = timed(normalize_text.__wrapped__, text)
+            samples["normalize_text"].append(elapsed)
+
+            pattern_match, elapsed = timed(match_intent_pattern, text)
+            samples["regex"].append(elapsed)
+            regex_hits += pattern_match is not None
+
+            if refined_nlp.registry.is_ready("zero_shot_classifier"):
+                _, elapsed = timed(refined_nlp.nli_batcher.submit, text)
+                samples["nli"].append(elapsed)
+
+            (label, _), elapsed = timed(refined_nlp.intent_cascade.classify, text)
+            samples["classify"].append(elapsed)
+            predictions[text] = label
+
+            if "modifiers" in item:
+                modifiers, elapsed = timed(extract_intent_modifiers, text, item["intent"])
+                samples["modifiers"].append(elapsed)
+                extracted_modifiers[text] = modifiers
+
+        with frozen_clock(nlp_datetime_cleaner, corpus["now"], corpus["timezone"]):
+            for item in corpus["datetimes"]:
+                (start, end), elapsed = timed(
+                    lambda text: intelligent_date_parse(normalize_datetime_input(text)), item["text"]
+                )
+                samples["datetime"].append(elapsed)
+                parsed_datetimes[item["text"]] = (_naive_iso(start), _naive_iso(end))
+
+    labelled_modifiers = [item for item in intents if "modifiers" in item]
+    accuracy = {
+        "intent": _ratio(sum(predictions[i["text"]] == i["intent"] for i in intents), len(intents)),
+        "regex_coverage": _ratio(regex_hits, len(intents) * repeat),
+        "datetime": _ratio(
+            sum(parsed_datetimes[d["text"]] == (d["start"], d["end"]) for d in corpus["datetimes"]),
+            len(corpus["datetimes"]),
+        ),
+        "modifiers": _ratio(
+            sum(extracted_modifiers[i["text"]] == i["modifiers"] for i in labelled_modifiers),
+            len(labelled_modifiers),
+        ),
+    }
+    misses = {
+        "intent": [(i["text"], i["intent"], predictions[i["text"]])
+                   for i in intents if predictions[i["text"]] != i["intent"]],
+        "datetime": [(d["text"], d["start"], parsed_datetimes[d["text"]][0])
+                     for d in corpus["datetimes"] if parsed_datetimes[d["text"]] != (d["start"], d["end"])],
+        "modifiers": [(i["text"], i["modifiers"], extracted_modifiers[i["text"]])
+                      for i in labelled_modifiers if extracted_modifiers[i["text"]] != i["modifiers"]],
+    }
+    stages = {stage: latency_summary(values) for stage, values in samples.items()}
+    return stages, accuracy, misses
+
+
+def _naive_iso(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%S") if value else None
+
+
+def _ratio(hits, total):
+    return round(hits / total, 4) if total else None
+
+
+def compare(report, baseline, tolerance):
+    """Returns a list of human-readable regressions (empty if none)."""
+    if (baseline.get("corpus"), baseline.get("stub_models")) != (report["corpus"], report["stub_models"]):
+        return [
+            f"baseline was recorded with corpus={baseline.get('corpus')} stub_models={baseline.get('stub_models')}; "
+            f"this run used corpus={report['corpus']} stub_models={report['stub_models']}"
+        ]
+
+    regressions = []
+    for stage, current in report["stages"].items():
+        previous = baseline["stages"].get(stage, {})
+        for key in ("p50_us", "p95_us"):
+            if key not in current or key not in previous:
+                continue
+            limit = previous[key] * (1 + tolerance)
+            if current[key] > limit and current[key] - previous[key] > MIN_REGRESSION_US:
+                regressions.append(f"{stage} {key}: {current[key]} > {previous[key]} (+{tolerance:.0%} allowed)")
+    for metric, current in report["accuracy"].items():
+        previous = baseline["accuracy"].get(metric)
+        if previous is not None and current is not None and current < previous:
+            regressions.append(f"accuracy {metric}: {current} < {previous}")
+    return regressions
+
+
+def print_report(report, misses):
+    print(f"corpus {report['corpus']} (stub_models={report['stub_models']}, repeat={report['repeat']})\n")
+    print(f"{'stage':<16}{'count':>7}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}")
+    for stage, summary in report["stages"].items():
+        if not summary["count"]:
+            print(f"{stage:<16}{0:>7}{'-':>10}{'-':>10}{'-':>10}{'-':>10}")
+            continue
+        print(f"{stage:<16}{summary['count']:>7}{summary['p50_us']:>10}{summary['p95_us']:>10}"
+              f"{summary['p99_us']:>10}{summary['max_us']:>10}")
+
+    print()
+    for metric, value in report["accuracy"].items():
+        shown = "-" if value is None else f"{value:.1%}"
+        print(f"accuracy {metric:<16}{shown:>8}")
+
+    for kind, rows in misses.items():
+        if rows:
+            print(f"\n{kind} misses:")
+            for text, expected, got in rows:
+                print(f"  {text!r}: expected {expected}, got {got}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-models", action="store_true", help="offline stub models, no GPT tier")
+    parser.add_argument("--corpus", default="v1")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", type=pathlib.Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed latency slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    import refined_nlp
+    from model_registry import registry
+
+    if args.stub_models:
+        install_stub_models()
+        refined_nlp.api_key = None
+    else:
+        registry.load_all()
+
+    corpus = load_corpus(args.corpus)
+    stages, accuracy, misses = run_stages(corpus, args.repeat)
+    report = {
+        "corpus": corpus["version"],
+        "stub_models": args.stub_models,
+        "repeat": args.repeat,
+        "stages": stages,
+        "accuracy": accuracy,
+    }
+    print_report(report, misses)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nno baseline at {args.baseline}; record one with --save-baseline")
+        return
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print("\nREGRESSIONS against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Latency comparison and parity check for the one-pass schedule_meeting slot
+extractor.
+
+Runs the corpus texts (every intent and datetime phrase, treated as a
+schedule_meeting request) plus generated requests mixing dates with
+priority, meeting-type, attendee and topic wording through:
+  legacy   the previous chat_endpoint chain: extract_intent_modifiers on the
+           original text, normalize_datetime_input (one re.sub after
+           another), intelligent_date_parse -> ai_clean_datetime ->
+           parse_event_time, and extract_meeting_description
+  frame    slot_extractor.extract_meeting_frame
+Both sides start from normalize_text()'s output, use the offline stub models
+(so the date rewrite model never answers) and a frozen clock. Slots must be
+identical; exits non-zero on any mismatch.
+
+Usage: python -m benchmarks.slot_extractor [--generated 2000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import sys
+from datetime import datetime
+
+from benchmarks.common import frozen_clock, install_stub_models, latency_summary, load_corpus, timed
+from benchmarks.datetime_grammar import generate_phrases
+
+EXTRAS = [
+    "", "urgent", "high priority", "important", "video", "zoom call", "phone screening", "in-person", "in the office",
+    "face to face", "one on one", "1-on-1", "personal", "interview with the candidate", "with sarah and tom",
+    "with Sam, Priya and Lee", "about the budget", "regarding the Q3 roadmap", "to discuss hiring", "on teams",
+    "conference call", "essential audio sync", "onsite", "individual review", "webex with legal",
+]
+
+
+def legacy_normalize_datetime_input(user_text):
+    """Frozen copy of normalize_datetime_input before its rewrites were precompiled."""
+    text = user_text.lower()
+    text = re.sub(r'\bnex\b', 'next', text)
+    text = re.sub(r'\bmeetinf\b', 'meeting', text)
+    text = re.sub(r'\bmeetin\b', 'meeting', text)
+    text = re.sub(r'for next week', 'next week', text)
+    text = re.sub(r'next week at (\d{1,2}(?::\d{2})?\s*(?:am|pm)?) on (monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
+                  r'next \2 at \1', text)
+    text = re.sub(r'next week on (monday|tuesday|wednesday|thursday|friday|saturday|sunday) at (\d{1,2}(?::\d{2})?\s*(?:am|pm)?)',
+                  r'next \1 at \2', text)
+    text = re.sub(r'next week (on )?(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', r'next \2', text)
+    text = re.sub(r'on (monday|tuesday|wednesday|thursday|friday|saturday|sunday) next week', r'next \1', text)
+    text = re.sub(r'for (monday|tuesday|wednesday|thursday|friday|saturday|sunday) at', r'for next \1 at', text)
+    text = re.sub(r'(\d{1,2})pm', r'\1 pm', text)
+    text = re.sub(r'(\d{1,2})am', r'\1 am', text)
+    return text
+
+
+def legacy_extract_meeting_description(text):
+    """Frozen copy of main.extract_meeting_description."""
+    about_match = re.search(r'(?:about|regarding|concerning|for|on)\s+([^.,!?]+)', text, re.IGNORECASE)
+    if about_match:
+        return about_match.group(1).strip()
+    with_match = re.search(r'(?:with|to discuss|to talk about)\s+([^.,!?]+)', text, re.IGNORECASE)
+    if with_match:
+        return with_match.group(1).strip()
+    return None
+
+
+def legacy_slots(original_text, user_text):
+    """The slots the previous chat_endpoint schedule_meeting branch computed."""
+    from nlp_datetime_cleaner import ai_clean_datetime, extract_intent_modifiers, intelligent_date_parse
+    from slot_extractor import parse_event_time
+
+    modifiers = extract_intent_modifiers(original_text, "schedule_meeting")
+    normalized_text = legacy_normalize_datetime_input(user_text)
+    start_dt_obj, end_dt_obj = intelligent_date_parse(normalized_text)
+    if start_dt_obj and end_dt_obj:
+        start_dt, end_dt = start_dt_obj.isoformat(), end_dt_obj.isoformat()
+    else:
+        ai_response = ai_clean_datetime(normalized_text)
+        match = re.search(r"START=(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})\s+END=(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})", ai_response)
+        if match:
+            start_dt, end_dt = match.group(1), match.group(2)
+        else:
+            start_dt, end_dt = parse_event_time(normalized_text)
+    return {
+        "start": datetime.fromisoformat(start_dt),
+        "end": datetime.fromisoformat(end_dt),
+        "modifiers": modifiers,
+        "description": legacy_extract_meeting_description(original_text),
+    }
+
+
+def frame_slots(original_text, user_text):
+    from slot_extractor import extract_meeting_frame
+
+    frame = extract_meeting_frame(original_text, user_text)
+    return {"start": frame.start, "end": frame.end, "modifiers": frame.modifiers(), "description": frame.description}
+
+
+def _outcome(fn, original_text, user_text):
+    try:
+        return fn(original_text, user_text)
+    except Exception as e:
+        return f"raised {type(e).__name__}"
+
+
+def generate_requests(count, seed=7):
+    rng = random.Random(seed)
+    requests = []
+    for phrase in generate_phrases(count, seed=seed):
+        parts = [phrase, rng.choice(EXTRAS), rng.choice(EXTRAS)]
+        rng.shuffle(parts)
+        requests.append(" ".join(part for part in parts if part))
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="v1")
+    parser.add_argument("--generated", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    install_stub_models()
+    import nlp_datetime_cleaner
+    import slot_extractor
+    from text_normalizer import normalize_text
+
+    corpus = load_corpus(args.corpus)
+    texts = [item["text"] for item in corpus["intents"] + corpus["datetimes"]] + generate_requests(args.generated)
+    inputs = [(text, normalize_text(text)) for text in texts]
+
+    mismatches = 0
+    samples = {"legacy": [], "frame": []}
+    with frozen_clock(nlp_datetime_cleaner, corpus["now"], corpus["timezone"]), \
+            frozen_clock(slot_extractor, corpus["now"], corpus["timezone"]):
+        for original_text, user_text in inputs:
+            expected = _outcome(legacy_slots, original_text, user_text)
+            got = _outcome(frame_slots, original_text, user_text)
+            if expected != got:
+                mismatches += 1
+                if mismatches <= 20:
+                    print(f"mismatch {original_text!r}:\n  legacy={expected}\n  frame ={got}")
+
+        for _ in range(args.repeat):
+            for original_text, user_text in inputs:
+                for name, fn in (("legacy", legacy_slots), ("frame", frame_slots)):
+                    _, elapsed = timed(_outcome, fn, original_text, user_text)
+                    samples[name].append(elapsed)
+
+    print(f"parity: {len(inputs) - mismatches}/{len(inputs)} identical\n")
+    print(f"{'path':<10}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+    for name, values in samples.items():
+        summary = latency_summary(values)
+        print(f"{name:<10}{summary['p50_us']:>10}{summary['p95_us']:>10}{summary['p99_us']:>10}")
+    print("(requests the grammar can't date go through the stub model and dateparser on both sides)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Startup-time benchmark.
+
+Launches `uvicorn main:app` in a subprocess and measures:
+  - import:  seconds until `import main` finishes (separate subprocess)
+  - healthz: seconds until the API answers /healthz (it can take traffic)
+  - readyz:  seconds until /readyz returns 200 (models loaded + warmed up)
+
+Before models moved into the background registry, the API only came up after
+both pipelines had loaded, so `healthz` was roughly equal to `readyz`.
+
+Usage: python -m benchmarks.startup [--port 10055] [--runs 3]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def _wait_for(url, expect_status, started, timeout):
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == expect_status:
+                    return time.perf_counter() - started
+        except urllib.error.HTTPError as e:
+            if e.code == expect_status:
+                return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def measure_import():
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], check=True)
+    return time.perf_counter() - started
+
+
+def measure_server(port, timeout):
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        healthz = _wait_for(f"http://127.0.0.1:{port}/healthz", 200, started, timeout)
+        readyz = _wait_for(f"http://127.0.0.1:{port}/readyz", 200, started, timeout)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return healthz, readyz
+
+
+def fmt(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values):.2f}s" if values else "timeout"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=10055)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    imports, healthz, readyz = [], [], []
+    for run in range(1, args.runs + 1):
+        imports.append(measure_import())
+        h, r = measure_server(args.port, args.timeout)
+        healthz.append(h)
+        readyz.append(r)
+        print(f"run {run}: import={fmt([imports[-1]])} healthz={fmt([h])} readyz={fmt([r])}")
+
+    print("\nmedian over runs")
+    print(f"  import main        {fmt(imports)}")
+    print(f"  accepting traffic  {fmt(healthz)}")
+    print(f"  models ready       {fmt(readyz)}  (previous time-to-first-request)")
+
+
+if __name__ == "__main__":
+    main()
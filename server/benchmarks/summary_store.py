@@ -0,0 +1,231 @@
+"""
+Gmail summary store: how many GPT summaries each inbox refresh costs.
+
+A stub Gmail inbox of --inbox messages is read through get_latest_emails
+and list_recent_emails(summarize=True), with a fake OpenAI answering each
+summary request after --summary-ms and a dict standing in for the Mongo
+collection. Scenarios, in order, each reporting the emails sent to GPT for
+a summary, full-body fetches and latency:
+  cold           nothing stored: every message is summarized
+  refresh        same inbox again: no summaries
+  force_refresh  force_refresh=True: Gmail is listed again, no summaries
+  new_mail       two messages arrive: only those two are summarized
+  restart        in-process LRU emptied: served from the store, no summaries
+  analytics      /api/emails/recent-style listing: no summaries, no bodies
+  new_prompt     SUMMARY_PROMPT_VERSION bumped: every message again
+  mongo_down     store raises: emails are still summarized, no error
+  no_mongo       no database configured (collection None): summarized once,
+  lru_only       then served from the in-process LRU
+Exits non-zero if a scenario summarizes a different number of emails than expected.
+
+Usage: python -m benchmarks.summary_store [--inbox 10] [--summary-ms 300]
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import re
+import sys
+import threading
+import time
+import types
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+
+class FakeCollection:
+    """The two collection methods the store uses, over a dict."""
+
+    def __init__(self):
+        self.documents = {}
+        self.down = False
+        self.finds = 0
+
+    def _check(self):
+        if self.down:
+            raise ServerSelectionTimeoutError("localhost:27017: connection refused")
+
+    def find(self, query, projection=None):
+        self._check()
+        self.finds += 1
+        return [dict(self.documents[key], _id=key) for key in query["_id"]["$in"] if key in self.documents]
+
+    def replace_one(self, query, document, upsert=False):
+        self._check()
+        self.documents[query["_id"]] = dict(document)
+
+
+def prompt_tokens(messages):
+    """What a chat request is billed for on input: each message's content, ~4 tokens of framing per message, 3 to prime the reply."""
+    from gmail.email_preprocess import count_tokens
+
+    return sum(count_tokens(message["content"]) + 4 for message in messages) + 3
+
+
+class FakeSummarizer:
+    """
+    Stands in for the openai module in gmail_integration. Answers single
+    summary prompts and batch (JSON) prompts with "Summary: <body>", after
+    first_token_s plus token_s per reply token, counting each summary as a
+    real one's length (at most SUMMARY_TOKENS). Batch replies leave out the
+    ids in `drop`.
+    """
+
+    SUMMARY_TOKENS = 60
+
+    def __init__(self, first_token_s=0.0, token_s=0.0, drop=()):
+        self.first_token_s = first_token_s
+        self.token_s = token_s
+        self.drop = set(drop)
+        # (emails in the request, prompt tokens: every message plus chat-format overhead)
+        self.requests = []
+        self.summarized = []
+        self._lock = threading.Lock()
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, max_tokens, temperature, response_format=None):
+        prompt = messages[-1]["content"]
+        if response_format:
+            emails = re.findall(r'<email id="([^"]+)">\n(.*?)\n</email>', prompt, re.S)
+            kept = [(message_id, content) for message_id, content in emails if message_id not in self.drop]
+            text = json.dumps({"summaries": [{"id": i, "summary": f"Summary: {c}"} for i, c in kept]})
+        else:
+            emails = kept = [(None, prompt.split(":\n\n", 1)[1])]
+            text = f"Summary: {kept[0][1]}"
+        with self._lock:
+            self.requests.append((len(emails), prompt_tokens(messages)))
+            self.summarized.extend(content for _, content in kept)
+        reply_tokens = sum(min(len(content) // 4 + 3, self.SUMMARY_TOKENS) for _, content in kept)
+        time.sleep(self.first_token_s + reply_tokens * self.token_s)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=text))])
+
+
+class FakeInbox:
+    def __init__(self, count):
+        self.ids = [f"m{i:04d}" for i in range(count)]
+        self.full_fetches = 0
+
+    def add(self, count):
+        start = len(self.ids)
+        self.ids = [f"m{i:04d}" for i in range(start, start + count)] + self.ids
+
+    def service(self):
+        inbox = self
+
+        class Request:
+            def __init__(self, value):
+                self.value = value
+
+            def execute(self):
+                return self.value
+
+        def list_(userId, q, maxResults, pageToken=None):
+            return Request({"messages": [{"id": i} for i in inbox.ids[:maxResults]]})
+
+        def get(userId, id, format, metadataHeaders=None):
+            headers = [{"name": "From", "value": "ada@example.com"}, {"name": "Date", "value": "Mon, 3 Jun 2024"},
+                       {"name": "Subject", "value": f"Message {id}"}]
+            payload = {"headers": headers}
+            if format == "full":
+                inbox.full_fetches += 1
+                payload["body"] = {"data": base64.urlsafe_b64encode(f"Body of {id}".encode()).decode()}
+            return Request({"id": id, "threadId": id, "snippet": "", "payload": payload})
+
+        messages = types.SimpleNamespace(list=list_, get=get)
+        return types.SimpleNamespace(users=lambda: types.SimpleNamespace(messages=lambda: messages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inbox", type=int, default=10)
+    parser.add_argument("--summary-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    import gmail.gmail_integration as gmail_integration
+    from gmail.summary_store import summary_store
+
+    inbox = FakeInbox(args.inbox)
+    gmail_integration.build = lambda *a, **kw: inbox.service()
+    gmail_integration.get_gmail_credentials = lambda: None
+    collection = FakeCollection()
+    summary_store.collection = collection
+    summary_store.cache.clear()
+
+    summarizer = FakeSummarizer(args.summary_ms / 1000)
+    gmail_integration.openai = summarizer
+    calls = summarizer.summarized
+    n = args.inbox
+
+    def refresh(**kwargs):
+        return gmail_integration.get_latest_emails(n, **kwargs)
+
+    def new_mail():
+        inbox.add(2)
+        return refresh()
+
+    def restart():
+        summary_store.cache.clear()
+        return refresh()
+
+    def analytics():
+        return gmail_integration.list_recent_emails(n, summarize=True)
+
+    def new_prompt():
+        gmail_integration.SUMMARY_PROMPT_VERSION = "v-bench"
+        return refresh()
+
+    def mongo_down():
+        collection.down = True
+        summary_store.cache.clear()
+        return refresh()
+
+    def no_mongo():
+        summary_store.collection = None
+        gmail_integration.SUMMARY_PROMPT_VERSION = "v-bench-lru"
+        return refresh()
+
+    scenarios = [
+        ("cold", refresh, n),
+        ("refresh", refresh, 0),
+        ("force_refresh", lambda: refresh(force_refresh=True), 0),
+        ("new_mail", new_mail, 2),
+        ("restart", restart, 0),
+        ("analytics", analytics, 0),
+        ("new_prompt", new_prompt, n),
+        ("mongo_down", mongo_down, n),
+        ("no_mongo", no_mongo, n),
+        ("lru_only", refresh, 0),
+    ]
+
+    failures = []
+    print(f"{args.inbox} emails per refresh, {args.summary_ms:.0f} ms per GPT request")
+    print(f"{'scenario':<15}{'summarized':>11}{'expected':>10}{'requests':>10}{'full gets':>11}{'ms':>9}")
+    for name, run, expected in scenarios:
+        calls.clear()
+        summarizer.requests.clear()
+        inbox.full_fetches = 0
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{name:<15}{len(calls):>11}{expected:>10}{len(summarizer.requests):>10}"
+              f"{inbox.full_fetches:>11}{elapsed_ms:>9.0f}")
+        if len(calls) != expected:
+            failures.append(f"{name}: {len(calls)} emails summarized, expected {expected}")
+        text = result if isinstance(result, str) else "".join(e["summary"] for e in result["emails"])
+        if text.count("Summary: Body of") != n:
+            failures.append(f"{name}: summaries missing from the result")
+
+    print(f"\nstore: {summary_store.stats()}")
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nall checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# server/bulkheads.py
+"""
+Per-backend concurrency limits (bulkheads) with load shedding.
+
+Each backend (OpenAI, Gmail, Slack, HubSpot, Calendar, local models) gets a
+fixed number of concurrent calls and a bounded queue behind them. When the
+queue is full the call fails at once with BulkheadFull, instead of parking
+another request (and often a thread) behind a slow dependency, so one slow
+backend can't stall intents that don't use it. main.py turns BulkheadFull
+into 429 (queue full) or 503 (waited past max_wait_ms) with Retry-After.
+
+Usage, from threads or the event loop:
+    @guarded("hubspot")               # sync or async function
+    with hold("gmail"): ...           # blocking code
+    async with hold_async("gmail"):   # async code, waits without a thread
+
+A call path holds at most one slot per backend: async_send_gmail takes the
+Gmail slot before handing send_gmail to the Google pool, and send_gmail's
+own guard sees it (executors.run_blocking carries contextvars) and passes.
+So work that fans out must not hold its backend's slot across the fan-out:
+the children would all pass on it. A Gmail listing holds a gmail_listing
+slot instead, and each Gmail call it makes takes its own gmail slot.
+
+Limits per backend: BULKHEAD_CONFIG overrides any of BULKHEAD_DEFAULTS with a
+JSON object, e.g. '{"hubspot": {"limit": 4, "queue": 8}}'.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+#   limit        concurrent calls
+#   queue        callers allowed to wait for a slot; beyond that, 429
+#   max_wait_ms  longest wait for a slot; beyond that, 503
+BULKHEAD_DEFAULTS = {
+    "openai": {"limit": 16, "queue": 64, "max_wait_ms": 5000},
+    "gmail": {"limit": 8, "queue": 32, "max_wait_ms": 5000},
+    # Whole listings (list + parallel gets + summaries); each Gmail call inside takes a gmail slot
+    "gmail_listing": {"limit": 8, "queue": 32, "max_wait_ms": 5000},
+    "calendar": {"limit": 8, "queue": 32, "max_wait_ms": 5000},
+    "slack": {"limit": 8, "queue": 32, "max_wait_ms": 3000},
+    "hubspot": {"limit": 8, "queue": 32, "max_wait_ms": 3000},
+    "local_model": {"limit": 4, "queue": 64, "max_wait_ms": 5000},
+}
+
+IN_FLIGHT = Gauge("workflowx_bulkhead_in_flight", "Calls holding a bulkhead slot", ["backend"])
+QUEUED = Gauge("workflowx_bulkhead_queued", "Calls waiting for a bulkhead slot", ["backend"])
+REJECTED = Counter("workflowx_bulkhead_rejected_total", "Calls shed by a bulkhead", ["backend", "reason"])
+WAIT_SECONDS = Histogram(
+    "workflowx_bulkhead_wait_seconds", "Time spent waiting for a bulkhead slot", ["backend"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+class BulkheadFull(Exception):
+    """A backend's bulkhead shed this call. `status_code` is 429 (queue full) or 503 (wait timed out)."""
+
+    def __init__(self, backend, reason, retry_after_s):
+        self.backend = backend
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+        self.status_code = 429 if reason == "queue_full" else 503
+        super().__init__(f"{backend} is overloaded ({reason}); retry in {retry_after_s}s")
+
+
+class _Waiter:
+    """A queued caller; release() hands its slot over directly (FIFO)."""
+
+    def __init__(self, loop=None):
+        self.granted = False
+        self._loop = loop
+        self._event = asyncio.Event() if loop else threading.Event()
+
+    def grant(self):
+        self.granted = True
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._event.set)
+        else:
+            self._event.set()
+
+
+class Bulkhead:
+    def __init__(self, name, limit, queue, max_wait_ms):
+        self.name = name
+        self.limit = limit
+        self.max_queue = queue
+        self.max_wait_s = max_wait_ms / 1000
+        self.rejected = 0
+        self._in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        # Smoothed slot hold time, for the Retry-After estimate
+        self._avg_hold_s = 0.5
+
+    def _enter_or_queue(self, loop=None):
+        """Takes a free slot (returns None) or queues a waiter (returns it); raises if the queue is full."""
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                IN_FLIGHT.labels(self.name).set(self._in_flight)
+                return None
+            if len(self._waiters) >= self.max_queue:
+                raise self._reject("queue_full")
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            QUEUED.labels(self.name).set(len(self._waiters))
+            return waiter
+
+    def _abandon(self, waiter):
+        """Dequeues a waiter that stopped waiting. False if it was granted a slot meanwhile (it now holds it)."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            QUEUED.labels(self.name).set(len(self._waiters))
+            return True
+
+    def _release(self, held_s):
+        with self._lock:
+            self._avg_hold_s = 0.8 * self._avg_hold_s + 0.2 * held_s
+            if self._waiters:
+                # The slot passes straight to the next waiter; in-flight is unchanged
+                self._waiters.popleft().grant()
+                QUEUED.labels(self.name).set(len(self._waiters))
+            else:
+                self._in_flight -= 1
+                IN_FLIGHT.labels(self.name).set(self._in_flight)
+
+    def _reject(self, reason):
+        self.rejected += 1
+        REJECTED.labels(self.name, reason).inc()
+        # Roughly when the calls ahead of a new one will have finished
+        backlog = (len(self._waiters) + self._in_flight) / self.limit
+        retry_after_s = min(30, max(1, math.ceil(backlog * self._avg_hold_s)))
+        return BulkheadFull(self.name, reason, retry_after_s)
+
+    def _timed_out(self, waiter):
+        if self._abandon(waiter):
+            with self._lock:
+                return self._reject("wait_timeout")
+        return None
+
+    @contextmanager
+    def hold(self):
+        started = time.perf_counter()
+        waiter = self._enter_or_queue()
+        if waiter is not None and not waiter._event.wait(self.max_wait_s):
+            error = self._timed_out(waiter)
+            if error:
+                raise error
+        acquired = time.perf_counter()
+        WAIT_SECONDS.labels(self.name).observe(acquired - started)
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - acquired)
+
+    @asynccontextmanager
+    async def hold_async(self):
+        started = time.perf_counter()
+        waiter = self._enter_or_queue(asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(waiter._event.wait(), self.max_wait_s)
+            except asyncio.TimeoutError:
+                error = self._timed_out(waiter)
+                if error:
+                    raise error
+            except BaseException:
+                # Cancelled while queued: give back the slot if it arrived meanwhile
+                if not self._abandon(waiter):
+                    self._release(0.0)
+                raise
+        acquired = time.perf_counter()
+        WAIT_SECONDS.labels(self.name).observe(acquired - started)
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - acquired)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "queue": self.max_queue,
+                "max_wait_ms": self.max_wait_s * 1000,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "rejected": self.rejected,
+            }
+
+
+def load_bulkhead_config(defaults, overrides_json=None):
+    config = {name: dict(values) for name, values in defaults.items()}
+    if overrides_json:
+        for name, values in json.loads(overrides_json).items():
+            config.setdefault(name, {}).update(values)
+    return config
+
+
+bulkheads = {
+    name: Bulkhead(name, **settings)
+    for name, settings in load_bulkhead_config(BULKHEAD_DEFAULTS, os.getenv("BULKHEAD_CONFIG")).items()
+}
+
+# Backends the current call path already holds a slot for
+_held = contextvars.ContextVar("bulkheads_held", default=frozenset())
+
+
+@contextmanager
+def hold(backend):
+    if backend in _held.get():
+        yield
+        return
+    with bulkheads[backend].hold():
+        token = _held.set(_held.get() | {backend})
+        try:
+            yield
+        finally:
+            _held.reset(token)
+
+
+@asynccontextmanager
+async def hold_async(backend):
+    if backend in _held.get():
+        yield
+        return
+    async with bulkheads[backend].hold_async():
+        token = _held.set(_held.get() | {backend})
+        try:
+            yield
+        finally:
+            _held.reset(token)
+
+
+def guarded(backend):
+    """Decorator: the whole call holds a slot of `backend`'s bulkhead (sync or async functions)."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                async with hold_async(backend):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with hold(backend):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def bulkhead_stats():
+    return {name: bulkhead.snapshot() for name, bulkhead in bulkheads.items()}
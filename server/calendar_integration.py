@@ -0,0 +1,165 @@
+# server/calendar_integration.py
+import os
+import threading
+import uuid
+
+from googleapiclient.discovery import build
+from googleapiclient.http import BatchHttpRequest
+from google.oauth2.service_account import Credentials
+
+from bulkheads import guarded, hold_async
+from executors import google_executor, run_blocking
+from tracing import mark_error, traced
+
+CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID", "abchhatkuli@gmail.com")
+CALENDAR_TIMEZONE = "America/Indiana/Indianapolis"
+SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")
+# The Calendar API accepts at most 50 calls per batch request
+CALENDAR_BATCH_SIZE = min(int(os.getenv("CALENDAR_BATCH_SIZE", "50")), 50)
+# Only set to point batches somewhere other than www.googleapis.com (e.g. a local stub)
+CALENDAR_BATCH_URI = os.getenv("CALENDAR_BATCH_URI")
+
+# httplib2, which the client uses underneath, isn't thread-safe, so each
+# worker thread builds its service once and keeps it
+_local = threading.local()
+
+
+def get_calendar_service():
+    service = getattr(_local, "service", None)
+    if service is None:
+        creds = Credentials.from_service_account_file(
+            SERVICE_ACCOUNT_FILE,
+            scopes=["https://www.googleapis.com/auth/calendar"]
+        )
+        service = build("calendar", "v3", credentials=creds)
+        _local.service = service
+    return service
+
+
+def build_event_body(title: str, start_datetime: str, end_datetime: str, modifiers: dict = None, recurrence: str = None) -> dict:
+    """
+    The events.insert body for one meeting. `recurrence` is an RRULE string
+    (see datetime_grammar.recurrence_rule).
+    """
+    event_body = {
+        "summary": title,
+        "start": {
+            "dateTime": start_datetime,
+            "timeZone": CALENDAR_TIMEZONE
+        },
+        "end": {
+            "dateTime": end_datetime,
+            "timeZone": CALENDAR_TIMEZONE
+        },
+    }
+    if recurrence:
+        event_body["recurrence"] = [recurrence]
+
+    if modifiers:
+        if 'meeting_type' in modifiers:
+            meeting_type = modifiers['meeting_type']
+            if meeting_type == 'call':
+                event_body["description"] = "Conference call - dial-in details will be provided."
+            elif meeting_type == 'video':
+                # Unique per event: Google reuses the conference of a repeated requestId
+                event_body["conferenceData"] = {
+                    "createRequest": {
+                        "requestId": f"meeting-{uuid.uuid4().hex}"
+                    }
+                }
+            elif meeting_type == 'in_person':
+                event_body["location"] = "Office Main Conference Room"
+
+        if 'attendees' in modifiers:
+            attendee_list = []
+            attendees = modifiers['attendees'].split(',')
+            for attendee in attendees:
+                attendee = attendee.strip()
+                if '@' in attendee:
+                    attendee_list.append({"email": attendee})
+                else:
+                    attendee_list.append({"displayName": attendee, "email": "placeholder@example.com"})
+            if attendee_list:
+                event_body["attendees"] = attendee_list
+
+        if 'priority' in modifiers and modifiers['priority'] == 'high':
+            if "description" not in event_body:
+                event_body["description"] = "HIGH PRIORITY MEETING"
+            else:
+                event_body["description"] = "HIGH PRIORITY MEETING\n\n" + event_body["description"]
+            event_body["summary"] = "❗ " + event_body["summary"]
+
+    return event_body
+
+
+def _insert_request(service, event_body):
+    if "conferenceData" in event_body:
+        return service.events().insert(calendarId=CALENDAR_ID, body=event_body, conferenceDataVersion=1)
+    return service.events().insert(calendarId=CALENDAR_ID, body=event_body)
+
+
+@traced("calendar.insert", backend="calendar")
+@guarded("calendar")
+def schedule_google_event(title: str, start_datetime: str, end_datetime: str, modifiers: dict = None, recurrence: str = None, service=None) -> str:
+    """Creates one event (a whole series if `recurrence` is given) and returns its link."""
+    service = service or get_calendar_service()
+    event_body = build_event_body(title, start_datetime, end_datetime, modifiers, recurrence)
+    created_event = _insert_request(service, event_body).execute()
+    return created_event.get("htmlLink", "No link found")
+
+
+@traced("calendar.batch", backend="calendar")
+@guarded("calendar")
+def schedule_google_events_batch(events, service=None):
+    """
+    Creates many events with the Calendar batch endpoint: CALENDAR_BATCH_SIZE
+    inserts per HTTP round trip instead of one each.
+
+    `events` is a list of dicts with the schedule_google_event arguments
+    (title, start_datetime, end_datetime, and optionally modifiers and
+    recurrence). Returns one entry per event, in order: the event link, or
+    None if that insert failed (failures don't affect the rest of the batch).
+    """
+    service = service or get_calendar_service()
+    links = [None] * len(events)
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            print(f"Calendar batch insert {request_id} failed: {exception}")
+            mark_error()
+            return
+        links[int(request_id)] = response.get("htmlLink", "No link found")
+
+    for chunk_start in range(0, len(events), CALENDAR_BATCH_SIZE):
+        if CALENDAR_BATCH_URI:
+            batch = BatchHttpRequest(callback=_collect, batch_uri=CALENDAR_BATCH_URI)
+        else:
+            batch = service.new_batch_http_request(callback=_collect)
+        for index in range(chunk_start, min(chunk_start + CALENDAR_BATCH_SIZE, len(events))):
+            event = events[index]
+            event_body = build_event_body(
+                event["title"],
+                event["start_datetime"],
+                event["end_datetime"],
+                event.get("modifiers"),
+                event.get("recurrence"),
+            )
+            batch.add(_insert_request(service, event_body), request_id=str(index))
+        batch.execute()
+
+    return links
+
+
+async def async_schedule_google_event(title: str, start_datetime: str, end_datetime: str, modifiers: dict = None, recurrence: str = None) -> str:
+    """Async version of schedule_google_event, run on the Google API pool."""
+    # The slot is taken here, so waiting for it doesn't occupy a pool thread
+    async with hold_async("calendar"):
+        return await run_blocking(
+            google_executor, schedule_google_event, title, start_datetime, end_datetime, modifiers, recurrence
+        )
+
+
+async def async_schedule_google_events_batch(events):
+    """Async version of schedule_google_events_batch, run on the Google API pool."""
+    async with hold_async("calendar"):
+        return await run_blocking(google_executor, schedule_google_events_batch, events)
@@ -0,0 +1,88 @@
+# server/chat_stream.py
+"""
+Server-Sent Events for /chat/stream.
+
+The streaming endpoint runs the same chat_endpoint code as /chat; the
+handler reports progress through emit() and emit_delta(), which do nothing
+unless the request came in through stream_events(). Events, in order:
+  stage   {"stage": "classified" | "parsed" | "sending" | "reset", ...}
+  delta   {"text": ...}  reply text as it is produced (model tokens, email
+          summaries); the concatenated deltas are a preview of the reply.
+          After a "reset" stage, the preview starts over from empty
+  done    the same JSON body /chat returns ({"reply": ..., ...}), which the
+          client should show in place of the preview
+  error   {"detail": ...}  the handler raised; no done follows. When a
+          backend shed the request (see bulkheads), also "status" (429/503)
+          and "retry_after_s"
+"""
+
+import asyncio
+import json
+from contextvars import ContextVar
+
+from bulkheads import BulkheadFull
+
+# (loop, queue) of the stream the current request writes to
+_stream = ContextVar("chat_stream", default=None)
+_FINISHED = object()
+
+
+def is_streaming():
+    return _stream.get() is not None
+
+
+def emit(event, **data):
+    """Queues one event for the current stream. Safe to call from worker threads (see executors.run_blocking)."""
+    stream = _stream.get()
+    if stream is None:
+        return
+    loop, queue = stream
+    loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+
+def emit_delta(text):
+    if text:
+        emit("delta", text=text)
+
+
+def delta_sink():
+    """A callback for llm_client.chat_completion(on_delta=...) when streaming, else None."""
+    return emit_delta if is_streaming() else None
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_events(handler):
+    """
+    Runs `handler()` (a coroutine function returning the /chat response dict)
+    and yields its events as SSE frames, ending with done or error.
+
+    If the client disconnects, the handler still runs to the end so that a
+    half-sent email or half-created event isn't abandoned midway.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    token = _stream.set((loop, queue))
+    try:
+        # The task copies the current context, so the handler sees the stream
+        task = asyncio.create_task(handler())
+    finally:
+        _stream.reset(token)
+    # Scheduled behind anything the handler emitted, so it's always last
+    task.add_done_callback(lambda _: loop.call_soon_threadsafe(queue.put_nowait, _FINISHED))
+
+    while True:
+        item = await queue.get()
+        if item is _FINISHED:
+            break
+        yield format_sse(*item)
+
+    try:
+        yield format_sse("done", task.result())
+    except BulkheadFull as e:
+        yield format_sse("error", {"detail": str(e), "status": e.status_code, "retry_after_s": e.retry_after_s})
+    except Exception as e:
+        print(f"Chat stream error: {e}")
+        yield format_sse("error", {"detail": "Something went wrong while handling this message."})
@@ -0,0 +1,371 @@
+# server/datetime_grammar.py
+"""
+Compiled grammar for the date, time and duration phrases used when scheduling.
+
+Rules are written once from shared building blocks (TIME, WEEKDAY, MONTH, DAY)
+and compiled at import instead of on every call, and both
+nlp_datetime_cleaner.intelligent_date_parse and slot_extractor.parse_event_time read
+their date, time and duration slots from here.
+
+Within a family, rules keep the priority of the old pattern lists: the
+winning rule is the first one in list order that matches anywhere in the
+text, at its leftmost position.
+"""
+
+import calendar
+import re
+from datetime import datetime, time, timedelta, timezone
+
+# Building blocks. Each rule is compiled on its own, so slot names repeat across rules.
+TIME = r'(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>am|pm|a\.m\.|p\.m\.)?'
+WEEKDAY = r'(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+MONTH = r'(?P<month>january|february|march|april|may|june|july|august|september|october|november|december)'
+DAY = r'(?P<day>\d{1,2})(?:st|nd|rd|th)?'
+
+WEEKDAYS = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4,
+    'may': 5, 'june': 6, 'july': 7, 'august': 8,
+    'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+MONTH_NAMES = tuple(MONTHS)
+
+# intelligent_date_parse: from most specific to most general.
+# (rule, pattern, triggers): every match contains one of the trigger words, so
+# rules whose triggers are missing from the text are skipped without a search.
+DATE_RULES = [
+    ("next_week_weekday", r'next\s+week\s+' + WEEKDAY + r'\s+at\s+' + TIME, ("week",)),    # next week Tuesday at 3pm
+    ("next_weekday", r'next\s+' + WEEKDAY + r'\s+at\s+' + TIME, ("next",)),                # next Monday at 2pm
+    ("weekday_next_week", WEEKDAY + r'\s+next\s+week\s+at\s+' + TIME, ("week",)),          # Tuesday next week at 2pm
+    ("tomorrow", r'tomorrow\s+at\s+' + TIME, ("tomorrow",)),                                 # tomorrow at 3pm
+    ("today", r'today\s+at\s+' + TIME, ("today",)),                                          # today at 4pm
+    ("month_day", MONTH + r'\s+' + DAY + r'\s+at\s+' + TIME, MONTH_NAMES),                      # March 15 at 2pm
+    ("day_month", DAY + r'\s+(?:of\s+)?' + MONTH + r'\s+at\s+' + TIME, MONTH_NAMES),            # 15th March at 2pm
+    ("in_days", r'in\s+(?P<days>\d+)\s+days?\s+at\s+' + TIME, ("day",)),                    # in 3 days at 2pm
+    ("next_month_day", r'next\s+month\s+(?:on\s+)?(?:the\s+)?' + DAY + r'\s+at\s+' + TIME, ("month",)),  # next month on the 15th at 2pm
+    ("time_only", r'at\s+' + TIME, ("at",)),                                                  # at 2pm
+]
+
+# "for N hr(s)" is covered by for_h
+DURATION_RULES = [
+    ("for_hours", r'for\s+(?P<hours>\d+)\s*hours?', ("for",)),
+    ("for_h", r'for\s+(?P<hours>\d+)\s*h', ("for",)),
+    ("hours_long", r'(?P<hours>\d+)\s*hours?\s+long', ("long",)),
+    ("hour_meeting", r'(?P<hours>\d+)\s*hour\s+meeting', ("meeting",)),
+    ("h_meeting", r'(?P<hours>\d+)\s*h\s+meeting', ("meeting",)),
+]
+
+# slot_extractor.parse_event_time works on lowercased text with its own, stricter rules
+EVENT_DURATION_RULES = [
+    ("for_hours", r'for (?P<hours>\d+) hours?', ("for",)),
+    ("for_h", r'for (?P<hours>\d+)h', ("for",)),
+    ("hours_long", r'(?P<hours>\d+) hours? long', ("long",)),
+    ("hour_meeting", r'(?P<hours>\d+) hour meeting', ("meeting",)),
+]
+EVENT_WEEKDAY_RULES = [
+    ("next_weekday", r'next\s+' + WEEKDAY, ("next",)),
+    ("weekday_next_week", WEEKDAY + r'\s+next\s+week', ("week",)),
+    ("next_week_weekday", r'next\s+week\s+(?:on\s+)?' + WEEKDAY, ("week",)),
+    ("next_week_at_weekday", r'next\s+week\s+at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?\s+on\s+' + WEEKDAY, ("week",)),
+]
+EVENT_TIME_RULES = [
+    ("at_time", r'at\s+(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>am|pm)?', ("at",)),
+]
+
+# Recurring events, turned into an RRULE by recurrence_rule()
+WEEKDAY_LIST = r'(?P<days>(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)s?' \
+    r'(?:\s*(?:,|and|&)\s*(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)s?)*)'
+RECURRENCE_RULES = [
+    ("weekdays", r'(?:every|each|on)\s+week\s?days?\b', ("week",)),                  # every weekday
+    ("weekly_on", r'(?:every|each)\s+' + WEEKDAY_LIST, ("every", "each")),             # every monday and wednesday
+    ("weekly_on", r'on\s+' + WEEKDAY_LIST.replace('s?', 's', 1), ("days",)),           # on mondays
+    ("every_n", r'every\s+(?P<interval>\d+|other)\s+(?P<unit>day|week|month|year)s?\b', ("every",)),  # every 2 weeks
+    ("every_unit", r'(?:every|each)\s+(?P<unit>day|week|month|year)\b', ("every", "each")),             # every month
+    ("adverb", r'\b(?P<adverb>daily|weekly|biweekly|fortnightly|monthly|yearly|annually)\b', ("ly",)),  # weekly sync
+]
+UNTIL_MONTH = (
+    r'(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|'
+    r'sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+)
+UNTIL_YEAR = r'(?:,?\s+(?P<year>\d{4}))?\b'
+RECURRENCE_LIMIT_RULES = [
+    ("count", r'(?P<count>\d+)\s+times', ("times",)),                                   # 10 times
+    ("until", r'until\s+(?:the\s+)?' + UNTIL_MONTH + r'\s+' + DAY + UNTIL_YEAR, ("until",)),                  # until dec 5, 2026
+    ("until", r'until\s+(?:the\s+)?' + DAY + r'\s+(?:of\s+)?' + UNTIL_MONTH + UNTIL_YEAR, ("until",)),       # until 15 july
+    ("until", r'until\s+(?P<year>\d{4})-(?P<month_number>\d{1,2})-(?P<day>\d{1,2})\b', ("until",)),          # until 2026-12-01
+    ("until", r'until\s+(?P<month_number>\d{1,2})/(?P<day>\d{1,2})(?:/(?P<year>\d{4}|\d{2}))?\b', ("until",)),  # until 12/1/2026
+    ("for_span", r'for\s+(?:the\s+)?(?:next\s+|coming\s+)?(?P<n>\d+|an?|one|two|three|four|six)?\s*'
+                 r'(?P<unit>day|week|month|year)s?\b', ("for",)),                        # for the next month
+    # Any other "until <words or date>" is an end date we can't read. Bare numbers
+    # ("from 2 until 4 pm") are times, and "until further notice" is open-ended.
+    ("until_unparsed", r'until\s+(?!(?:noon|midnight|further\s+notice)\b)(?:[a-z]|\d{1,4}[/-]\d)', ("until",)),
+]
+# Without an explicit cue or a limit, "weekly sync ..." names a kind of meeting, not a series
+RECURRENCE_CUE = re.compile(r'\b(?:recurring|recurs?|repeat(?:s|ing)?)\b', re.IGNORECASE)
+
+
+class Grammar:
+    """
+    Slot families (date, duration, ...) of prioritized rules, compiled once.
+
+    The text is lowercased once and each rule's trigger words are checked
+    with plain substring tests, so only rules that can match are searched.
+    (Folding every rule into one regex was tried: CPython's re engine can't
+    use its literal-prefix scan on such a pattern and it came out about 2x
+    slower than the old per-call pattern list.)
+    """
+
+    def __init__(self, families, flags=re.IGNORECASE):
+        self.families = {
+            family: [(rule, re.compile(pattern, flags), triggers) for rule, pattern, triggers in rules]
+            for family, rules in families.items()
+        }
+        self.rule_regexes = {
+            (family, rule): regex for family, rules in self.families.items() for rule, regex, _ in rules
+        }
+
+    def matches(self, family, text, lowered=None):
+        """
+        Yields (rule, slots) for every rule of `family` that matches `text`, in
+        priority order, with the slot values of the rule's leftmost match.
+        """
+        lowered = text.lower() if lowered is None else lowered
+        for rule, regex, triggers in self.families[family]:
+            for trigger in triggers:
+                if trigger in lowered:
+                    match = regex.search(text)
+                    if match:
+                        yield rule, match.groupdict()
+                    break
+
+    def first(self, family, text, lowered=None):
+        """The highest-priority (rule, slots) of `family`, or None."""
+        return next(self.matches(family, text, lowered), None)
+
+
+DATE_GRAMMAR = Grammar({"date": DATE_RULES, "duration": DURATION_RULES})
+# Case-sensitive: parse_event_time lowercases the text itself
+EVENT_GRAMMAR = Grammar(
+    {"duration": EVENT_DURATION_RULES, "weekday": EVENT_WEEKDAY_RULES, "time": EVENT_TIME_RULES}, flags=0
+)
+RECURRENCE_GRAMMAR = Grammar({"repeat": RECURRENCE_RULES, "limit": RECURRENCE_LIMIT_RULES})
+
+RRULE_DAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+RRULE_FREQUENCIES = {"day": "DAILY", "week": "WEEKLY", "month": "MONTHLY", "year": "YEARLY"}
+ADVERB_RULES = {
+    "daily": ("DAILY", 1), "weekly": ("WEEKLY", 1), "biweekly": ("WEEKLY", 2), "fortnightly": ("WEEKLY", 2),
+    "monthly": ("MONTHLY", 1), "yearly": ("YEARLY", 1), "annually": ("YEARLY", 1),
+}
+NUMBER_WORDS = {None: 1, "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "six": 6}
+
+
+def scan_datetime(text):
+    """
+    Slots for intelligent_date_parse:
+        {"date": iterator of (rule, slots) by priority, "duration_hours": int or None}
+    Date rules are searched lazily, so the caller stops at the first one it can resolve.
+    """
+    lowered = text.lower()
+    duration = DATE_GRAMMAR.first("duration", text, lowered)
+    return {
+        "date": DATE_GRAMMAR.matches("date", text, lowered),
+        "duration_hours": int(duration[1]["hours"]) if duration else None,
+    }
+
+
+def scan_event_slots(text):
+    """
+    Slots for slot_extractor.parse_event_time, on lowercased text:
+        {"duration_hours": int or None, "weekday": str or None, "time": (hour, minute, meridiem) or None}
+    As before, the matched duration phrase is removed before looking for the
+    weekday and time.
+    """
+    duration_hours = None
+    duration = EVENT_GRAMMAR.first("duration", text, text)
+    if duration:
+        rule, slots = duration
+        duration_hours = int(slots["hours"])
+        text = EVENT_GRAMMAR.rule_regexes[("duration", rule)].sub('', text)
+
+    weekday = EVENT_GRAMMAR.first("weekday", text, text)
+    time = EVENT_GRAMMAR.first("time", text, text)
+    if time:
+        slots = time[1]
+        time = (int(slots["hour"]), int(slots["minute"] or 0), slots["ampm"])
+    return {
+        "duration_hours": duration_hours,
+        "weekday": weekday[1]["weekday"] if weekday else None,
+        "time": time,
+    }
+
+
+def to_24_hour(hour, am_pm):
+    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
+        return hour + 12
+    if am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
+        return 0
+    return hour
+
+
+def resolve_date_rule(rule, slots, now, local_tz):
+    """
+    Turns a DATE_RULES match into a localized datetime relative to `now`.
+    Returns None for calendar dates that don't exist (e.g. February 30).
+    """
+    hour = to_24_hour(int(slots["hour"]), slots["ampm"])
+    minute = int(slots["minute"] or 0)
+
+    if rule in ("next_week_weekday", "weekday_next_week"):
+        days_to_add = (WEEKDAYS[slots["weekday"].lower()] - now.weekday()) % 7 + 7
+    elif rule == "next_weekday":
+        days_to_add = (WEEKDAYS[slots["weekday"].lower()] - now.weekday()) % 7 or 7
+    elif rule == "tomorrow":
+        days_to_add = 1
+    elif rule == "in_days":
+        days_to_add = int(slots["days"])
+    elif rule in ("today", "time_only"):
+        days_to_add = 0
+    else:
+        if rule == "next_month_day":
+            year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+            day = int(slots["day"])
+        else:
+            month = MONTHS[slots["month"].lower()]
+            day = int(slots["day"])
+            year = now.year
+            # If the month & day combo is in the past, use next year
+            if (month < now.month) or (month == now.month and day < now.day):
+                year += 1
+        try:
+            return local_tz.localize(datetime(year, month, day, hour, minute, 0, 0))
+        except ValueError:
+            return None
+
+    target_date = now + timedelta(days=days_to_add)
+    start_dt = local_tz.localize(datetime(target_date.year, target_date.month, target_date.day, hour, minute, 0, 0))
+    # A bare time that already passed today means tomorrow
+    if rule == "time_only" and start_dt < now:
+        start_dt = start_dt + timedelta(days=1)
+    return start_dt
+
+
+def _add_months(value, months):
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def _shift_days(value, days):
+    """Same wall-clock time `days` later; pytz datetimes are re-localized in case DST changed."""
+    shifted = value.replace(tzinfo=None) + timedelta(days=days)
+    if hasattr(value.tzinfo, "localize"):
+        return value.tzinfo.localize(shifted)
+    return shifted.replace(tzinfo=value.tzinfo)
+
+
+def _until_date(slots, start):
+    """The date an "until" limit names; a missing year is the next time that date comes round."""
+    if slots.get("month_number"):
+        month = int(slots["month_number"])
+    else:
+        month = next(number for name, number in MONTHS.items() if name.startswith(slots["month"].lower()[:3]))
+    day = int(slots["day"])
+    if slots.get("year"):
+        year = int(slots["year"])
+        year += 2000 if year < 100 else 0
+    else:
+        year = start.year + ((month, day) < (start.month, start.day))
+    try:
+        return datetime(year, month, day).date()
+    except ValueError:
+        return None
+
+
+def _until_value(last_day, start, local_tz=None):
+    """
+    The UNTIL value for a series whose last occurrence is on last_day: the
+    end of that local day in UTC ("20261201T045959Z"), since the event's
+    DTSTART is a zoned date-time (RFC 5545). Floating if there's no timezone.
+    """
+    end_of_day = datetime.combine(last_day, time(23, 59, 59))
+    tz = start.tzinfo or local_tz
+    if tz is None:
+        return end_of_day.strftime("%Y%m%dT%H%M%S")
+    end_of_day = tz.localize(end_of_day) if hasattr(tz, "localize") else end_of_day.replace(tzinfo=tz)
+    return end_of_day.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def recurrence_rule(text, start, local_tz=None):
+    """
+    The recurrence a scheduling phrase asks for, as (rrule, start):
+    rrule is an RFC 5545 RRULE string ("RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=8")
+    and start is moved forward to the first day the rule allows (a weekday
+    rule parsed on a Saturday starts on Monday). Returns None if the phrase
+    doesn't repeat, or if it gives an end date that can't be read or has
+    already passed (the event is then scheduled once). local_tz is the
+    timezone of a naive start.
+    """
+    lowered = text.lower()
+    repeat = RECURRENCE_GRAMMAR.first("repeat", text, lowered)
+    if repeat is None:
+        return None
+    limit = RECURRENCE_GRAMMAR.first("limit", text, lowered)
+
+    rule, slots = repeat
+    interval = 1
+    byday = None
+    if rule == "weekdays":
+        frequency, byday = "WEEKLY", RRULE_DAYS[:5]
+    elif rule == "weekly_on":
+        named = re.findall(r'monday|tuesday|wednesday|thursday|friday|saturday|sunday', slots["days"].lower())
+        frequency, byday = "WEEKLY", tuple(RRULE_DAYS[WEEKDAYS[day]] for day in dict.fromkeys(named))
+    elif rule == "every_n":
+        frequency = RRULE_FREQUENCIES[slots["unit"].lower()]
+        interval = 2 if slots["interval"].lower() == "other" else max(int(slots["interval"]), 1)
+    elif rule == "every_unit":
+        frequency = RRULE_FREQUENCIES[slots["unit"].lower()]
+    else:
+        if limit is None and not RECURRENCE_CUE.search(text):
+            return None
+        frequency, interval = ADVERB_RULES[slots["adverb"].lower()]
+
+    if byday:
+        # The event's own date is always an occurrence, so it has to be one the rule allows
+        days_to_add = 0
+        while RRULE_DAYS[(start.weekday() + days_to_add) % 7] not in byday:
+            days_to_add += 1
+        if days_to_add:
+            start = _shift_days(start, days_to_add)
+
+    parts = [f"FREQ={frequency}"]
+    if interval > 1:
+        parts.append(f"INTERVAL={interval}")
+    if byday:
+        parts.append("BYDAY=" + ",".join(byday))
+
+    if limit:
+        rule, slots = limit
+        if rule == "count":
+            parts.append(f"COUNT={int(slots['count'])}")
+        else:
+            if rule == "until":
+                last_day = _until_date(slots, start)
+            elif rule == "for_span":
+                n = NUMBER_WORDS.get(slots["n"] and slots["n"].lower())
+                n = int(slots["n"]) if n is None else n
+                unit = slots["unit"].lower()
+                if unit in ("month", "year"):
+                    span_end = _add_months(start, n * (12 if unit == "year" else 1))
+                else:
+                    span_end = start + timedelta(days=n * (7 if unit == "week" else 1))
+                # "for 2 weeks" starting Monday ends on the Sunday after next
+                last_day = (span_end - timedelta(days=1)).date()
+            else:
+                last_day = None
+            # A series that would run past an end date we couldn't read is worse than a single event
+            if last_day is None or last_day < start.date():
+                print(f"Couldn't use the end date in {text!r}, scheduling a single event")
+                return None
+            parts.append("UNTIL=" + _until_value(last_day, start, local_tz))
+
+    return "RRULE:" + ";".join(parts), start
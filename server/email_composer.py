@@ -0,0 +1,243 @@
+# server/email_composer.py
+"""
+Email composition for send_email: subject and body from one OpenAI call.
+
+generate_email_content() asks for a JSON object {"subject", "body"} in JSON
+mode, so composing an email is a single round trip instead of a subject
+request followed by a body request. While the completion streams, the body
+field is decoded as it arrives and forwarded to /chat/stream. If the
+structured reply can't be used (API error, invalid JSON, missing fields),
+the stream gets a "reset" stage (drop the preview so far) and the subject
+and body prompts run concurrently instead. A shed call (BulkheadFull) or a
+cancelled request is not retried: the fallback would only add load.
+
+Modifiers from extract_intent_modifiers(text, "send_email") shape the same
+call: formality sets the tone, priority marks the email as urgent, and cc
+names who else will read it (send_gmail adds the Cc header).
+"""
+
+import asyncio
+import json
+import re
+import time
+
+from bulkheads import BulkheadFull
+from chat_stream import delta_sink, emit
+from llm_client import chat_completion
+from tracing import span
+
+EMAIL_MODEL = "gpt-3.5-turbo"
+
+TONE_INSTRUCTIONS = {
+    "formal": "Use a formal, professional tone.",
+    "casual": "Use a friendly, casual tone.",
+    "concise": "Keep it brief: a few sentences at most.",
+}
+
+COMPOSE_SYSTEM_PROMPT = (
+    "You are an AI specialized in writing professional, well-structured emails. "
+    'Reply with a JSON object with two string fields, in this order: "subject" '
+    '(a concise yet clear subject line, no quotes) and "body" (the full email body).'
+)
+
+
+def recipient_name_from_email(recipient_email):
+    recipient_name = "Recipient"
+    if recipient_email:
+        email_parts = recipient_email.split('@')[0]
+        if '.' in email_parts:
+            name_parts = email_parts.split('.')
+            recipient_name = ' '.join(part.capitalize() for part in name_parts)
+        elif '_' in email_parts:
+            name_parts = email_parts.split('_')
+            recipient_name = ' '.join(part.capitalize() for part in name_parts)
+        else:
+            recipient_name = email_parts.capitalize()
+    return recipient_name
+
+
+def _modifier_instructions(modifiers):
+    instructions = []
+    if modifiers.get("formality") in TONE_INSTRUCTIONS:
+        instructions.append(TONE_INSTRUCTIONS[modifiers["formality"]])
+    if modifiers.get("priority") == "high":
+        instructions.append("This is urgent: say so in the subject line and make the requested action clear.")
+    if modifiers.get("cc"):
+        instructions.append(f"{modifiers['cc']} is CC'd on this email.")
+    return " ".join(instructions)
+
+
+class JsonStringFieldStream:
+    """
+    Fed a JSON object as it streams in, passes the decoded value of one
+    string field to on_text piece by piece (escapes decoded, closing quote
+    not included).
+    """
+
+    ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+    def __init__(self, field, on_text):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._on_text = on_text
+        self._buffer = ""
+        self._pos = None
+        self._done = False
+
+    def feed(self, piece):
+        if self._done:
+            return
+        self._buffer += piece
+        if self._pos is None:
+            match = self._start.search(self._buffer)
+            if not match:
+                return
+            self._pos = match.end()
+
+        buffer, i, out = self._buffer, self._pos, []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._done = True
+                break
+            if char == '\\':
+                # Wait for the rest of a split escape sequence
+                if i + 1 >= len(buffer) or (buffer[i + 1] == 'u' and i + 6 > len(buffer)):
+                    break
+                if buffer[i + 1] == 'u':
+                    out.append(chr(int(buffer[i + 2:i + 6], 16)))
+                    i += 6
+                else:
+                    out.append(self.ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                    i += 2
+                continue
+            out.append(char)
+            i += 1
+        self._pos = i
+        if out:
+            self._on_text("".join(out))
+
+
+def _parse_composition(text):
+    """(subject, body) from the JSON reply, or None if either field is missing or empty."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    subject, body = data.get("subject"), data.get("body")
+    if not isinstance(subject, str) or not isinstance(body, str) or not subject.strip() or not body.strip():
+        return None
+    return subject.strip(), body.strip()
+
+
+async def _compose_structured(instructions, explicit_subject, sender_name, recipient_name, recipient_email, modifiers):
+    subject_rule = (
+        f"Use exactly this subject: '{explicit_subject}'." if explicit_subject
+        else "Write a subject line that captures the essence of the communication intent."
+    )
+    prompt = (
+        f"Write an email based on these instructions: '{instructions}'. "
+        f"The email is FROM: {sender_name} TO: {recipient_name} ({recipient_email}). "
+        f"Include proper greeting to {recipient_name} and sign-off from {sender_name}. "
+        f"Replace any placeholders like [your name] with {sender_name} and [recipient] with {recipient_name}. "
+        f"Make it concise but comprehensive. {subject_rule} {_modifier_instructions(modifiers)}"
+    )
+    on_delta = delta_sink()
+    body_stream = JsonStringFieldStream("body", on_delta) if on_delta else None
+    text = await chat_completion(
+        model=EMAIL_MODEL,
+        messages=[
+            {"role": "system", "content": COMPOSE_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=400,
+        temperature=0.7,
+        response_format={"type": "json_object"},
+        on_delta=body_stream.feed if body_stream else None,
+    )
+    return _parse_composition(text)
+
+
+async def _compose_concurrently(instructions, explicit_subject, sender_name, recipient_name, recipient_email, modifiers):
+    """The separate subject and body prompts, run at the same time instead of one after the other."""
+    async def subject():
+        if explicit_subject:
+            return explicit_subject
+        subject_prompt = (
+            "Create a concise yet clear email subject line for a professional email, based on these instructions: "
+            f"'{instructions}'. {_modifier_instructions(modifiers)} "
+            "Return ONLY the subject line text, no quotes or explanations."
+        )
+        return await chat_completion(
+            model=EMAIL_MODEL,
+            messages=[
+                {"role": "system", "content": "You are an AI specialized in writing short, professional email subjects that capture the essence of communication intent."},
+                {"role": "user", "content": subject_prompt},
+            ],
+            max_tokens=60,
+            temperature=0.7,
+        )
+
+    async def body():
+        body_prompt = (
+            f"Write a professional email body based on these instructions: '{instructions}'. "
+            f"The email is FROM: {sender_name} TO: {recipient_name} ({recipient_email}). "
+            f"Include proper greeting to {recipient_name} and sign-off from {sender_name}. "
+            f"Replace any placeholders like [your name] with {sender_name} and [recipient] with {recipient_name}. "
+            f"Make it concise but comprehensive. {_modifier_instructions(modifiers)}"
+        )
+        return await chat_completion(
+            model=EMAIL_MODEL,
+            messages=[
+                {"role": "system", "content": "You are an AI specialized in writing professional, well-structured email content."},
+                {"role": "user", "content": body_prompt},
+            ],
+            max_tokens=300,
+            temperature=0.7,
+            on_delta=delta_sink(),
+        )
+
+    return tuple(await asyncio.gather(subject(), body()))
+
+
+async def generate_email_content(instructions: str, explicit_subject=None, sender_name=None, recipient_email=None, modifiers=None):
+    """Returns (subject, body). `modifiers` is the extract_intent_modifiers(text, "send_email") dict."""
+    modifiers = modifiers or {}
+    recipient_name = recipient_name_from_email(recipient_email)
+    sender_name = sender_name or "Your Name"
+    args = (instructions, explicit_subject, sender_name, recipient_name, recipient_email, modifiers)
+
+    started = time.perf_counter()
+    composed = None
+    mode = "structured"
+    with span("email.compose.structured", backend="openai") as stage:
+        try:
+            composed = await _compose_structured(*args)
+        except (BulkheadFull, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            print(f"Structured email composition failed: {e}")
+        if composed is None:
+            stage.failed = True
+    if composed is None:
+        mode = "fallback"
+        # Part of the structured body may already be in the preview
+        emit("stage", stage="reset")
+        with span("email.compose.fallback", backend="openai"):
+            composed = await _compose_concurrently(*args)
+    subject, body = composed
+    if explicit_subject:
+        subject = explicit_subject
+    print(f"Email composed in {(time.perf_counter() - started) * 1000:.0f} ms ({mode})")
+
+    replacements = {
+        "[your name]": sender_name,
+        "[sender]": sender_name,
+        "[recipient]": recipient_name,
+        "[recipient name]": recipient_name,
+    }
+    for placeholder, replacement in replacements.items():
+        body = body.replace(placeholder, replacement)
+
+    return subject, body
@@ -0,0 +1,141 @@
+# server/embedding_classifier.py
+"""
+Single-pass embedding tier for intent classification.
+
+The message is embedded once with a small sentence encoder and compared
+(cosine similarity) against one prototype embedding per intent, built from a
+handful of example utterances. That is one forward pass per message instead
+of one per candidate label with bart-large-mnli.
+
+Prototypes are computed on first load and cached on disk, keyed by the encoder
+name and the example set, so later startups only load the encoder.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+PROTOTYPES_PATH = pathlib.Path(
+    os.getenv("EMBEDDING_PROTOTYPES_PATH", pathlib.Path(__file__).parent / ".model_cache" / "intent_prototypes.json")
+)
+
+INTENT_EXAMPLES = {
+    "schedule_meeting": [
+        "schedule a meeting tomorrow at 3pm",
+        "find a time for us to talk on thursday",
+        "put a call with the vendor on my calendar",
+        "book an hour with the product team next week",
+        "set up a review session for monday morning",
+    ],
+    "create_crm": [
+        "create a new hubspot contact named john smith",
+        "add this person to the crm as a lead",
+        "save a new client entry for globex",
+        "enter a new account in our contact list",
+    ],
+    "update_crm": [
+        "update the email for jane doe in hubspot",
+        "change the contact's last name",
+        "edit the company field on mike's contact",
+        "the address on that client entry is outdated, change it",
+    ],
+    "send_email": [
+        "send an email to john about the report",
+        "email the team that the offsite is confirmed",
+        "let the landlord know by email that rent is paid",
+        "write to my manager asking for friday off",
+    ],
+    "retrieve_email": [
+        "show me my latest emails",
+        "has anyone emailed me today",
+        "summarize the mail i got from the bank",
+        "any replies from the client yet",
+    ],
+    "send_slack": [
+        "post in the engineering channel that the deploy is done",
+        "drop a note in #random that lunch is here",
+        "tell the support channel the outage is resolved",
+        "announce on slack that the office is closed",
+    ],
+    "retrieve_slack": [
+        "show the latest messages in #general",
+        "what did people post in the support channel",
+        "read me the recent slack discussion",
+        "what's been happening in the design room",
+    ],
+    "retrieve_crm": [
+        "show me our hubspot contacts",
+        "which clients did we sign recently",
+        "give me the list of accounts in the crm",
+        "who is in our contact database",
+    ],
+    "general": [
+        "what can you help me with",
+        "explain how photosynthesis works",
+        "what's the weather usually like in may",
+        "give me a fun fact",
+    ],
+}
+
+
+def _fingerprint(model_name):
+    payload = json.dumps({"model": model_name, "examples": INTENT_EXAMPLES}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingIntentClassifier:
+    """
+    Callable with the same output shape as the zero-shot pipeline:
+        classifier(text) -> {"labels": [...], "scores": [...]} sorted by score.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, prototypes_path=PROTOTYPES_PATH):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self._torch = torch
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.labels, self.prototypes = self._load_prototypes(pathlib.Path(prototypes_path))
+
+    def embed(self, texts):
+        """Mean-pooled, L2-normalised sentence embeddings (one row per text)."""
+        torch = self._torch
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=128, return_tensors="pt")
+        with torch.no_grad():
+            token_embeddings = self.model(**encoded).last_hidden_state
+        mask = encoded["attention_mask"].unsqueeze(-1).float()
+        pooled = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return torch.nn.functional.normalize(pooled, dim=-1)
+
+    def _load_prototypes(self, path):
+        fingerprint = _fingerprint(self.model_name)
+        if path.exists():
+            cached = json.loads(path.read_text())
+            if cached.get("fingerprint") == fingerprint:
+                return cached["labels"], self._torch.tensor(cached["prototypes"])
+
+        print(f"Computing intent prototypes with {self.model_name} (one-time)")
+        labels = list(INTENT_EXAMPLES)
+        prototypes = self._torch.stack([
+            self._torch.nn.functional.normalize(self.embed(INTENT_EXAMPLES[label]).mean(dim=0), dim=-1)
+            for label in labels
+        ])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "fingerprint": fingerprint,
+            "labels": labels,
+            "prototypes": prototypes.tolist(),
+        }))
+        return labels, prototypes
+
+    def __call__(self, text):
+        scores = (self.embed([text]) @ self.prototypes.T)[0].tolist()
+        ranked = sorted(zip(self.labels, scores), key=lambda pair: pair[1], reverse=True)
+        return {
+            "labels": [label for label, _ in ranked],
+            "scores": [score for _, score in ranked],
+        }
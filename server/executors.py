@@ -0,0 +1,82 @@
+# server/executors.py
+"""
+Bounded thread pools for blocking work called from async endpoints.
+
+Google's client library (googleapiclient/httplib2) and the local NLP models
+have no async API, so async code hands them to one of these pools instead of
+blocking the event loop. Each pool is sized for its backend, so a slow Gmail
+call can't occupy the threads classification needs (and vice versa). Callers
+take the backend's bulkhead slot (see bulkheads) before submitting, and the
+default sizes match the bulkhead limits, so a task never sits in a pool's
+unbounded queue.
+
+fanout_executor is different: it runs the per-item work a single call fans
+out (see map_in_order), e.g. fetching and summarizing each email of a Gmail
+listing. Its size caps that work across all requests; when several listings
+fan out at once, their items queue here and just run a little later.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from bulkheads import bulkheads
+
+GOOGLE_API_WORKERS = int(os.getenv(
+    "GOOGLE_API_WORKERS",
+    str(bulkheads["gmail"].limit + bulkheads["calendar"].limit + bulkheads["gmail_listing"].limit),
+))
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", str(bulkheads["local_model"].limit)))
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "16"))
+
+# Gmail and Calendar calls, and the Gmail listings that fan their gets out to fanout_executor
+google_executor = ThreadPoolExecutor(max_workers=GOOGLE_API_WORKERS, thread_name_prefix="google-api")
+# Local intent tiers and slot extraction (CPU work and local-model waits; the GPT
+# tier is awaited on the event loop, see refined_nlp.async_bert_classify)
+nlp_executor = ThreadPoolExecutor(max_workers=NLP_WORKERS, thread_name_prefix="nlp")
+# Per-item work fanned out by blocking code that already runs on a pool (map_in_order)
+fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+
+
+async def run_blocking(executor, fn, *args, **kwargs):
+    """Runs fn(*args, **kwargs) on `executor` and awaits the result, keeping the caller's contextvars."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def iterate_blocking(executor, iterator):
+    """Async iteration over a blocking iterator (e.g. a generator making API calls): each next() runs on `executor`."""
+    finished = object()
+    while True:
+        item = await run_blocking(executor, next, iterator, finished)
+        if item is finished:
+            return
+        yield item
+
+
+def map_in_order(executor, fn, items, width):
+    """
+    Blocking fan-out: runs fn(item) for each item on `executor`, at most
+    `width` at a time, and yields the results in input order, each as soon
+    as it and the ones before it are done. Each call keeps the caller's
+    contextvars. An exception is raised when its result is reached; calls
+    not yet started are cancelled if the caller stops early or fails.
+
+    Don't call it with the pool the caller itself runs on: a caller waiting
+    on its own pool's queue can deadlock it.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(contextvars.copy_context().run, fn, item))
+            if len(pending) >= width:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,216 @@
+# server/gmail/email_preprocess.py
+"""
+Prepares email bodies for summarization: drops the parts that cost tokens
+without adding anything to a summary, then bounds what's left.
+
+  1. strip quoted replies: ">" lines, and everything from an "On ... wrote:"
+     or "-----Original Message-----" style header onwards (the history is
+     already in earlier messages of the thread)
+  2. strip footers: unsubscribe, "view in browser", confidentiality and
+     similar boilerplate, when it sits in the last part of the email
+  3. strip the signature: a "-- " delimiter, "Sent from my ..." line or
+     closing sign-off, when real content comes before it and only a few
+     name/title/phone lines follow (never most of the body)
+  4. cap the result at EMAIL_BODY_TOKEN_BUDGET tokens (keeping the start)
+
+Bodies still over EMAIL_CHUNK_TOKENS afterwards are summarized map-reduce
+style by gmail_integration, using split_into_chunks.
+
+Tokens are counted with tiktoken (the gpt-3.5-turbo encoding) when it's
+installed and its encoding loads, else estimated as ~4 characters per token.
+"""
+
+import os
+import re
+
+from prometheus_client import Counter
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+EMAIL_BODY_TOKEN_BUDGET = int(os.getenv("EMAIL_BODY_TOKEN_BUDGET", "6000"))
+EMAIL_CHUNK_TOKENS = int(os.getenv("EMAIL_CHUNK_TOKENS", "1500"))
+SIGNATURE_MAX_LINES = int(os.getenv("SIGNATURE_MAX_LINES", "4"))
+
+BODY_TOKENS = Counter(
+    "workflowx_email_body_tokens_total", "Email body tokens before and after preprocessing", ["stage"]
+)
+
+_REPLY_HEADER = re.compile(
+    r"^\s*(On .{0,200}wrote:|-{2,}\s*(Original|Forwarded) Message\s*-{2,}|Begin forwarded message:|_{10,})\s*$",
+    re.IGNORECASE,
+)
+_OUTLOOK_FROM = re.compile(r"^\s*From: ", re.IGNORECASE)
+_OUTLOOK_SENT = re.compile(r"^\s*(Sent|Date): ", re.IGNORECASE)
+_SENT_FROM = re.compile(r"^\s*Sent from my \w+", re.IGNORECASE)
+_SIGN_OFF = re.compile(
+    r"^\s*(((best|kind|warm)\s+)?(regards|wishes)|thanks|thank you|many thanks|cheers|sincerely|best|yours truly)[,!.]?\s*$",
+    re.IGNORECASE,
+)
+_CONTACT = re.compile(r"\S+@\S+|\S*(https?://|www\.)\S*|\S+\.(com|org|net|io)\b\S*", re.IGNORECASE)
+_SIGNATURE_CONNECTORS = {"of", "and", "at", "the", "for", "in", "de", "van", "von"}
+_FOOTER = re.compile(
+    r"unsubscribe|view (it |this email )?in (your )?browser|manage (your )?(email )?preferences|"
+    r"you are receiving this|you received this|this (e-?mail|message) (and any attachments )?(is|are|may be) confidential|"
+    r"privacy policy|all rights reserved|update your preferences",
+    re.IGNORECASE,
+)
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """The tiktoken encoding, or None to estimate (not installed, or its BPE file couldn't be fetched)."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+            except Exception as e:
+                print(f"tiktoken encoding unavailable, estimating token counts instead: {e}")
+        _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def _is_reply_header(lines, i):
+    line = lines[i]
+    following = lines[i + 1] if i + 1 < len(lines) else ""
+    return bool(
+        _REPLY_HEADER.match(line)
+        # Gmail wraps long "On <date> <name> <address> wrote:" lines
+        or (line.lstrip().startswith("On ") and following.rstrip().endswith("wrote:"))
+        # Outlook: "From: ..." directly followed by "Sent: ..." or "Date: ..."
+        or (_OUTLOOK_FROM.match(line) and _OUTLOOK_SENT.match(following))
+    )
+
+
+def strip_quoted_replies(text: str) -> str:
+    lines = text.splitlines()
+    for i in range(len(lines)):
+        if _is_reply_header(lines, i):
+            # A header before any text is a forward with no note of its own: keep what was forwarded
+            if any(line.strip() for line in lines[:i]):
+                lines = lines[:i]
+            break
+    return "\n".join(line for line in lines if not line.lstrip().startswith(">"))
+
+
+def _is_signature_line(line):
+    """Name, title, company, phone or address: short, no sentence punctuation, no lowercase words but connectors."""
+    line = line.strip()
+    if len(line) > 50 or line.endswith((".", "!", "?", ";")):
+        return False
+    words = re.findall(r"[A-Za-z][A-Za-z'-]*", _CONTACT.sub(" ", line))
+    return all(word[0].isupper() or word in _SIGNATURE_CONNECTORS for word in words)
+
+
+def _signature_follows(lines, i, max_lines):
+    """
+    Whether lines[i + 1:] is a signature block: at most max_lines
+    signature-like lines, after real content in lines[:i], and not most of the body.
+    """
+    before = sum(len(line.strip()) for line in lines[:i])
+    tail = [line.strip() for line in lines[i + 1:] if line.strip()]
+    if not before or len(tail) > max_lines or not all(_is_signature_line(line) for line in tail):
+        return False
+    return sum(len(line) for line in tail) <= before
+
+
+def strip_signature(text: str) -> str:
+    lines = text.splitlines()
+    # The "-- " delimiter (often trimmed to "--") or a mobile footer, near the end
+    for i in range(max(0, len(lines) - 12), len(lines)):
+        if lines[i].rstrip() == "--" or _SENT_FROM.match(lines[i]):
+            if _signature_follows(lines, i, SIGNATURE_MAX_LINES + 2):
+                lines = lines[:i]
+            break
+    # A sign-off near the end followed only by a few signature lines (name, title, phone)
+    for i in range(len(lines) - 1, max(-1, len(lines) - 9), -1):
+        if _SIGN_OFF.match(lines[i]):
+            if _signature_follows(lines, i, SIGNATURE_MAX_LINES):
+                lines = lines[:i + 1]
+            break
+    return "\n".join(lines)
+
+
+def strip_footer(text: str) -> str:
+    lines = text.splitlines()
+    # Only the last third: "unsubscribe" in the middle of a message is content
+    start = len(lines) - len(lines) // 3
+    for i in range(start, len(lines)):
+        if _FOOTER.search(lines[i]):
+            # Cut from the start of the footer's paragraph, unless that paragraph is the whole email
+            j = i
+            while j > 0 and lines[j - 1].strip():
+                j -= 1
+            if any(line.strip() for line in lines[:j]):
+                i = j
+            return "\n".join(lines[:i])
+    return text
+
+
+def clean_email_body(text: str) -> str:
+    text = text.replace("\r\n", "\n")
+    text = strip_quoted_replies(text)
+    # The footer comes after the signature, so it goes first
+    text = strip_footer(text)
+    text = strip_signature(text)
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def prepare_email_body(text: str):
+    """
+    (prepared body, tokens before, tokens after): the body cleaned and
+    capped at EMAIL_BODY_TOKEN_BUDGET tokens.
+    """
+    before = count_tokens(text)
+    cleaned = clean_email_body(text)
+    if count_tokens(cleaned) > EMAIL_BODY_TOKEN_BUDGET:
+        cleaned = truncate_to_tokens(cleaned, EMAIL_BODY_TOKEN_BUDGET).rstrip() + "\n[truncated]"
+    after = count_tokens(cleaned)
+    BODY_TOKENS.labels("raw").inc(before)
+    BODY_TOKENS.labels("prepared").inc(after)
+    return cleaned, before, after
+
+
+def split_into_chunks(text: str, max_tokens: int = None):
+    """Consecutive chunks of at most max_tokens tokens (EMAIL_CHUNK_TOKENS), split at paragraph breaks where possible."""
+    max_tokens = max_tokens or EMAIL_CHUNK_TOKENS
+    chunks, current, used = [], [], 0
+    for paragraph in text.split("\n\n"):
+        tokens = count_tokens(paragraph)
+        if tokens > max_tokens:
+            # One oversized paragraph: split it into even slices of about max_tokens
+            step = max(1, len(paragraph) * max_tokens // tokens)
+            pieces = [paragraph[i:i + step] for i in range(0, len(paragraph), step)]
+        else:
+            pieces = [paragraph]
+        for piece in pieces:
+            piece_tokens = count_tokens(piece)
+            if current and used + piece_tokens > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
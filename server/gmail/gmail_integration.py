@@ -1,20 +1,43 @@
 import os
 import base64
 import datetime
+import json
+import threading
 import openai
 
 from email.mime.text import MIMEText
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from bulkheads import guarded, hold, hold_async
+from executors import fanout_executor, google_executor, iterate_blocking, map_in_order, run_blocking
+from tracing import mark_error, span, traced
+
+from .email_preprocess import EMAIL_CHUNK_TOKENS, count_tokens, prepare_email_body, split_into_chunks
 from .gmail_auth import get_gmail_credentials
+from .summary_store import summary_store
+
+# Messages of one listing fetched (and summary batches sent) at the same time
+EMAIL_FANOUT_WIDTH = int(os.getenv("EMAIL_FANOUT_WIDTH", "8"))
+# Summary batches: email tokens per request, and emails per request
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", "3000"))
+SUMMARY_BATCH_MAX_EMAILS = int(os.getenv("SUMMARY_BATCH_MAX_EMAILS", "8"))
+# Reply tokens allowed per email in a batch (a single summary gets 150)
+SUMMARY_BATCH_TOKENS_PER_EMAIL = 120
+
+# httplib2, which the client uses underneath, isn't thread-safe, so each
+# fan-out thread keeps its own service (see _thread_service)
+_local = threading.local()
 
 ###############################################################################
 # 1) SEND EMAIL (unchanged from your current version)
 ###############################################################################
-def send_gmail(to_email: str, subject: str, body: str):
+@traced("gmail.send", backend="gmail")
+@guarded("gmail")
+def send_gmail(to_email: str, subject: str, body: str, cc: str = None):
     """
     Sends an email via the user's personal Gmail account using OAuth tokens.
+    `cc` is an optional address (or comma-separated addresses) to copy.
     """
     try:
         creds = get_gmail_credentials()
@@ -24,6 +47,8 @@ def send_gmail(to_email: str, subject: str, body: str):
         message = MIMEText(body)
         message["to"] = to_email
         message["subject"] = subject
+        if cc:
+            message["cc"] = cc
 
         # Encode the message in base64
         raw = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
@@ -38,6 +63,7 @@ def send_gmail(to_email: str, subject: str, body: str):
 
     except HttpError as e:
         print(f"Gmail send error: {e}")
+        mark_error()
         return None
 
 ###############################################################################
@@ -72,6 +98,14 @@ def _extract_plain_text(msg_payload: dict) -> str:
 ###############################################################################
 # 3) HELPER: Summarize an email's body with GPT
 ###############################################################################
+# Part of the summary store key: bump it when the summary prompt, model or
+# body preprocessing changes, so stored summaries from before aren't served.
+SUMMARY_PROMPT_VERSION = "v4"
+SUMMARY_UNAVAILABLE = "Summary unavailable."
+
+
+@traced("openai.summarize", backend="openai")
+@guarded("openai")
 def _summarize_email(content: str) -> str:
     """
     Uses GPT to summarize the email content into a short paragraph.
@@ -100,7 +134,253 @@ def _summarize_email(content: str) -> str:
         return summary
     except Exception as e:
         print(f"OpenAI summarization error: {e}")
-        return "Summary unavailable."
+        mark_error()
+        return SUMMARY_UNAVAILABLE
+
+
+def _summary_batch_size(pending: int) -> int:
+    """
+    Emails per batch for `pending` emails. A batch writes its summaries one
+    after another, so while every email gets its own fan-out slot
+    (pending <= EMAIL_FANOUT_WIDTH) each is summarized on its own; beyond
+    that, emails share requests so all batches still run in one round of
+    EMAIL_FANOUT_WIDTH, up to SUMMARY_BATCH_MAX_EMAILS per batch.
+    """
+    if pending <= EMAIL_FANOUT_WIDTH:
+        return 1
+    return max(1, min(SUMMARY_BATCH_MAX_EMAILS, -(-pending // EMAIL_FANOUT_WIDTH)))
+
+
+def _pack_summary_batches(items, max_emails: int = None):
+    """
+    Splits (message_id, content) pairs, in order, into batches of at most
+    max_emails emails (SUMMARY_BATCH_MAX_EMAILS) and SUMMARY_BATCH_TOKEN_BUDGET
+    tokens, so short emails share a request. An email over EMAIL_CHUNK_TOKENS
+    always goes alone (it's summarized map-reduce style, see _summarize_long_email).
+    """
+    max_emails = max_emails or SUMMARY_BATCH_MAX_EMAILS
+    batches, batch, used = [], [], 0
+    for message_id, content in items:
+        tokens = count_tokens(content)
+        if batch and (
+            tokens > EMAIL_CHUNK_TOKENS
+            or used + tokens > SUMMARY_BATCH_TOKEN_BUDGET
+            or len(batch) >= max_emails
+        ):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append((message_id, content))
+        used += tokens
+        if tokens > EMAIL_CHUNK_TOKENS:
+            batches.append(batch)
+            batch, used = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _parse_batch_summaries(text: str, message_ids) -> dict:
+    """
+    {message_id: summary} from a batch reply, for the requested ids only.
+    Accepts {"summaries": [{"id", "summary"}, ...]} as asked, and also a bare
+    array, an {id: summary} object, or either wrapped in other text.
+    """
+    data = None
+    for candidate in (text, text[text.find("{"):text.rfind("}") + 1], text[text.find("["):text.rfind("]") + 1]):
+        try:
+            data = json.loads(candidate)
+            break
+        except ValueError:
+            continue
+    entries = data.get("summaries", data) if isinstance(data, dict) else data
+    if isinstance(entries, dict):
+        pairs = entries.items()
+    elif isinstance(entries, list):
+        pairs = ((entry.get("id"), entry.get("summary")) for entry in entries if isinstance(entry, dict))
+    else:
+        pairs = ()
+
+    summaries = {}
+    for message_id, summary in pairs:
+        if str(message_id) in message_ids and isinstance(summary, str) and summary.strip():
+            summaries[str(message_id)] = summary.strip()
+    return summaries
+
+
+@traced("openai.summarize_batch", backend="openai")
+@guarded("openai")
+def _summarize_batch(batch) -> dict:
+    """
+    Summarizes several (message_id, content) emails in one GPT request, so
+    the instructions are sent once per batch instead of once per email.
+    Returns {message_id: summary} for the emails the reply covered; {} if
+    the request failed.
+    """
+    emails = "".join(f'<email id="{message_id}">\n{content}\n</email>\n\n' for message_id, content in batch)
+    prompt = (
+        "Please summarize each of the following emails in a concise manner, "
+        "highlighting any key points. If there's a sender or date mentioned, "
+        "please include them as well.\n\n"
+        f"{emails}"
+    )
+
+    try:
+        response = openai.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": (
+                    "You are a helpful AI that summarizes emails. Reply with a JSON object "
+                    '{"summaries": [{"id": ..., "summary": ...}, ...]} with one entry per email, '
+                    "using each email's id exactly as given."
+                )},
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=SUMMARY_BATCH_TOKENS_PER_EMAIL * len(batch) + 50,
+            temperature=0.7,
+            response_format={"type": "json_object"},
+        )
+        return _parse_batch_summaries(response.choices[0].message.content, {message_id for message_id, _ in batch})
+    except Exception as e:
+        print(f"OpenAI batch summarization error: {e}")
+        mark_error()
+        return {}
+
+
+@traced("openai.summarize_reduce", backend="openai")
+@guarded("openai")
+def _combine_summaries(part_summaries) -> str:
+    """The reduce step for a long email: one summary from its parts' summaries."""
+    parts = "\n\n".join(f"Part {i}: {summary}" for i, summary in enumerate(part_summaries, start=1))
+    prompt = (
+        "The following are summaries of consecutive parts of one long email. "
+        "Combine them into a single concise summary of the whole email, "
+        "highlighting any key points. If there's a sender or date mentioned, "
+        "please include them as well:\n\n"
+        f"{parts}"
+    )
+
+    try:
+        response = openai.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a helpful AI that summarizes emails."},
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=150,
+            temperature=0.7,
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"OpenAI summary reduce error: {e}")
+        mark_error()
+        return SUMMARY_UNAVAILABLE
+
+
+def _summarize_items(items) -> dict:
+    """
+    {id: summary} for (id, content) pairs that fit one request each: one
+    batch request per packed batch, then a single request for anything a
+    batch reply left out (or a batch of one).
+    """
+    summaries = {}
+    for batch in _pack_summary_batches(items):
+        if len(batch) > 1:
+            summaries.update(_summarize_batch(batch))
+        for item_id, content in batch:
+            if item_id not in summaries:
+                summaries[item_id] = _summarize_email(content)
+    return summaries
+
+
+def _summarize_long_email(content: str) -> str:
+    """
+    Map-reduce for a body over EMAIL_CHUNK_TOKENS: its chunks are summarized
+    like separate emails (several per request), then the part summaries are
+    combined in one more request.
+    """
+    chunks = {f"part-{i}": chunk for i, chunk in enumerate(split_into_chunks(content), start=1)}
+    part_summaries = _summarize_items(list(chunks.items()))
+    parts = [part_summaries[part_id] for part_id in chunks if part_summaries[part_id] != SUMMARY_UNAVAILABLE]
+    if not parts:
+        return SUMMARY_UNAVAILABLE
+    return _combine_summaries(parts)
+
+
+def _summarize_and_store(batch) -> dict:
+    """
+    {message_id: summary} for every email of a batch from
+    _pack_summary_batches: a long email alone is summarized map-reduce
+    style, the rest through _summarize_items. Summaries are saved to
+    summary_store, except failed ones, so those are retried next time.
+    """
+    summaries = {message_id: "No content to summarize." for message_id, content in batch if not content.strip()}
+    batch = [(message_id, content) for message_id, content in batch if content.strip()]
+    if len(batch) == 1 and count_tokens(batch[0][1]) > EMAIL_CHUNK_TOKENS:
+        summaries[batch[0][0]] = _summarize_long_email(batch[0][1])
+    elif batch:
+        summaries.update(_summarize_items(batch))
+
+    for message_id, summary in summaries.items():
+        if summary != SUMMARY_UNAVAILABLE:
+            summary_store.put(message_id, SUMMARY_PROMPT_VERSION, summary)
+    return summaries
+
+
+def _summaries_in_order(emails, stored: dict):
+    """
+    Yields (email, summary) for `emails` (dicts with "id" and "payload") in
+    order. Stored summaries are used as is; the other bodies are cleaned and
+    capped (see email_preprocess), packed into batches sized for how many
+    there are (see _summary_batch_size and _pack_summary_batches),
+    EMAIL_FANOUT_WIDTH batches run at a time, and each email is yielded once
+    its batch and everything before it are done.
+    """
+    pending = []
+    tokens_before = tokens_after = 0
+    for email in emails:
+        if email["id"] in stored:
+            continue
+        body, before, after = prepare_email_body(_extract_plain_text(email["payload"]))
+        pending.append((email["id"], body))
+        tokens_before += before
+        tokens_after += after
+    if pending:
+        print(f"Email bodies to summarize: {len(pending)} emails, {tokens_before} -> {tokens_after} tokens after preprocessing")
+
+    batches = _pack_summary_batches(pending, _summary_batch_size(len(pending)))
+    results = map_in_order(fanout_executor, _summarize_and_store, batches, EMAIL_FANOUT_WIDTH)
+    summaries = dict(stored)
+    for email in emails:
+        while email["id"] not in summaries:
+            summaries.update(next(results))
+        yield email, summaries[email["id"]]
+
+
+def _thread_service(creds):
+    """This thread's Gmail service, rebuilt when the access token changes."""
+    token = getattr(creds, "token", None)
+    cached = getattr(_local, "service", None)
+    if cached is None or cached[0] != token:
+        _local.service = (token, build("gmail", "v1", credentials=creds))
+    return _local.service[1]
+
+
+def _get_message(creds, msg_id: str, full: bool) -> dict:
+    """One message, in 'full' format or (when the body isn't needed) just its From/Date/Subject headers."""
+    service = _thread_service(creds)
+    with span("gmail.get", backend="gmail"), hold("gmail"):
+        if full:
+            return service.users().messages().get(
+                userId="me",
+                id=msg_id,
+                format="full"
+            ).execute()
+        return service.users().messages().get(
+            userId="me",
+            id=msg_id,
+            format="metadata",
+            metadataHeaders=["From", "Date", "Subject"]
+        ).execute()
 
 ###############################################################################
 # 4) GET + SUMMARIZE LATEST EMAILS FROM INBOX
@@ -111,111 +391,214 @@ def get_latest_emails(max_results: int = 5, sender_filter: str = None, force_ref
     with optional filtering by sender,
     then for each email:
       - Extracts From, Date, Subject, plain-text body
-      - Summarizes the content using GPT
+      - Summarizes the content using GPT (several emails per request)
     Returns a nicely formatted string with details for all emails.
+    Summaries of messages seen before come from summary_store, so only new
+    mail costs a GPT call.
     
     Parameters:
     - max_results: Maximum number of emails to retrieve
     - sender_filter: Filter emails by sender name or email address (case-insensitive substring match)
-    - force_refresh: If True, bypass any caching and always get fresh data
+    - force_refresh: If True, always list fresh data from Gmail (stored summaries are still used:
+      a message's summary doesn't change)
     """
     try:
-        creds = get_gmail_credentials()
-        service = build("gmail", "v1", credentials=creds)
+        return "\n".join(iter_latest_emails(max_results, sender_filter, force_refresh))
+    except HttpError as e:
+        print(f"Gmail retrieve error: {e}")
+        return "Error retrieving emails."
 
-        # 1) List messages in the inbox
-        query = "in:inbox"
-        
-        # Add sender filter if provided
-        if sender_filter:
-            # Check if it looks like an email address
-            if '@' in sender_filter:
-                query += f" from:{sender_filter}"
-            else:
-                # For names we need to be more careful - Gmail API uses exact phrase matching
-                query += f" from:{sender_filter}"
-        
-        if force_refresh:
-            print(f"Fetching fresh email data with query: {query}")
-        
+
+def iter_latest_emails(max_results: int = 5, sender_filter: str = None, force_refresh: bool = False):
+    """
+    Generator behind get_latest_emails: yields the header first, then each
+    email's block as soon as its summary is ready (joined with "\n" they
+    make get_latest_emails' result). Messages are fetched in parallel
+    (EMAIL_FANOUT_WIDTH at a time) and summarized in batches, but yielded
+    in Inbox order.
+    Gmail errors propagate as HttpError.
+    """
+    creds = get_gmail_credentials()
+    service = build("gmail", "v1", credentials=creds)
+
+    # 1) List messages in the inbox
+    query = "in:inbox"
+    
+    # Add sender filter if provided
+    if sender_filter:
+        # Check if it looks like an email address
+        if '@' in sender_filter:
+            query += f" from:{sender_filter}"
+        else:
+            # For names we need to be more careful - Gmail API uses exact phrase matching
+            query += f" from:{sender_filter}"
+    
+    if force_refresh:
+        print(f"Fetching fresh email data with query: {query}")
+    
+    with span("gmail.list", backend="gmail"), hold("gmail"):
         result = service.users().messages().list(
             userId="me",
             q=query,
             maxResults=max_results
         ).execute()
 
-        messages = result.get("messages", [])
-        if not messages:
-            if sender_filter:
-                return f"No emails found from {sender_filter} in your Inbox."
-            else:
-                return "No emails found in your Inbox."
-
+    messages = result.get("messages", [])
+    if not messages:
         if sender_filter:
-            final_output = [f"📬 Here are your latest emails from {sender_filter}:\n\n"]
+            yield f"No emails found from {sender_filter} in your Inbox."
         else:
-            final_output = ["📬 Here are your latest emails:\n\n"]
-
-        # For tracking if server-side filtering worked correctly
-        matching_emails = []
-        
-        # 2) For each message ID, get the 'full' format
-        for idx, msg_info in enumerate(messages, start=1):
-            msg_id = msg_info["id"]
-            msg_data = service.users().messages().get(
-                userId="me",
-                id=msg_id,
-                format="full"
-            ).execute()
+            yield "No emails found in your Inbox."
+        return
+
+    # Summaries already stored for these messages, in one lookup
+    stored = summary_store.get_many([m["id"] for m in messages], SUMMARY_PROMPT_VERSION)
+
+    def fetch(msg_info):
+        msg_id = msg_info["id"]
+        # 2) Get the 'full' format (only the headers if its summary is stored)
+        msg_data = _get_message(creds, msg_id, full=msg_id not in stored)
+
+        payload = msg_data.get("payload", {})
+        headers = payload.get("headers", [])
+
+        # Extract basic headers: "From", "Date", "Subject"
+        from_ = next((h["value"] for h in headers if h["name"].lower() == "from"), "(Unknown Sender)")
+        date_ = next((h["value"] for h in headers if h["name"].lower() == "date"), "(Unknown Date)")
+        subject = next((h["value"] for h in headers if h["name"].lower() == "subject"), "(No Subject)")
+
+        # If sender filter is provided, do client-side filtering as well
+        # This is a backup in case Gmail API query doesn't filter exactly as expected
+        if sender_filter and sender_filter.lower() not in from_.lower():
+            return None
+
+        return {
+            "id": msg_id,
+            "from": from_,
+            "date": date_,
+            "subject": subject,
+            "payload": payload
+        }
 
-            payload = msg_data.get("payload", {})
-            headers = payload.get("headers", [])
-
-            # Extract basic headers: "From", "Date", "Subject"
-            from_ = next((h["value"] for h in headers if h["name"].lower() == "from"), "(Unknown Sender)")
-            date_ = next((h["value"] for h in headers if h["name"].lower() == "date"), "(Unknown Date)")
-            subject = next((h["value"] for h in headers if h["name"].lower() == "subject"), "(No Subject)")
-
-            # If sender filter is provided, do client-side filtering as well
-            # This is a backup in case Gmail API query doesn't filter exactly as expected
-            if sender_filter and sender_filter.lower() not in from_.lower():
-                continue
-                
-            matching_emails.append({
-                "id": msg_id,
-                "from": from_,
-                "date": date_,
-                "subject": subject,
-                "payload": payload
-            })
-
-        # If no emails match our filter (client-side)
-        if sender_filter and not matching_emails:
-            return f"No emails found from {sender_filter} in your Inbox."
-            
-        # Process the matching emails
-        for idx, email in enumerate(matching_emails, start=1):
-            # 3) Extract plain-text body
-            plain_text = _extract_plain_text(email["payload"])
-
-            # 4) Summarize with GPT
-            summary = _summarize_email(plain_text)
-
-            # 5) Format
-            email_info = (
-                f"Email #{idx}\n"
-                f"Subject: {email['subject']}\n"
-                f"From: {email['from']}\n"
-                f"Date: {email['date']}\n"
-                f"Summary: {summary}\n"
-                f"----------------------------------------\n\n"
-            )
-
-            final_output.append(email_info)
-
-        return "\n".join(final_output)
+    # Messages are fetched EMAIL_FANOUT_WIDTH at a time, kept in Inbox order
+    matching_emails = [
+        email for email in map_in_order(fanout_executor, fetch, messages, EMAIL_FANOUT_WIDTH) if email is not None
+    ]
 
+    # If no emails match our filter (client-side)
+    if sender_filter and not matching_emails:
+        yield f"No emails found from {sender_filter} in your Inbox."
+        return
+
+    if sender_filter:
+        yield f"📬 Here are your latest emails from {sender_filter}:\n\n"
+    else:
+        yield "📬 Here are your latest emails:\n\n"
+
+    # 3) Summarize the plain-text bodies with GPT, several per request, unless stored
+    for idx, (email, summary) in enumerate(_summaries_in_order(matching_emails, stored), start=1):
+        # 4) Format
+        yield (
+            f"Email #{idx}\n"
+            f"Subject: {email['subject']}\n"
+            f"From: {email['from']}\n"
+            f"Date: {email['date']}\n"
+            f"Summary: {summary}\n"
+            f"----------------------------------------\n\n"
+        )
+
+
+
+###############################################################################
+# 5) STRUCTURED LISTING FOR THE ANALYTICS API (no text formatting)
+###############################################################################
+def list_recent_emails(max_results: int = 10, page_token: str = None, sender_filter: str = None, summarize: bool = False) -> dict:
+    """
+    One page of the latest Inbox messages as dicts (id, thread_id, from,
+    date, subject, snippet, and summary if `summarize`). Without summaries
+    only the headers are fetched, not the bodies, and GPT isn't called; with
+    them, only messages without a stored summary (see summary_store) are.
+    Returns {"emails": [...], "next_page_token": ...}; Gmail errors
+    propagate as HttpError.
+    """
+    creds = get_gmail_credentials()
+    service = build("gmail", "v1", credentials=creds)
+
+    query = "in:inbox"
+    if sender_filter:
+        query += f" from:{sender_filter}"
+    with span("gmail.list", backend="gmail"), hold("gmail"):
+        result = service.users().messages().list(
+            userId="me",
+            q=query,
+            maxResults=max_results,
+            pageToken=page_token
+        ).execute()
+
+    messages = result.get("messages", [])
+    stored = summary_store.get_many([m["id"] for m in messages], SUMMARY_PROMPT_VERSION) if summarize else {}
+
+    def fetch(msg_info):
+        msg_data = _get_message(creds, msg_info["id"], full=summarize and msg_info["id"] not in stored)
+        payload = msg_data.get("payload", {})
+        headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+        return {
+            "id": msg_data.get("id"),
+            "thread_id": msg_data.get("threadId"),
+            "from": headers.get("from", "(Unknown Sender)"),
+            "date": headers.get("date", "(Unknown Date)"),
+            "subject": headers.get("subject", "(No Subject)"),
+            "snippet": msg_data.get("snippet", ""),
+            "payload": payload,
+        }
+
+    emails = list(map_in_order(fanout_executor, fetch, messages, EMAIL_FANOUT_WIDTH))
+    if summarize:
+        for email, summary in _summaries_in_order(emails, stored):
+            email["summary"] = summary
+    for email in emails:
+        del email["payload"]
+
+    return {"emails": emails, "next_page_token": result.get("nextPageToken")}
+
+
+###############################################################################
+# 6) ASYNC VARIANTS: googleapiclient is blocking, so these run the sync
+#    functions on the bounded Google API pool instead of the event loop. Each
+#    takes its bulkhead slot first, so queueing doesn't hold a thread: a send
+#    holds a gmail slot, a listing a gmail_listing slot. A listing's Gmail
+#    calls run in parallel and each takes its own gmail slot (_get_message),
+#    so holding one gmail slot across the listing would let them all through.
+###############################################################################
+async def async_send_gmail(to_email: str, subject: str, body: str, cc: str = None):
+    """Async version of send_gmail."""
+    async with hold_async("gmail"):
+        return await run_blocking(google_executor, send_gmail, to_email, subject, body, cc)
+
+
+async def async_get_latest_emails(max_results: int = 5, sender_filter: str = None, force_refresh: bool = False) -> str:
+    """Async version of get_latest_emails."""
+    async with hold_async("gmail_listing"):
+        return await run_blocking(google_executor, get_latest_emails, max_results, sender_filter, force_refresh)
+
+
+async def async_list_recent_emails(max_results: int = 10, page_token: str = None, sender_filter: str = None, summarize: bool = False) -> dict:
+    """Async version of list_recent_emails."""
+    async with hold_async("gmail_listing"):
+        return await run_blocking(google_executor, list_recent_emails, max_results, page_token, sender_filter, summarize)
+
+
+async def async_iter_latest_emails(max_results: int = 5, sender_filter: str = None, force_refresh: bool = False):
+    """
+    Async version of iter_latest_emails, for streaming: each block is yielded
+    as soon as it is ready. A Gmail error ends the stream with the same
+    message get_latest_emails returns.
+    """
+    blocks = iter_latest_emails(max_results, sender_filter, force_refresh)
+    try:
+        async with hold_async("gmail_listing"):
+            async for block in iterate_blocking(google_executor, blocks):
+                yield block
     except HttpError as e:
         print(f"Gmail retrieve error: {e}")
-        return "Error retrieving emails."
-
+        yield "Error retrieving emails."
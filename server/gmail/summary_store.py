@@ -0,0 +1,150 @@
+# server/gmail/summary_store.py
+"""
+Persistent store for GPT email summaries, so each message is summarized once.
+
+Summaries live in the Mongo collection `email_summaries`, one document per
+(Gmail message id, prompt version), with an in-process LRU in front. A
+message's content never changes, so an entry stays valid until the summary
+prompt does; bumping SUMMARY_PROMPT_VERSION in gmail_integration makes every
+message summarize again under the new prompt, and old entries just stop
+being read.
+
+The Gmail code that calls this is blocking and runs on the Google API pool,
+so the store talks to Mongo through the synchronous pymongo database behind
+database.py's motor client (same connection pool, no event-loop hand-off).
+Mongo is an optimisation here, not a dependency. The collection is opened
+on first use, so importing this module (and the Gmail code) doesn't need a
+Mongo URI; if no URI or default database is configured, only the LRU is
+used. If Mongo is unreachable, the lookups and writes are skipped for
+SUMMARY_STORE_RETRY_S and emails are summarized as before.
+"""
+
+import datetime
+import os
+import threading
+import time
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+from tracing import mark_error, span
+from ttl_cache import TTLCache
+
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "2048"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "86400"))
+# Per-operation budget; a lookup shouldn't cost more than the summary it saves
+SUMMARY_STORE_TIMEOUT_S = float(os.getenv("SUMMARY_STORE_TIMEOUT_S", "0.5"))
+SUMMARY_STORE_RETRY_S = float(os.getenv("SUMMARY_STORE_RETRY_S", "60"))
+
+
+_UNRESOLVED = object()
+
+
+def _open_collection():
+    """The email_summaries collection, or None when no Mongo database is configured."""
+    try:
+        # database.py builds the client and picks the default database at import
+        from database import db
+        return db.delegate.get_collection("email_summaries")
+    except PyMongoError as e:
+        print(f"No Mongo database configured, keeping email summaries in memory only: {e}")
+        return None
+
+
+class SummaryStore:
+    def __init__(self, cache, collection=_UNRESOLVED):
+        self._collection = collection
+        self.cache = cache
+        self.store_hits = 0
+        self.store_errors = 0
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def collection(self):
+        """The Mongo collection (opened on first use), or None to use the LRU only."""
+        if self._collection is _UNRESOLVED:
+            with self._lock:
+                if self._collection is _UNRESOLVED:
+                    self._collection = _open_collection()
+        return self._collection
+
+    @collection.setter
+    def collection(self, collection):
+        self._collection = collection
+
+    @staticmethod
+    def _key(message_id, prompt_version):
+        return f"{prompt_version}:{message_id}"
+
+    def _available(self):
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, operation, error):
+        print(f"Summary store {operation} failed, skipping it for {SUMMARY_STORE_RETRY_S:.0f}s: {error}")
+        mark_error()
+        with self._lock:
+            self.store_errors += 1
+            self._down_until = time.monotonic() + SUMMARY_STORE_RETRY_S
+
+    def get_many(self, message_ids, prompt_version):
+        """{message_id: summary} for the ids already summarized under prompt_version (LRU, then one Mongo query)."""
+        found = {}
+        missing = []
+        for message_id in message_ids:
+            summary = self.cache.get(self._key(message_id, prompt_version))
+            if summary is None:
+                missing.append(message_id)
+            else:
+                found[message_id] = summary
+        if not missing or not self._available() or self.collection is None:
+            return found
+
+        with span("summary_store.find", backend="mongo"):
+            try:
+                with pymongo.timeout(SUMMARY_STORE_TIMEOUT_S):
+                    documents = list(self.collection.find(
+                        {"_id": {"$in": [self._key(message_id, prompt_version) for message_id in missing]}},
+                        {"message_id": 1, "summary": 1},
+                    ))
+            except PyMongoError as e:
+                self._failed("lookup", e)
+                return found
+        for document in documents:
+            found[document["message_id"]] = document["summary"]
+            self.cache.set(document["_id"], document["summary"])
+        with self._lock:
+            self.store_hits += len(documents)
+        return found
+
+    def put(self, message_id, prompt_version, summary):
+        key = self._key(message_id, prompt_version)
+        self.cache.set(key, summary)
+        if not self._available() or self.collection is None:
+            return
+        with span("summary_store.put", backend="mongo"):
+            try:
+                with pymongo.timeout(SUMMARY_STORE_TIMEOUT_S):
+                    self.collection.replace_one(
+                        {"_id": key},
+                        {
+                            "message_id": message_id,
+                            "prompt_version": prompt_version,
+                            "summary": summary,
+                            "created_at": datetime.datetime.now(datetime.timezone.utc),
+                        },
+                        upsert=True,
+                    )
+            except PyMongoError as e:
+                self._failed("write", e)
+
+    def stats(self):
+        return {
+            "lru": self.cache.stats(),
+            "store_hits": self.store_hits,
+            "store_errors": self.store_errors,
+            "store_available": self._available() and self._collection is not None,
+        }
+
+
+summary_store = SummaryStore(TTLCache(maxsize=SUMMARY_CACHE_SIZE, ttl=SUMMARY_CACHE_TTL))
@@ -1,85 +1,152 @@
 # server/hubspot_integration.py
 
 import os
+import httpx
 import requests
 from dotenv import load_dotenv
 
+from bulkheads import guarded
+from tracing import mark_error, traced
+
 load_dotenv()
 
 HUBSPOT_TOKEN = os.getenv("HUBSPOT_TOKEN")
+HUBSPOT_TIMEOUT_S = float(os.getenv("HUBSPOT_TIMEOUT_S", "10"))
+
+CONTACTS_URL = "https://api.hubapi.com/crm/v3/objects/contacts"
+CONTACTS_DUAL_URL = f"{CONTACTS_URL}?limit=100&properties=email,firstname,lastname,createdAt"
+
+# Request bodies and response parsing shared by the sync and async clients
+
+def _headers():
+    return {
+        "Authorization": f"Bearer {HUBSPOT_TOKEN}",
+        "Content-Type": "application/json",
+    }
+
+def _parse_contacts(data):
+    contacts_list = []
+    for contact in data.get("results", []):
+        props = contact.get("properties", {})
+        contacts_list.append({
+            "id": contact.get("id"),
+            "email": props.get("email"),
+            "firstname": props.get("firstname"),
+            "lastname": props.get("lastname"),
+        })
+    return contacts_list
+
+def _parse_contacts_dual(data, limit_each):
+    all_contacts = [
+        {
+            "id": c.get("id"),
+            "email": c.get("properties", {}).get("email"),
+            "firstname": c.get("properties", {}).get("firstname"),
+            "lastname": c.get("properties", {}).get("lastname"),
+            "createdAt": c.get("properties", {}).get("createdAt"),
+        }
+        for c in data.get("results", [])
+    ]
 
+    # Sort by creation time
+    sorted_contacts = sorted(all_contacts, key=lambda x: x.get("createdAt") or "")
+
+    bottom_5 = sorted_contacts[:limit_each]
+    top_5 = sorted_contacts[-limit_each:][::-1]  # latest first
+
+    return {"top": top_5, "bottom": bottom_5}
+
+def _create_body(firstname, lastname, email):
+    return {
+        "properties": {
+            "firstname": firstname,
+            "lastname": lastname,
+            "email": email
+        }
+    }
+
+def _update_body(firstname=None, lastname=None, email=None):
+    properties = {}
+    if firstname: properties["firstname"] = firstname
+    if lastname: properties["lastname"] = lastname
+    if email: properties["email"] = email
+    return { "properties": properties }
+
+def _search_body(email):
+    return {
+        "filterGroups": [
+            {
+                "filters": [
+                    {
+                        "propertyName": "email",
+                        "operator": "EQ",
+                        "value": email
+                    }
+                ]
+            }
+        ],
+        "properties": ["firstname", "lastname", "email"]
+    }
+
+def _recent_body(limit, after=None, properties=None, newest_first=True):
+    body = {
+        "sorts": [{"propertyName": "createdate", "direction": "DESCENDING" if newest_first else "ASCENDING"}],
+        "properties": properties or ["firstname", "lastname", "email", "createdate"],
+        "limit": limit,
+    }
+    if after:
+        body["after"] = after
+    return body
+
+def _parse_contacts_page(data):
+    contacts_list = []
+    for contact in data.get("results", []):
+        props = contact.get("properties", {})
+        contacts_list.append({"id": contact.get("id"), **props, "createdAt": contact.get("createdAt")})
+    next_page = data.get("paging", {}).get("next", {})
+    return {"results": contacts_list, "after": next_page.get("after")}
+
+@traced("hubspot.list", backend="hubspot")
+@guarded("hubspot")
 def get_hubspot_contacts(limit=5):
     """
     Retrieves the latest 'limit' contacts from HubSpot.
     Returns a list of dicts with relevant info (e.g. email, firstname, lastname).
     """
-    url = f"https://api.hubapi.com/crm/v3/objects/contacts?limit={limit}"
-    headers = {
-        "Authorization": f"Bearer {HUBSPOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
+    url = f"{CONTACTS_URL}?limit={limit}"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=_headers())
         if response.status_code != 200:
             print(f"HubSpot error {response.status_code}: {response.text}")
+            mark_error()
             return []
-        
-        data = response.json()
-        results = data.get("results", [])
-        contacts_list = []
-        for contact in results:
-            props = contact.get("properties", {})
-            contacts_list.append({
-                "id": contact.get("id"),
-                "email": props.get("email"),
-                "firstname": props.get("firstname"),
-                "lastname": props.get("lastname"),
-            })
-        return contacts_list
+        return _parse_contacts(response.json())
     except Exception as e:
         print(f"Error calling HubSpot: {e}")
+        mark_error()
         return []
     
+@traced("hubspot.list", backend="hubspot")
+@guarded("hubspot")
 def get_hubspot_contacts_dual(limit_each=5):
-    headers = {
-        "Authorization": f"Bearer {HUBSPOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    url = "https://api.hubapi.com/crm/v3/objects/contacts?limit=100&properties=email,firstname,lastname,createdAt"
-
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(CONTACTS_DUAL_URL, headers=_headers())
         if response.status_code != 200:
             print(f"HubSpot API error {response.status_code}: {response.text}")
+            mark_error()
             return {"top": [], "bottom": []}
-
-        results = response.json().get("results", [])
-        all_contacts = [
-            {
-                "id": c.get("id"),
-                "email": c.get("properties", {}).get("email"),
-                "firstname": c.get("properties", {}).get("firstname"),
-                "lastname": c.get("properties", {}).get("lastname"),
-                "createdAt": c.get("properties", {}).get("createdAt"),
-            }
-            for c in results
-        ]
-
-        # Sort by creation time
-        sorted_contacts = sorted(all_contacts, key=lambda x: x.get("createdAt") or "")
-
-        bottom_5 = sorted_contacts[:limit_each]
-        top_5 = sorted_contacts[-limit_each:][::-1]  # latest first
-
-        return {"top": top_5, "bottom": bottom_5}
+        return _parse_contacts_dual(response.json(), limit_each)
 
     except Exception as e:
         print(f"Error fetching HubSpot contacts: {e}")
+        mark_error()
         return {"top": [], "bottom": []}
 
 
 
+@traced("hubspot.create", backend="hubspot")
+@guarded("hubspot")
 def create_hubspot_contact(firstname, lastname, email):
     """
     Creates a new contact in HubSpot unless one already exists with the same email.
@@ -91,85 +158,51 @@ def create_hubspot_contact(firstname, lastname, email):
         print(f"Contact already exists with ID: {existing_id}")
         return existing_id
 
-    url = "https://api.hubapi.com/crm/v3/objects/contacts"
-    headers = {
-        "Authorization": f"Bearer {HUBSPOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    body = {
-        "properties": {
-            "firstname": firstname,
-            "lastname": lastname,
-            "email": email
-        }
-    }
     try:
-        response = requests.post(url, headers=headers, json=body)
+        response = requests.post(CONTACTS_URL, headers=_headers(), json=_create_body(firstname, lastname, email))
         if response.status_code == 201:
             data = response.json()
             return data.get("id")
         else:
             print(f"HubSpot error {response.status_code}: {response.text}")
+            mark_error()
             return None
     except Exception as e:
         print(f"Error creating contact: {e}")
+        mark_error()
         return None
 
 
+@traced("hubspot.update", backend="hubspot")
+@guarded("hubspot")
 def update_hubspot_contact(contact_id, firstname=None, lastname=None, email=None):
     """
     Updates an existing contact in HubSpot by contact_id.
     Provide whichever fields you want to update.
     """
-    url = f"https://api.hubapi.com/crm/v3/objects/contacts/{contact_id}"
-    headers = {
-        "Authorization": f"Bearer {HUBSPOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    properties = {}
-    if firstname: properties["firstname"] = firstname
-    if lastname: properties["lastname"] = lastname
-    if email: properties["email"] = email
-
-    body = { "properties": properties }
+    url = f"{CONTACTS_URL}/{contact_id}"
     try:
-        response = requests.patch(url, headers=headers, json=body)
+        response = requests.patch(url, headers=_headers(), json=_update_body(firstname, lastname, email))
         if response.status_code == 200:
             data = response.json()
             return data.get("id")  # or return True
         else:
             print(f"HubSpot error {response.status_code}: {response.text}")
+            mark_error()
             return None
     except Exception as e:
         print(f"Error updating contact: {e}")
+        mark_error()
         return None
 
+@traced("hubspot.search", backend="hubspot")
+@guarded("hubspot")
 def find_hubspot_contact_by_email(email):
     """
     Searches HubSpot for a contact by email. Returns the contact's ID if found, else None.
     """
-    url = f"https://api.hubapi.com/crm/v3/objects/contacts/search"
-    headers = {
-        "Authorization": f"Bearer {HUBSPOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    body = {
-        "filterGroups": [
-            {
-                "filters": [
-                    {
-                        "propertyName": "email",
-                        "operator": "EQ",
-                        "value": email
-                    }
-                ]
-            }
-        ],
-        "properties": ["firstname", "lastname", "email"]
-    }
-
     try:
-        response = requests.post(url, headers=headers, json=body)
+        response = requests.post(f"{CONTACTS_URL}/search", headers=_headers(), json=_search_body(email))
         if response.status_code == 200:
             data = response.json()
             results = data.get("results", [])
@@ -179,8 +212,145 @@ def find_hubspot_contact_by_email(email):
                 return None
         else:
             print(f"HubSpot search error {response.status_code}: {response.text}")
+            mark_error()
             return None
     except Exception as e:
         print(f"Error searching for contact: {e}")
+        mark_error()
+        return None
+
+
+###############################################################################
+# Async variants for the async /chat pipeline, on one shared httpx.AsyncClient
+# (connection pooling; created on first use inside the event loop)
+###############################################################################
+_async_client = None
+
+def _get_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(timeout=HUBSPOT_TIMEOUT_S)
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+@traced("hubspot.list", backend="hubspot")
+@guarded("hubspot")
+async def async_get_hubspot_contacts(limit=5):
+    """Async version of get_hubspot_contacts."""
+    try:
+        response = await _get_async_client().get(f"{CONTACTS_URL}?limit={limit}", headers=_headers())
+        if response.status_code != 200:
+            print(f"HubSpot error {response.status_code}: {response.text}")
+            mark_error()
+            return []
+        return _parse_contacts(response.json())
+    except Exception as e:
+        print(f"Error calling HubSpot: {e}")
+        mark_error()
+        return []
+
+@traced("hubspot.list", backend="hubspot")
+@guarded("hubspot")
+async def async_get_hubspot_contacts_dual(limit_each=5):
+    """Async version of get_hubspot_contacts_dual."""
+    try:
+        response = await _get_async_client().get(CONTACTS_DUAL_URL, headers=_headers())
+        if response.status_code != 200:
+            print(f"HubSpot API error {response.status_code}: {response.text}")
+            mark_error()
+            return {"top": [], "bottom": []}
+        return _parse_contacts_dual(response.json(), limit_each)
+    except Exception as e:
+        print(f"Error fetching HubSpot contacts: {e}")
+        mark_error()
+        return {"top": [], "bottom": []}
+
+@traced("hubspot.create", backend="hubspot")
+@guarded("hubspot")
+async def async_create_hubspot_contact(firstname, lastname, email):
+    """Async version of create_hubspot_contact."""
+    existing_id = await async_find_hubspot_contact_by_email(email)
+    if existing_id:
+        print(f"Contact already exists with ID: {existing_id}")
+        return existing_id
+
+    try:
+        response = await _get_async_client().post(
+            CONTACTS_URL, headers=_headers(), json=_create_body(firstname, lastname, email)
+        )
+        if response.status_code == 201:
+            return response.json().get("id")
+        print(f"HubSpot error {response.status_code}: {response.text}")
+        mark_error()
+        return None
+    except Exception as e:
+        print(f"Error creating contact: {e}")
+        mark_error()
+        return None
+
+@traced("hubspot.update", backend="hubspot")
+@guarded("hubspot")
+async def async_update_hubspot_contact(contact_id, firstname=None, lastname=None, email=None):
+    """Async version of update_hubspot_contact."""
+    try:
+        response = await _get_async_client().patch(
+            f"{CONTACTS_URL}/{contact_id}", headers=_headers(), json=_update_body(firstname, lastname, email)
+        )
+        if response.status_code == 200:
+            return response.json().get("id")
+        print(f"HubSpot error {response.status_code}: {response.text}")
+        mark_error()
+        return None
+    except Exception as e:
+        print(f"Error updating contact: {e}")
+        mark_error()
+        return None
+
+@traced("hubspot.search", backend="hubspot")
+@guarded("hubspot")
+async def async_find_hubspot_contact_by_email(email):
+    """Async version of find_hubspot_contact_by_email."""
+    try:
+        response = await _get_async_client().post(
+            f"{CONTACTS_URL}/search", headers=_headers(), json=_search_body(email)
+        )
+        if response.status_code == 200:
+            results = response.json().get("results", [])
+            return results[0]["id"] if results else None
+        print(f"HubSpot search error {response.status_code}: {response.text}")
+        mark_error()
+        return None
+    except Exception as e:
+        print(f"Error searching for contact: {e}")
+        mark_error()
         return None
 
+@traced("hubspot.search", backend="hubspot")
+@guarded("hubspot")
+async def async_list_recent_hubspot_contacts(limit=10, after=None, properties=None, newest_first=True):
+    """
+    One page of contacts ordered by creation date, for the analytics API.
+    Returns {"results": [...], "after": <cursor for the next page or None>},
+    each result carrying the requested properties plus id and createdAt, or
+    None if HubSpot fails.
+    """
+    try:
+        response = await _get_async_client().post(
+            f"{CONTACTS_URL}/search",
+            headers=_headers(),
+            json=_recent_body(limit, after, properties, newest_first),
+        )
+        if response.status_code != 200:
+            print(f"HubSpot search error {response.status_code}: {response.text}")
+            mark_error()
+            return None
+        return _parse_contacts_page(response.json())
+    except Exception as e:
+        print(f"Error listing contacts: {e}")
+        mark_error()
+        return None
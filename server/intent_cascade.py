@@ -0,0 +1,241 @@
+# server/intent_cascade.py
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from tracing import span
+
+
+def load_tier_config(defaults, overrides_json=None):
+    """
+    Merges per-tier overrides (a JSON object such as
+    '{"gpt": {"budget_ms": 1500}, "nli": {"threshold": 0.6}}') into the defaults.
+    """
+    config = {name: dict(values) for name, values in defaults.items()}
+    if overrides_json:
+        for name, values in json.loads(overrides_json).items():
+            config.setdefault(name, {}).update(values)
+    return config
+
+
+class TierStats:
+    """Per-tier counters plus a window of recent latencies for percentiles."""
+
+    OUTCOMES = ("accepted", "rejected", "unavailable", "timeout", "error", "skipped")
+
+    def __init__(self, window=1000):
+        self.counts = dict.fromkeys(self.OUTCOMES, 0)
+        self.over_budget = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, outcome, latency_ms=None, budget_ms=None):
+        with self._lock:
+            self.counts[outcome] += 1
+            if latency_ms is not None:
+                self._latencies.append(latency_ms)
+                if budget_ms is not None and latency_ms > budget_ms:
+                    self.over_budget += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counts = dict(self.counts)
+            over_budget = self.over_budget
+        calls = sum(counts[o] for o in ("accepted", "rejected", "timeout", "error"))
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            **counts,
+            "calls": calls,
+            "hit_rate": round(counts["accepted"] / calls, 3) if calls else 0.0,
+            "over_budget": over_budget,
+            "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
+
+
+class IntentCascade:
+    """
+    Runs classification tiers from cheapest to most expensive (by `cost`) and
+    stops at the first one whose confidence reaches its `threshold`.
+
+    Each tier is a function text -> (label, confidence), or None when the tier
+    has no answer (model still loading, no API key, no regex match).
+    Per-tier config:
+      threshold           minimum confidence to accept the tier's answer
+      budget_ms           latency budget; hard deadline for tiers with "async"
+      cost                relative cost weight; tiers that would push a request
+                          past max_cost are skipped
+      async               run on a worker thread and give up after budget_ms;
+                          skipped while all async_workers are busy, so calls
+                          never queue behind ones that are already late
+      fallback_threshold  a rejected answer with at least this confidence can
+                          still be used if every later tier fails or times out
+      backend             what the tier calls, for tracing (default local_model)
+
+    classify() is for blocking callers. classify_async() is for the event
+    loop: it awaits the coroutine tiers given in async_tiers, and hands the
+    other tiers to a runner such as a bounded thread pool.
+    """
+
+    def __init__(self, tiers, config, max_cost=None, fallback_label="general", async_workers=4, async_tiers=None):
+        self.config = config
+        self.tiers = sorted(tiers, key=lambda tier: config[tier[0]].get("cost", 0))
+        self.max_cost = max_cost
+        self.fallback_label = fallback_label
+        self.stats = {name: TierStats() for name, _ in self.tiers}
+        # Coroutine versions of tiers, used by classify_async (e.g. the GPT tier on AsyncOpenAI)
+        self.async_tiers = async_tiers or {}
+        self.async_workers = async_workers
+        self._executor = ThreadPoolExecutor(max_workers=async_workers, thread_name_prefix="intent-cascade")
+        self._async_in_flight = 0
+        self._async_lock = threading.Lock()
+
+    def _submit_async(self, tier_fn, text):
+        """Submits an async tier call, or returns None when every worker is already busy."""
+        with self._async_lock:
+            if self._async_in_flight >= self.async_workers:
+                return None
+            self._async_in_flight += 1
+        future = self._executor.submit(tier_fn, text)
+        future.add_done_callback(self._async_done)
+        return future
+
+    def _async_done(self, future):
+        with self._async_lock:
+            self._async_in_flight -= 1
+
+    def classify(self, text):
+        """
+        Returns (label, decided_by). decided_by is the accepting tier's name,
+        "<tier>_fallback" when a rejected local answer was used, or "default".
+        """
+        state = {"spent": 0, "best": None}
+        decided = self._run_tiers(text, self.tiers, state)
+        return decided or state["best"] or (self.fallback_label, "default")
+
+    async def classify_async(self, text, run_local):
+        """
+        classify() for the event loop. Each run of consecutive tiers that
+        aren't in async_tiers goes through one run_local(fn, *args) call
+        (e.g. on a thread pool under a bulkhead). Tiers in async_tiers are
+        awaited here with budget_ms as the deadline, so waiting on them
+        holds no thread and no local slot.
+        """
+        state = {"spent": 0, "best": None}
+        i = 0
+        while i < len(self.tiers):
+            name = self.tiers[i][0]
+            if name in self.async_tiers:
+                decided = await self._run_async_tier(name, text, state)
+                i += 1
+            else:
+                j = i
+                while j < len(self.tiers) and self.tiers[j][0] not in self.async_tiers:
+                    j += 1
+                decided = await run_local(self._run_tiers, text, self.tiers[i:j], state)
+                i = j
+            if decided:
+                return decided
+        return state["best"] or (self.fallback_label, "default")
+
+    def _over_cost(self, name, state):
+        cost = self.config[name].get("cost", 0)
+        if self.max_cost is not None and state["spent"] + cost > self.max_cost:
+            self.stats[name].record("skipped")
+            return True
+        return False
+
+    def _run_tiers(self, text, tiers, state):
+        """Runs `tiers` in order; returns (label, tier name) for the first accepted answer, else None."""
+        for name, tier_fn in tiers:
+            tier = self.config[name]
+            if self._over_cost(name, state):
+                continue
+
+            future = None
+            if tier.get("async"):
+                future = self._submit_async(tier_fn, text)
+                if future is None:
+                    print(f"Intent tier '{name}' skipped: all {self.async_workers} workers busy")
+                    self.stats[name].record("skipped")
+                    continue
+
+            started = time.perf_counter()
+            with span(f"classify.{name}", backend=tier.get("backend", "local_model")) as stage:
+                try:
+                    if future is not None:
+                        result = future.result(timeout=tier["budget_ms"] / 1000)
+                    else:
+                        result = tier_fn(text)
+                except FutureTimeoutError:
+                    # Only stops a call that hasn't started; a running one ends at its own timeout
+                    future.cancel()
+                    print(f"Intent tier '{name}' missed its {tier['budget_ms']}ms deadline")
+                    self.stats[name].record("timeout", (time.perf_counter() - started) * 1000)
+                    stage.failed = True
+                    continue
+                except Exception as e:
+                    print(f"Error in {name} classification: {e}")
+                    self.stats[name].record("error", (time.perf_counter() - started) * 1000)
+                    stage.failed = True
+                    continue
+            decided = self._judge(name, result, (time.perf_counter() - started) * 1000, state)
+            if decided:
+                return decided
+        return None
+
+    async def _run_async_tier(self, name, text, state):
+        tier = self.config[name]
+        if self._over_cost(name, state):
+            return None
+
+        started = time.perf_counter()
+        with span(f"classify.{name}", backend=tier.get("backend", "local_model")) as stage:
+            try:
+                # The deadline cancels the call itself, so nothing outlives the request
+                result = await asyncio.wait_for(self.async_tiers[name](text), tier["budget_ms"] / 1000)
+            except asyncio.TimeoutError:
+                print(f"Intent tier '{name}' missed its {tier['budget_ms']}ms deadline")
+                self.stats[name].record("timeout", (time.perf_counter() - started) * 1000)
+                stage.failed = True
+                return None
+            except Exception as e:
+                print(f"Error in {name} classification: {e}")
+                self.stats[name].record("error", (time.perf_counter() - started) * 1000)
+                stage.failed = True
+                return None
+        return self._judge(name, result, (time.perf_counter() - started) * 1000, state)
+
+    def _judge(self, name, result, latency_ms, state):
+        """Records a tier's answer; returns (label, name) if accepted, keeping a usable rejected one in state."""
+        tier = self.config[name]
+        if result is None:
+            self.stats[name].record("unavailable")
+            return None
+        state["spent"] += tier.get("cost", 0)
+
+        label, confidence = result
+        if confidence >= tier.get("threshold", 0):
+            self.stats[name].record("accepted", latency_ms, tier.get("budget_ms"))
+            return label, name
+        self.stats[name].record("rejected", latency_ms, tier.get("budget_ms"))
+
+        fallback_threshold = tier.get("fallback_threshold")
+        if fallback_threshold is not None and confidence >= fallback_threshold:
+            state["best"] = (label, f"{name}_fallback")
+        return None
+
+    def snapshot(self):
+        return {
+            name: {**self.config[name], **self.stats[name].snapshot()}
+            for name, _ in self.tiers
+        }
@@ -0,0 +1,125 @@
+# server/intent_patterns.py
+
+import re
+
+# Regex tier of bert_classify. Order matters: the first intent (and within it
+# the first pattern) that matches anywhere in the text wins.
+PATTERN_INTENTS = {
+    'schedule_meeting': [
+        r'schedule\s+(?:a\s+)?(?:new\s+)?(?:meeting|appointment|event|call)',
+        r'set\s+up\s+(?:a\s+)?(?:meeting|appointment|event|call)',
+        r'book\s+(?:a\s+)?(?:meeting|appointment|slot|time)',
+        r'calendar\s+(?:meeting|appointment|event)',
+        r'plan\s+(?:a\s+)?(?:meeting|appointment|event|call)',
+        r'next\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+    ],
+    'create_crm': [
+        r'create\s+(?:a\s+)?(?:hubspot|crm)\s+(?:contact|record)',
+        r'add\s+(?:a\s+)?(?:hubspot|crm)\s+contact'
+    ],
+    'update_crm': [
+        r'(?:update|change)\s+(?:hubspot|crm)\s+.*?\s+to\s+.*',
+        r'(?:update|change)\s+(?:hubspot|crm)\s+(?:contact|record)\s+(?:with\s+id\s+|id\s*[:#]?)\s*(\d+)',
+        r'(?:update|change)\s+(?:hubspot|crm)\s+(?:contact|record|name|email).*?\s+to\s+.*',
+        r'modify\s+(?:a\s+)?(?:hubspot|crm)\s+contact'
+    ],
+
+    'send_email': [
+        r'send\s+(?:a\s+)?(?:email|mail|message)',
+        r'write\s+(?:a\s+)?(?:email|mail|message|note)',
+        r'compose\s+(?:a\s+)?(?:email|mail|message)',
+        r'draft\s+(?:a\s+)?(?:email|mail|message)',
+        r'email\s+to\s+',
+        r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}'
+    ],
+    'send_slack': [
+        r'send\s+(?:a\s+)?(?:slack|channel)\s+(?:message|note|update)',
+        r'post\s+(?:a\s+)?(?:message|note|update)\s+(?:to|on|in)\s+(?:slack|channel)',
+        r'slack\s+(?:message|note|update)',
+        r'message\s+(?:to|on|in)\s+(?:#[\w-]+)',
+        r'post\s+(?:to|on|in)\s+(?:#[\w-]+)'
+    ],
+    'retrieve_slack': [
+        r'get\s+(?:slack|channel)\s+(?:messages?|history|conversation)',
+        r'check\s+(?:slack|channel)\s+(?:messages?|history|conversation)',
+        r'show\s+(?:me\s+)?(?:slack|channel)\s+(?:messages?|history|conversation)',
+        r'retrieve\s+(?:slack|channel)\s+(?:messages?|history|conversation)',
+        r'read\s+(?:slack|channel)\s+(?:messages?|history|conversation)'
+    ],
+    'retrieve_email': [
+        r'get\s+(?:my\s+)?(?:emails?|mails?|inbox)',
+        r'check\s+(?:my\s+)?(?:emails?|mails?|inbox)',
+        r'show\s+(?:me\s+)?(?:my\s+)?(?:emails?|mails?|inbox)',
+        r'read\s+(?:my\s+)?(?:emails?|mails?|inbox)',
+        r'fetch\s+(?:my\s+)?(?:emails?|mails?|inbox)'
+    ],
+    'retrieve_crm': [
+        r'get\s+(?:crm|hubspot|customer|contacts?)',
+        r'show\s+(?:me\s+)?(?:crm|hubspot|customer|contacts?)',
+        r'retrieve\s+(?:crm|hubspot|customer|contacts?)',
+        r'fetch\s+(?:crm|hubspot|customer|contacts?)',
+        r'find\s+(?:crm|hubspot|customer|contacts?)'
+    ]
+}
+
+
+_LEADING_WORD = re.compile(r'^([a-z]+)(?![a-z?*+{])')
+_LEADING_CHOICE = re.compile(r'^\(\?:([a-z|]+)\)(?![?*+{])')
+
+
+def _trigger_words(pattern):
+    """
+    Literal words at least one of which must appear in the text for `pattern`
+    to match, e.g. {'update', 'change'} for r'(?:update|change)\s+...'.
+    Returns None when no required literal can be found (always tested).
+    """
+    match = _LEADING_WORD.match(pattern)
+    if match:
+        return (match.group(1),)
+    match = _LEADING_CHOICE.match(pattern)
+    if match:
+        return tuple(match.group(1).split('|'))
+    if '@' in pattern:
+        return ('@',)
+    return None
+
+
+def _compile_rules(pattern_intents):
+    """
+    Flattens PATTERN_INTENTS into (intent, trigger words, compiled regex) in
+    priority order, plus one regex that finds every trigger word in a text.
+    """
+    rules = []
+    words = set()
+    for intent, patterns in pattern_intents.items():
+        for pattern in patterns:
+            triggers = _trigger_words(pattern)
+            rules.append((intent, frozenset(triggers) if triggers else None, re.compile(pattern)))
+            words.update(triggers or ())
+    # Lookahead so overlapping trigger words ("sendraft") are all reported
+    alternatives = '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return rules, re.compile(f'(?=({alternatives}))')
+
+_INTENT_RULES, _TRIGGER_SCAN = _compile_rules(PATTERN_INTENTS)
+_HAS_UNTRIGGERED_RULES = any(triggers is None for _, triggers, _ in _INTENT_RULES)
+
+
+def match_intent_pattern(text: str):
+    """
+    Runs the regex tier with precompiled patterns in PATTERN_INTENTS order.
+    One scan collects the trigger words present in the text; patterns whose
+    trigger words are all absent cannot match and are skipped, so most
+    messages only run a handful of searches.
+    Returns (intent, (start, end)) for the winning pattern, or None.
+    """
+    text = text.lower()
+    present = set(_TRIGGER_SCAN.findall(text))
+    if not present and not _HAS_UNTRIGGERED_RULES:
+        return None
+    for intent, triggers, regex in _INTENT_RULES:
+        if triggers is not None and triggers.isdisjoint(present):
+            continue
+        match = regex.search(text)
+        if match:
+            return intent, match.span()
+    return None
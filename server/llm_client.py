@@ -0,0 +1,77 @@
+# server/llm_client.py
+"""
+Shared async OpenAI client for the /chat pipeline.
+
+One AsyncOpenAI instance (and so one HTTP connection pool) per process,
+created on first use so OPENAI_API_KEY can come from .env, which main.py
+loads after its imports. The synchronous `openai.chat.completions` API used
+elsewhere keeps working unchanged.
+"""
+
+import os
+
+import openai
+from openai import AsyncOpenAI
+
+from bulkheads import guarded
+from tracing import traced
+
+OPENAI_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "30"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+_async_client = None
+
+
+def get_async_openai():
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=openai.api_key or os.getenv("OPENAI_API_KEY"),
+            timeout=OPENAI_TIMEOUT_S,
+            max_retries=OPENAI_MAX_RETRIES,
+        )
+    return _async_client
+
+
+@traced("openai.chat", backend="openai")
+@guarded("openai")
+async def chat_completion(messages, model="gpt-3.5-turbo", max_tokens=150, temperature=0.7, on_delta=None, **kwargs) -> str:
+    """
+    Awaits a chat completion and returns the stripped text of the first choice.
+    With `on_delta`, the completion is streamed and on_delta(text) is called
+    for each piece as it arrives; the return value is the same.
+    """
+    if on_delta is None:
+        response = await get_async_openai().chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs,
+        )
+        return response.choices[0].message.content.strip()
+
+    stream = await get_async_openai().chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        **kwargs,
+    )
+    pieces = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        piece = chunk.choices[0].delta.content
+        if piece:
+            pieces.append(piece)
+            on_delta(piece)
+    return "".join(pieces).strip()
+
+
+async def close_async_openai():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
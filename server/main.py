@@ -1,40 +1,68 @@
 import os
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from typing import List
 import openai
 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
 import dateparser
 import datetime
 import pytz
-from dateutil import parser as dateutil_parser
 import re
 
-from gmail.gmail_integration import send_gmail, get_latest_emails
-from slack_integration import send_slack_message, get_latest_slack_messages
+from gmail.gmail_integration import async_send_gmail, async_iter_latest_emails
+from gmail.summary_store import summary_store
+from slack_integration import async_send_slack_message, async_get_latest_slack_messages
+from calendar_integration import async_schedule_google_event, async_schedule_google_events_batch
 from hubspot_integration import (
-    get_hubspot_contacts,
-    create_hubspot_contact,
-    update_hubspot_contact
+    async_get_hubspot_contacts,
+    async_get_hubspot_contacts_dual,
+    async_create_hubspot_contact,
+    async_update_hubspot_contact,
+    async_find_hubspot_contact_by_email,
+    close_async_client as close_hubspot_client
 )
-from refined_nlp import bert_classify
-from nlp_datetime_cleaner import ai_clean_datetime, normalize_datetime_input, intelligent_date_parse, normalize_text
-
-from auth import router as auth_router
+from llm_client import chat_completion, close_async_openai
+from chat_stream import delta_sink, emit, emit_delta, stream_events
+from tracing import TracingMiddleware, metrics_response_body, set_intent, span
+from bulkheads import BulkheadFull, bulkhead_stats, hold_async
+from executors import nlp_executor, run_blocking
+from refined_nlp import async_bert_classify, classification_cache, classification_stats
+from nlp_datetime_cleaner import normalize_text, date_rewrite_cache, parse_datetime_batch, extract_intent_modifiers
+from slot_extractor import extract_meeting_frame
+from email_composer import generate_email_content
+from model_registry import registry
+from model_client import MODEL_SERVER_SOCKET, use_remote_models
+
+from auth import current_active_user, current_superuser, router as auth_router
+from analytics_api import router as analytics_router
 from database import init_db
 
+# With a shared model server configured, this worker talks to it over the
+# Unix socket instead of loading its own copy of the pipelines
+if MODEL_SERVER_SOCKET:
+    use_remote_models(MODEL_SERVER_SOCKET)
+
 app = FastAPI()
 
 @app.on_event("startup")
 async def on_startup():
+    # Models load on a background thread so the API is up immediately;
+    # /chat falls back to the regex tier until /readyz reports ready.
+    registry.load_in_background()
     await init_db()
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_hubspot_client()
+    await close_async_openai()
+
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
+app.include_router(analytics_router)
 
 
 
@@ -52,149 +80,116 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps everything else: Server-Timing covers the whole request
+app.add_middleware(TracingMiddleware)
 
 # Model for request
 class ChatRequest(BaseModel):
     message: str
     dialog_context: dict = None
 
+class DatetimeBatchRequest(BaseModel):
+    phrases: List[str]
+    use_model: bool = True
+
+class CalendarEvent(BaseModel):
+    title: str
+    start_datetime: str
+    end_datetime: str
+    modifiers: dict = None
+    recurrence: str = None
+
+class CalendarEventsBatchRequest(BaseModel):
+    events: List[CalendarEvent]
+
+# Upper bound on phrases per /datetime/parse-batch request
+DATETIME_BATCH_MAX_PHRASES = int(os.getenv("DATETIME_BATCH_MAX_PHRASES", "5000"))
+# Upper bound on events per /calendar/events/batch request
+CALENDAR_BATCH_MAX_EVENTS = int(os.getenv("CALENDAR_BATCH_MAX_EVENTS", "500"))
+
+@app.exception_handler(BulkheadFull)
+async def bulkhead_full_handler(request, exc: BulkheadFull):
+    """A backend's queue is full (429) or its wait timed out (503): fail fast with a retry hint."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc), "backend": exc.backend, "retry_after_s": exc.retry_after_s},
+        headers={"Retry-After": str(exc.retry_after_s)},
+    )
+
 @app.get("/")
 def root():
     return {"message": "Hello from WorkflowX API!"}
 
-def schedule_google_event(title: str, start_datetime: str, end_datetime: str, modifiers: dict = None) -> str:
-    creds = Credentials.from_service_account_file(
-        "service_account.json",  
-        scopes=["https://www.googleapis.com/auth/calendar"]
-    )
-    service = build("calendar", "v3", credentials=creds)
-    
-    event_body = {
-        "summary": title,
-        "start": {
-            "dateTime": start_datetime,
-            "timeZone": "America/Indiana/Indianapolis"
-        },
-        "end": {
-            "dateTime": end_datetime,
-            "timeZone": "America/Indiana/Indianapolis"
-        },
-    }
-    
-    if modifiers:
-        if 'meeting_type' in modifiers:
-            meeting_type = modifiers['meeting_type']
-            if meeting_type == 'call':
-                event_body["description"] = "Conference call - dial-in details will be provided."
-            elif meeting_type == 'video':
-                event_body["conferenceData"] = {
-                    "createRequest": {
-                        "requestId": f"meeting-{int(datetime.datetime.now().timestamp())}"
-                    }
-                }
-            elif meeting_type == 'in_person':
-                event_body["location"] = "Office Main Conference Room"
-                
-        if 'attendees' in modifiers:
-            attendee_list = []
-            attendees = modifiers['attendees'].split(',')
-            for attendee in attendees:
-                attendee = attendee.strip()
-                if '@' in attendee:
-                    attendee_list.append({"email": attendee})
-                else:
-                    attendee_list.append({"displayName": attendee, "email": "placeholder@example.com"})
-            if attendee_list:
-                event_body["attendees"] = attendee_list
-                
-        if 'priority' in modifiers and modifiers['priority'] == 'high':
-            if "description" not in event_body:
-                event_body["description"] = "HIGH PRIORITY MEETING"
-            else:
-                event_body["description"] = "HIGH PRIORITY MEETING\n\n" + event_body["description"]
-            event_body["summary"] = "❗ " + event_body["summary"]
-    
-    if modifiers and 'meeting_type' in modifiers and modifiers['meeting_type'] == 'video':
-        created_event = service.events().insert(
-            calendarId="abchhatkuli@gmail.com",
-            body=event_body,
-            conferenceDataVersion=1
-        ).execute()
-    else:
-        created_event = service.events().insert(
-            calendarId="abchhatkuli@gmail.com",
-            body=event_body
-        ).execute()
-        
-    return created_event.get("htmlLink", "No link found")
-
-def parse_event_time(user_text: str):
-    local_tz = pytz.timezone("America/Indiana/Indianapolis")
-    now_local = datetime.datetime.now(local_tz)
-    modified_text = user_text.lower()
-    duration_hours = 1
-
-    duration_patterns = [
-        r"for (\d+) hours?",
-        r"for (\d+)h",
-        r"(\d+) hours? long",
-        r"(\d+) hour meeting"
-    ]
-    for pattern in duration_patterns:
-        match = re.search(pattern, modified_text)
-        if match:
-            try:
-                duration_hours = int(match.group(1))
-                modified_text = re.sub(pattern, '', modified_text)
-                break
-            except Exception as e:
-                print("Duration extraction error:", e)
-
-    weekday_map = {
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6
-    }
-    next_day_match = re.search(r'next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', modified_text)
-    alt_form_match = re.search(r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+next\s+week', modified_text)
-    next_week_day_match = re.search(r'next\s+week\s+(?:on\s+)?(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', modified_text)
-    next_week_at_day_match = re.search(r'next\s+week\s+at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?\s+on\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', modified_text)
-
-    weekday_str = None
-    if next_day_match:
-        weekday_str = next_day_match.group(1).lower()
-    elif alt_form_match:
-        weekday_str = alt_form_match.group(1).lower()
-    elif next_week_day_match:
-        weekday_str = next_week_day_match.group(1).lower()
-    elif next_week_at_day_match:
-        weekday_str = next_week_at_day_match.group(1).lower()
-    
-    if weekday_str:
-        target_weekday = weekday_map[weekday_str]
-        current_weekday = now_local.weekday()
-        days_to_add = 7 - current_weekday + target_weekday
-        if days_to_add >= 7:
-            days_to_add = days_to_add % 7
-        days_to_add += 7
-        dt_local = now_local + datetime.timedelta(days=days_to_add)
-    else:
-        dt_local = now_local
-
-    time_match = re.search(r'at\s+(\d{1,2})(:(\d{2}))?\s*(am|pm)?', modified_text)
-    if time_match:
-        hour = int(time_match.group(1))
-        minute = int(time_match.group(3) or 0)
-        meridiem = time_match.group(4)
-        if meridiem == "pm" and hour < 12:
-            hour += 12
-        elif meridiem == "am" and hour == 12:
-            hour = 0
-        dt_local = dt_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    else:
-        dt_local = dt_local.replace(hour=15, minute=0, second=0, microsecond=0)
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: request and per-stage latency histograms and error counters (see tracing)."""
+    body, content_type = metrics_response_body()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/readyz")
+def readyz():
+    models = registry.status()
+    if registry.is_ready():
+        return {"status": "ready", "models": models}
+    return JSONResponse(status_code=503, content={"status": "loading", "models": models})
+
+@app.get("/admin/cache/classification", dependencies=[Depends(current_superuser)])
+def classification_cache_stats():
+    return classification_cache.stats()
+
+@app.delete("/admin/cache/classification", dependencies=[Depends(current_superuser)])
+def flush_classification_cache():
+    return {"flushed": classification_cache.clear()}
+
+@app.post("/datetime/parse-batch")
+def parse_datetime_batch_endpoint(req: DatetimeBatchRequest):
+    """Bulk version of the scheduling date parser, for importing meeting requests."""
+    if len(req.phrases) > DATETIME_BATCH_MAX_PHRASES:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"At most {DATETIME_BATCH_MAX_PHRASES} phrases per request"},
+        )
+    return {"results": parse_datetime_batch(req.phrases, use_model=req.use_model)}
+
+@app.post("/calendar/events/batch", dependencies=[Depends(current_active_user)])
+async def create_calendar_events_batch(req: CalendarEventsBatchRequest):
+    """Creates many events in as few Calendar API round trips as possible (see calendar_integration)."""
+    if len(req.events) > CALENDAR_BATCH_MAX_EVENTS:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"At most {CALENDAR_BATCH_MAX_EVENTS} events per request"},
+        )
+    links = await async_schedule_google_events_batch([event.dict() for event in req.events])
+    return {"links": links, "created": sum(link is not None for link in links)}
+
+@app.get("/admin/cache/date-rewrite", dependencies=[Depends(current_superuser)])
+def date_rewrite_cache_stats():
+    return date_rewrite_cache.stats()
+
+@app.delete("/admin/cache/date-rewrite", dependencies=[Depends(current_superuser)])
+def flush_date_rewrite_cache():
+    return {"flushed": date_rewrite_cache.clear()}
+
+@app.get("/admin/cache/email-summary", dependencies=[Depends(current_superuser)])
+def email_summary_cache_stats():
+    return summary_store.stats()
 
-    end_dt_local = dt_local + datetime.timedelta(hours=duration_hours)
-    return dt_local.isoformat(), end_dt_local.isoformat()
+@app.delete("/admin/cache/email-summary", dependencies=[Depends(current_superuser)])
+def flush_email_summary_cache():
+    """Empties the in-process LRU only; summaries stored in Mongo are kept."""
+    return {"flushed": summary_store.cache.clear()}
+
+@app.get("/admin/bulkheads", dependencies=[Depends(current_superuser)])
+def bulkheads_stats():
+    return bulkhead_stats()
+
+@app.get("/admin/classification/stats", dependencies=[Depends(current_superuser)])
+def intent_classification_stats():
+    return classification_stats()
 
 def extract_email_and_message(user_text: str):
     normalized_text = normalize_text(user_text)
@@ -240,74 +235,8 @@ def extract_email_and_message(user_text: str):
     return email, leftover, explicit_subject, sender_name, recipient_name
 
 
-def generate_email_content(instructions: str, explicit_subject=None, sender_name=None, recipient_email=None):
-    if explicit_subject:
-        subject = explicit_subject
-    else:
-        subject_prompt = (
-            "Create a concise yet clear email subject line for a professional email, based on these instructions: "
-            f"'{instructions}'. "
-            "Return ONLY the subject line text, no quotes or explanations."
-        )
-        subject_resp = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an AI specialized in writing short, professional email subjects that capture the essence of communication intent."},
-                {"role": "user", "content": subject_prompt},
-            ],
-            max_tokens=60,
-            temperature=0.7,
-        )
-        subject = subject_resp.choices[0].message.content.strip()
-
-    recipient_name = "Recipient"
-    if recipient_email:
-        email_parts = recipient_email.split('@')[0]
-        if '.' in email_parts:
-            name_parts = email_parts.split('.')
-            recipient_name = ' '.join(part.capitalize() for part in name_parts)
-        elif '_' in email_parts:
-            name_parts = email_parts.split('_')
-            recipient_name = ' '.join(part.capitalize() for part in name_parts)
-        else:
-            recipient_name = email_parts.capitalize()
-
-    sender_name = sender_name or "Your Name"
-
-    body_prompt = (
-        f"Write a professional email body for an email with subject: '{subject}', based on these instructions: "
-        f"'{instructions}'. "
-        f"The email is FROM: {sender_name} TO: {recipient_name} ({recipient_email}). "
-        f"Include proper greeting to {recipient_name} and sign-off from {sender_name}. "
-        f"Replace any placeholders like [your name] with {sender_name} and [recipient] with {recipient_name}. "
-        f"Make it concise but comprehensive."
-    )
-    body_resp = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are an AI specialized in writing professional, well-structured email content."},
-            {"role": "user", "content": body_prompt},
-        ],
-        max_tokens=300,
-        temperature=0.7,
-    )
-    body = body_resp.choices[0].message.content.strip()
-    
-    replacements = {
-        "[your name]": sender_name,
-        "[sender]": sender_name,
-        "[recipient]": recipient_name,
-        "[recipient name]": recipient_name,
-    }
-    
-    for placeholder, replacement in replacements.items():
-        body = body.replace(placeholder, replacement)
-
-    return subject, body
-
-def extract_slack_channel_and_message(user_text: str):
+async def extract_slack_channel_and_message(user_text: str):
     from nlp_datetime_cleaner import normalize_text
-    import openai
     
     original_text = user_text
     cleaned_text = re.sub(r'send\s+send', 'send', user_text, flags=re.IGNORECASE)
@@ -423,7 +352,7 @@ def extract_slack_channel_and_message(user_text: str):
         try:
             prompt = f"Generate a friendly, concise Slack message for channel {channel} based on this intent: '{original_text}'. If it's asking about a meeting time, make it a natural question about when the meeting is scheduled. Keep it under 20 words and make it sound conversational, not like a command."
             
-            msg_resp = openai.chat.completions.create(
+            message = await chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are an assistant that generates concise, appropriate Slack messages based on user intent."},
@@ -432,7 +361,6 @@ def extract_slack_channel_and_message(user_text: str):
                 max_tokens=60,
                 temperature=0.7,
             )
-            message = msg_resp.choices[0].message.content.strip()
             message = re.sub(r'^[\'"]|[\'"]$', '', message)
             is_ai_generated = True
         except Exception as e:
@@ -442,11 +370,23 @@ def extract_slack_channel_and_message(user_text: str):
     
     return channel, message, is_ai_generated
 
+async def run_local_model(fn, *args):
+    """Runs blocking local-model work (classifier tiers, slot extraction) on the NLP pool, under the local_model bulkhead."""
+    async with hold_async("local_model"):
+        return await run_blocking(nlp_executor, fn, *args)
+
 @app.post("/chat")
-def chat_endpoint(req: ChatRequest):
+async def chat_endpoint(req: ChatRequest):
+    """
+    Async end to end: network calls go through the async clients (OpenAI,
+    Slack, HubSpot) or the bounded Google API pool, and classification and
+    slot extraction run on the NLP pool, so the event loop never blocks on
+    them and concurrency isn't capped by the request threadpool.
+    """
     from nlp_datetime_cleaner import normalize_text
     original_text = req.message
-    user_text = normalize_text(original_text)
+    with span("normalize"):
+        user_text = normalize_text(original_text)
     print(f"Original text: {original_text}")
     print(f"Normalized text: {user_text}")
 
@@ -473,49 +413,31 @@ def chat_endpoint(req: ChatRequest):
         end_local = tomorrow_2pm_local + datetime.timedelta(hours=duration_hours)
         start_str = tomorrow_2pm_local.isoformat()
         end_str = end_local.isoformat()
-        event_link = schedule_google_event(
+        event_link = await async_schedule_google_event(
             title=f"Test Calendar Event ({duration_hours} hour{'s' if duration_hours != 1 else ''})",
             start_datetime=start_str,
             end_datetime=end_str
         )
         return {"reply": f"Test event scheduled for {duration_hours} hour{'s' if duration_hours != 1 else ''}! Event link: {event_link}"}
 
-    classification_text = bert_classify(user_text)
+    with span("classify"):
+        classification_text = await async_bert_classify(user_text, run_local_model)
     print("💡 NLP Classification:", classification_text)
+    set_intent(classification_text)
+    emit("stage", stage="classified", intent=classification_text)
 
     if "schedule_meeting" in classification_text:
-        from nlp_datetime_cleaner import extract_intent_modifiers
-        modifiers = extract_intent_modifiers(original_text, "schedule_meeting")
-        print(f"Extracted modifiers: {modifiers}")
-        normalized_text = normalize_datetime_input(user_text)
-        print(f"Date-normalized text: {normalized_text}")
-        start_dt_obj, end_dt_obj = intelligent_date_parse(normalized_text)
-        if start_dt_obj and end_dt_obj:
-            start_dt = start_dt_obj.isoformat()
-            end_dt = end_dt_obj.isoformat()
-            print(f"Intelligent parser result: start={start_dt}, end={end_dt}")
-        else:
-            ai_response = ai_clean_datetime(normalized_text)
-            print(f"AI response: {ai_response}")
-            match = re.search(r"START=(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})\s+END=(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})", ai_response)
-            if match:
-                start_dt = match.group(1)
-                end_dt = match.group(2)
-                print(f"AI parsed: start={start_dt}, end={end_dt}")
-            else:
-                print("AI parser failed, using manual parser")
-                start_dt, end_dt = parse_event_time(normalized_text)
-        if not start_dt:
-            return {
-                "reply": (
-                    "Sorry, I couldn't understand the date/time. Try rephrasing it like: "
-                    "'Schedule meeting on March 10 at 2 PM for 2 hours'."
-                )
-            }
-        start_time = dateutil_parser.parse(start_dt)
-        end_time = dateutil_parser.parse(end_dt)
-        duration_hours = (end_time - start_time).total_seconds() / 3600
-        meeting_description = extract_meeting_description(original_text)
+        # Date, time, duration, attendees, type, priority and description in one pass
+        with span("slots"):
+            frame = await run_local_model(extract_meeting_frame, original_text, user_text)
+        print(f"Meeting frame: {frame}")
+        emit("stage", stage="parsed", start=frame.start.isoformat(), end=frame.end.isoformat(), recurrence=frame.recurrence)
+        modifiers = frame.modifiers()
+        start_dt = frame.start.isoformat()
+        end_dt = frame.end.isoformat()
+        start_time = frame.start
+        duration_hours = frame.duration_hours
+        meeting_description = frame.description
         if meeting_description:
             meeting_title = f"Meeting: {meeting_description}"
         else:
@@ -532,11 +454,13 @@ def chat_endpoint(req: ChatRequest):
                 meeting_title = f"🤝 Interview: {meeting_description or original_text.strip()[:50]}"
             elif meeting_type == '1on1':
                 meeting_title = f"👤 1-on-1: {meeting_description or original_text.strip()[:50]}"
-        event_link = schedule_google_event(
+        emit("stage", stage="sending", target="calendar")
+        event_link = await async_schedule_google_event(
             meeting_title, 
             start_dt, 
             end_dt,
-            modifiers
+            modifiers,
+            recurrence=frame.recurrence
         )
         start_time_local = start_time.strftime("%A, %B %d at %I:%M %p")
         reply = f"Meeting scheduled for {start_time_local} with a duration of {int(duration_hours)} hour{'s' if duration_hours != 1 else ''}!"
@@ -548,6 +472,8 @@ def chat_endpoint(req: ChatRequest):
                 reply += " Video conference link is included in the calendar invitation."
             elif meeting_type == 'in_person':
                 reply += " Meeting will be held in person at the office."
+        if frame.recurrence:
+            reply += f" Repeats ({frame.recurrence.replace('RRULE:', '')})."
         if 'attendees' in modifiers:
             reply += f" Attendees: {modifiers['attendees']}."
         reply += f" Event link: {event_link}"
@@ -567,7 +493,9 @@ def chat_endpoint(req: ChatRequest):
                 "explicit_subject": explicit_subject,
                 "sender_name": sender_name,
                 "recipient_name": recipient_name,
-                "recipient_email": rec_email
+                "recipient_email": rec_email,
+                # formality, priority and cc, kept across the recipient_email turn
+                "modifiers": extract_intent_modifiers(original_text, "send_email"),
             }
 
         # 3) If no valid email yet, ask once
@@ -580,26 +508,33 @@ def chat_endpoint(req: ChatRequest):
             }
 
         # 4) We have a valid email — build & send
+        emit("stage", stage="parsed", recipient=dc["recipient_email"])
         sender = dc.get("sender_name") or "Your Name"
-        subject, body = generate_email_content(
+        subject, body = await generate_email_content(
             dc["instructions"],
             explicit_subject=dc["explicit_subject"],
             sender_name=sender,
-            recipient_email=dc["recipient_email"]
+            recipient_email=dc["recipient_email"],
+            modifiers=dc.get("modifiers"),
         )
-        sent = send_gmail(dc["recipient_email"], subject, body)
+        cc = (dc.get("modifiers") or {}).get("cc")
+        emit("stage", stage="sending", target="gmail")
+        sent = await async_send_gmail(dc["recipient_email"], subject, body, cc=cc)
         if sent:
-            return {
-                "reply": f"Email sent to {dc['recipient_email']} with subject “{subject}”."
-            }
+            reply = f"Email sent to {dc['recipient_email']} with subject “{subject}”."
+            if cc:
+                reply += f" CC: {cc}."
+            return {"reply": reply}
         else:
             return {"reply": "Sorry, I couldn’t send that email. Please try again."}
 
         
     elif "send_slack" in classification_text or "slack_send" in classification_text:
-        channel, text, is_ai_generated = extract_slack_channel_and_message(original_text)
+        channel, text, is_ai_generated = await extract_slack_channel_and_message(original_text)
         is_quoted = bool(re.search(r'["\'](.*?)["\']', original_text))
-        success = send_slack_message(channel, text)
+        emit("stage", stage="parsed", channel=channel)
+        emit("stage", stage="sending", target="slack")
+        success = await async_send_slack_message(channel, text)
         if success:
             if is_quoted:
                 return {"reply": f"Slack message sent to {channel} with your exact message: '{text}'"}
@@ -612,15 +547,10 @@ def chat_endpoint(req: ChatRequest):
 
     elif "retrieve_slack" in classification_text or "slack_retrieve" in classification_text:
         channel, count, search_term = extract_slack_retrieve_params(original_text)
-        try:
-            messages = get_latest_slack_messages(channel, count, search_term)
-        except TypeError:
-            try:
-                messages = get_latest_slack_messages(channel, count)
-                if search_term:
-                    search_note = f"\n\nNote: Message filtering by content '{search_term}' is not yet implemented."
-            except TypeError:
-                messages = get_latest_slack_messages(channel)
+        emit("stage", stage="parsed", channel=channel, count=count)
+        messages = await async_get_latest_slack_messages(channel, count)
+        if search_term:
+            search_note = f"\n\nNote: Message filtering by content '{search_term}' is not yet implemented."
         reply_str = f"Latest {count} messages from {channel}"
         if search_term:
             reply_str += f" containing '{search_term}'"
@@ -681,7 +611,13 @@ def chat_endpoint(req: ChatRequest):
         subject_match = re.search(r'(?:with|about|containing|subject)\s+["\']?([^"\']+)["\']?', user_text)
         if subject_match:
             subject_filter = subject_match.group(1)
-        emails_summary = get_latest_emails(count, sender_filter)
+        emit("stage", stage="parsed", count=count, sender=sender_filter)
+        # Each summary goes out to a streaming client as soon as it's ready
+        blocks = []
+        async for block in async_iter_latest_emails(count, sender_filter):
+            emit_delta("\n" + block if blocks else block)
+            blocks.append(block)
+        emails_summary = "\n".join(blocks)
         if subject_filter and sender_filter is None and "No emails found" not in emails_summary:
             filter_note = f"\n\nNote: Email filtering by subject ('{subject_filter}') is not yet implemented."
             emails_summary += filter_note
@@ -702,7 +638,9 @@ def chat_endpoint(req: ChatRequest):
             lastname = ""
         email_match = re.search(r'(?:email\s*(?:is|:)?\s*)(\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)', original_text)
         email = email_match.group(1) if email_match else "unknown@example.com"
-        new_id = create_hubspot_contact(firstname, lastname, email)
+        emit("stage", stage="parsed", firstname=firstname, lastname=lastname, email=email)
+        emit("stage", stage="sending", target="hubspot")
+        new_id = await async_create_hubspot_contact(firstname, lastname, email)
         if new_id:
             return {"reply": f"Created new HubSpot contact with ID: {new_id}"}
         else:
@@ -720,11 +658,11 @@ def chat_endpoint(req: ChatRequest):
             parts = new_name.split()
             new_firstname = parts[0]
             new_lastname = parts[1]
-            from hubspot_integration import find_hubspot_contact_by_email
-            contact_id = find_hubspot_contact_by_email(identifier_email)
+            contact_id = await async_find_hubspot_contact_by_email(identifier_email)
             if not contact_id:
                 return {"reply": f"Couldn't find a HubSpot contact with email {identifier_email}."}
-            updated_id = update_hubspot_contact(contact_id, new_firstname, new_lastname, None)
+            emit("stage", stage="sending", target="hubspot")
+            updated_id = await async_update_hubspot_contact(contact_id, new_firstname, new_lastname, None)
             if updated_id:
                 return {"reply": f"Updated HubSpot contact {updated_id} successfully."}
             else:
@@ -737,7 +675,7 @@ def chat_endpoint(req: ChatRequest):
             identifier_name = match_email.group(1).strip()
             new_email = match_email.group(2).strip()
             
-            contacts = get_hubspot_contacts(limit=50)
+            contacts = await async_get_hubspot_contacts(limit=50)
             contact_id = None
             for c in contacts:
                 full_name = f"{c.get('firstname','').strip()} {c.get('lastname','').strip()}".strip()
@@ -746,7 +684,8 @@ def chat_endpoint(req: ChatRequest):
                     break
             if not contact_id:
                 return {"reply": f"Couldn't find a HubSpot contact with name {identifier_name}."}
-            updated_id = update_hubspot_contact(contact_id, None, None, new_email)
+            emit("stage", stage="sending", target="hubspot")
+            updated_id = await async_update_hubspot_contact(contact_id, None, None, new_email)
             if updated_id:
                 return {"reply": f"Updated HubSpot contact {updated_id} successfully."}
             else:
@@ -770,8 +709,7 @@ def chat_endpoint(req: ChatRequest):
                 identifier = name_match.group(1).strip()
         if not contact_id and identifier:
             if re.match(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', identifier):
-                from hubspot_integration import find_hubspot_contact_by_email
-                contact_id = find_hubspot_contact_by_email(identifier)
+                contact_id = await async_find_hubspot_contact_by_email(identifier)
                 if not contact_id:
                     return {"reply": f"Couldn't find a HubSpot contact with email {identifier}."}
         if not contact_id:
@@ -792,15 +730,15 @@ def chat_endpoint(req: ChatRequest):
             parts = new_name.split()
             new_firstname = parts[0]
             new_lastname = parts[1]
-        updated_id = update_hubspot_contact(contact_id, new_firstname, new_lastname, new_email)
+        emit("stage", stage="sending", target="hubspot")
+        updated_id = await async_update_hubspot_contact(contact_id, new_firstname, new_lastname, new_email)
         if updated_id:
             return {"reply": f"Updated HubSpot contact {updated_id} successfully."}
         else:
             return {"reply": f"Failed to update contact with id {contact_id}."}
         
     elif "retrieve_crm" in classification_text:
-        from hubspot_integration import get_hubspot_contacts_dual
-        contacts_dual = get_hubspot_contacts_dual(limit_each=5)
+        contacts_dual = await async_get_hubspot_contacts_dual(limit_each=5)
 
         if not contacts_dual or (not contacts_dual["top"] and not contacts_dual["bottom"]):
             return {"reply": "No contacts found in HubSpot or an error occurred."}
@@ -820,7 +758,7 @@ def chat_endpoint(req: ChatRequest):
 
     
     else:
-        final_resp = openai.chat.completions.create(
+        ai_text = await chat_completion(
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -831,18 +769,24 @@ def chat_endpoint(req: ChatRequest):
             ],
             max_tokens=150,
             temperature=0.7,
+            on_delta=delta_sink(),
         )
-        ai_text = final_resp.choices[0].message.content.strip()
         return {"reply": ai_text}
 
-def extract_meeting_description(text):
-    about_match = re.search(r'(?:about|regarding|concerning|for|on)\s+([^.,!?]+)', text, re.IGNORECASE)
-    if about_match:
-        return about_match.group(1).strip()
-    with_match = re.search(r'(?:with|to discuss|to talk about)\s+([^.,!?]+)', text, re.IGNORECASE)
-    if with_match:
-        return with_match.group(1).strip()
-    return None
+@app.post("/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest):
+    """
+    /chat as Server-Sent Events: stage events while the request is handled,
+    reply text as it is generated, then the /chat response in a done event
+    (see chat_stream for the event format).
+    """
+    return StreamingResponse(
+        stream_events(lambda: chat_endpoint(req)),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 def extract_slack_retrieve_params(user_text):
     from nlp_datetime_cleaner import normalize_text
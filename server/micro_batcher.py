@@ -0,0 +1,89 @@
+# server/micro_batcher.py
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+# Longest a caller waits for its batch before submit() raises TimeoutError
+MICRO_BATCH_TIMEOUT_S = float(os.getenv("MICRO_BATCH_TIMEOUT_S", "30"))
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching for model calls made from many request threads.
+
+    Callers block in submit(item). A single worker thread collects pending
+    items until it has max_batch_size of them or max_wait_ms has passed since
+    the first one arrived, runs them through batch_fn(items) as one batch and
+    hands each caller the result at its own position. If batch_fn raises, or
+    returns a different number of results than items, every caller in the
+    batch gets the error. A caller waits at most timeout_s
+    (MICRO_BATCH_TIMEOUT_S) for its result.
+    With max_batch_size <= 1, submit() just calls batch_fn directly.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=5.0, name="micro-batcher", timeout_s=None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout_s = MICRO_BATCH_TIMEOUT_S if timeout_s is None else timeout_s
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, item):
+        if self.max_batch_size <= 1:
+            return self.batch_fn([item])[0]
+
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        try:
+            return future.result(timeout=self.timeout_s)
+        except TimeoutError:
+            # Still queued: the worker drops it instead of running it for nobody
+            future.cancel()
+            raise
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Marks the futures running, so a caller timing out from here on can't cancel them
+            batch = [(item, future) for item, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            try:
+                results = list(self.batch_fn(items))
+                if len(results) != len(batch):
+                    raise ValueError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} items")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    # Some may have their result already if the loop above failed partway
+                    if not future.done():
+                        future.set_exception(e)
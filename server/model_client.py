@@ -0,0 +1,101 @@
+# server/model_client.py
+
+import os
+import threading
+import time
+from multiprocessing.connection import Client
+
+from model_registry import registry
+
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET")
+# The connection unpickles what it receives, so the key must be secret. If it
+# isn't set, model_server.py generates one per start and writes it to
+# authkey_path() (owner-only), where the workers read it.
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY")
+MODEL_SERVER_AUTHKEY_FILE = os.getenv("MODEL_SERVER_AUTHKEY_FILE")
+MODEL_SERVER_LOAD_TIMEOUT = float(os.getenv("MODEL_SERVER_LOAD_TIMEOUT", "900"))
+
+
+def authkey_path(socket_path):
+    return MODEL_SERVER_AUTHKEY_FILE or socket_path + ".key"
+
+
+def read_authkey(socket_path):
+    """The model server's key: MODEL_SERVER_AUTHKEY, else the file the server wrote (OSError if it's missing)."""
+    if MODEL_SERVER_AUTHKEY:
+        return MODEL_SERVER_AUTHKEY.encode()
+    with open(authkey_path(socket_path), "rb") as f:
+        return f.read()
+
+
+class RemoteModel:
+    """
+    Thin client for a pipeline hosted by model_server.py.
+    Calling it behaves like calling the local transformers pipeline:
+    arguments are sent over the Unix socket and the pipeline output comes back.
+    Each thread keeps its own connection since Connection objects aren't thread-safe.
+    """
+
+    def __init__(self, name, socket_path=None):
+        self.name = name
+        self.socket_path = socket_path or MODEL_SERVER_SOCKET
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Read on every connect: a restarted server has a new key
+            conn = Client(self.socket_path, family="AF_UNIX", authkey=read_authkey(self.socket_path))
+            self._local.conn = conn
+        return conn
+
+    def _request(self, message):
+        # One retry with a fresh connection in case the server restarted
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send(message)
+                status, payload = conn.recv()
+                break
+            except (EOFError, OSError):
+                self._local.conn = None
+                if attempt:
+                    raise
+        if status == "error":
+            raise RuntimeError(f"Model server error ({self.name}): {payload}")
+        return payload
+
+    def __call__(self, *args, **kwargs):
+        return self._request(("call", self.name, args, kwargs))
+
+    def status(self):
+        return self._request(("status", self.name, (), {}))
+
+    def wait_until_ready(self, timeout=None):
+        """Blocks until the server reports this model as ready."""
+        deadline = time.monotonic() + (timeout or MODEL_SERVER_LOAD_TIMEOUT)
+        while time.monotonic() < deadline:
+            try:
+                state = self.status()["state"]
+            except (OSError, EOFError):
+                state = "unreachable"
+            if state == "ready":
+                return
+            if state == "failed":
+                raise RuntimeError(f"Model server failed to load '{self.name}'")
+            time.sleep(1)
+        raise TimeoutError(f"Model server did not load '{self.name}' in time")
+
+
+def use_remote_models(socket_path=None):
+    """
+    Re-registers every model in the registry as a RemoteModel, so callers
+    (bert_classify, ai_clean_datetime) transparently go through the shared
+    model server instead of loading their own copy in this worker.
+    """
+    for name in registry.status():
+        registry.register(
+            name,
+            lambda name=name: RemoteModel(name, socket_path),
+            lambda model: model.wait_until_ready(),
+        )
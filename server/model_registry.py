@@ -0,0 +1,102 @@
+# server/model_registry.py
+
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Keeps track of the heavy transformers pipelines used by the NLP layer.
+    Modules register a loader (and optional warmup) at import time, but the
+    models are only built when load_all() / load_in_background() is called.
+    This keeps `import main` cheap and lets the API answer regex-classified
+    requests while the models are still loading.
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._models = {}
+        self._states = {}
+        self._errors = {}
+        self._load_seconds = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, loader, warmup=None):
+        """
+        Registers a model under `name`. `loader` takes no arguments and returns
+        the model; `warmup` (optional) receives the model and runs one inference
+        so the first real request doesn't pay for lazy initialisation.
+        """
+        with self._lock:
+            self._specs[name] = (loader, warmup)
+            self._states.setdefault(name, "pending")
+
+    def load(self, name):
+        """
+        Builds and warms up a single model synchronously.
+        Returns the model, or None if loading failed.
+        """
+        with self._lock:
+            if self._states.get(name) == "ready":
+                return self._models[name]
+            loader, warmup = self._specs[name]
+            self._states[name] = "loading"
+
+        started = time.perf_counter()
+        try:
+            model = loader()
+            if warmup:
+                warmup(model)
+        except Exception as e:
+            print(f"Error loading model '{name}': {e}")
+            with self._lock:
+                self._states[name] = "failed"
+                self._errors[name] = str(e)
+            return None
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._models[name] = model
+            self._states[name] = "ready"
+            self._load_seconds[name] = round(elapsed, 2)
+        print(f"Model '{name}' ready in {elapsed:.1f}s")
+        return model
+
+    def load_all(self):
+        """Loads every registered model in registration order."""
+        for name in list(self._specs):
+            self.load(name)
+
+    def load_in_background(self):
+        """
+        Starts loading all registered models on a daemon thread.
+        Calling it again while a load is in progress is a no-op.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.load_all, name="model-loader", daemon=True)
+        self._thread.start()
+
+    def get(self, name):
+        """Returns the model if it is ready, otherwise None."""
+        return self._models.get(name)
+
+    def is_ready(self, name=None):
+        if name is not None:
+            return self._states.get(name) == "ready"
+        return all(state == "ready" for state in self._states.values())
+
+    def status(self):
+        with self._lock:
+            return {
+                name: {
+                    "state": self._states.get(name, "pending"),
+                    "load_seconds": self._load_seconds.get(name),
+                    "error": self._errors.get(name),
+                }
+                for name in self._specs
+            }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,105 @@
+# server/model_server.py
+"""
+Shared local inference service for the transformers pipelines.
+
+Hosts bart-large-mnli (zero-shot intent classification) and flan-t5-base
+(datetime rewriting) once per box and serves them to every uvicorn worker over
+a Unix socket, instead of each worker loading its own multi-GB copy.
+
+Only this user can connect: the socket is created 0600, and connections must
+authenticate with MODEL_SERVER_AUTHKEY or, if that's unset, a random key
+generated at startup and written to <socket>.key (0600) for the workers.
+
+Usage:
+    MODEL_SERVER_SOCKET=/tmp/workflowx-models.sock python model_server.py
+    MODEL_SERVER_SOCKET=/tmp/workflowx-models.sock uvicorn main:app --workers 4
+"""
+
+import os
+import secrets
+import threading
+from multiprocessing.connection import Listener
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from model_registry import registry
+from model_client import MODEL_SERVER_AUTHKEY, MODEL_SERVER_SOCKET, authkey_path
+
+# Importing these registers their local loaders with the registry
+import refined_nlp  # noqa: F401
+import nlp_datetime_cleaner  # noqa: F401
+
+# One lock per model: the pipelines aren't safe to call concurrently
+_model_locks = {}
+
+
+def _handle(message):
+    kind, name, args, kwargs = message
+    if kind == "status":
+        return registry.status().get(name, {"state": "unknown"})
+    if kind == "call":
+        model = registry.get(name)
+        if model is None:
+            raise RuntimeError(f"model '{name}' is not loaded")
+        with _model_locks.setdefault(name, threading.Lock()):
+            return model(*args, **kwargs)
+    raise ValueError(f"unknown request type '{kind}'")
+
+
+def _serve_connection(conn):
+    with conn:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                conn.send(("ok", _handle(message)))
+            except Exception as e:
+                conn.send(("error", str(e)))
+
+
+def _create_authkey(socket_path):
+    """MODEL_SERVER_AUTHKEY, or a new random key written to authkey_path() for the workers."""
+    if MODEL_SERVER_AUTHKEY:
+        return MODEL_SERVER_AUTHKEY.encode()
+    key = secrets.token_bytes(32)
+    path = authkey_path(socket_path)
+    if os.path.exists(path):
+        os.unlink(path)
+    # O_EXCL: never write the key into a file someone else created
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def serve(socket_path):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    authkey = _create_authkey(socket_path)
+
+    # The socket is created owner-only, so other users can't even connect
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(socket_path, family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(old_umask)
+    os.chmod(socket_path, 0o600)
+
+    with listener:
+        print(f"Model server listening on {socket_path}")
+        registry.load_in_background()
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"Model server accept error: {e}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    serve(MODEL_SERVER_SOCKET or "/tmp/workflowx-models.sock")
@@ -0,0 +1,98 @@
+# server/nli_backends.py
+"""
+Inference backends for the zero-shot intent classifier used by bert_classify.
+
+NLI_BACKEND selects the backend:
+  - pytorch (default): transformers pipeline running bart-large-mnli in fp32
+  - onnx: the same model exported to ONNX, dynamically quantized to int8 and
+    run through ONNX Runtime. Needs `optimum[onnxruntime]`, which isn't in
+    requirements.txt: `pip install -r requirements-onnx.txt`
+
+Both return a callable with the zero-shot pipeline interface:
+    classifier(text, candidate_labels) -> {"labels": [...], "scores": [...]}
+"""
+
+import os
+import pathlib
+
+NLI_MODEL = "facebook/bart-large-mnli"
+NLI_BACKEND = os.getenv("NLI_BACKEND", "pytorch").lower()
+
+# Exported/quantized models are cached here so the export only happens once
+NLI_ONNX_DIR = pathlib.Path(
+    os.getenv("NLI_ONNX_DIR", pathlib.Path(__file__).parent / ".model_cache" / "bart-large-mnli-onnx")
+)
+# Instruction set the int8 kernels are tuned for: avx2, avx512, avx512_vnni or arm64
+NLI_ONNX_QUANT_ARCH = os.getenv("NLI_ONNX_QUANT_ARCH", "avx2")
+
+QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def load_pytorch_classifier():
+    from transformers import pipeline
+    return pipeline(
+        "zero-shot-classification",
+        model=NLI_MODEL,
+        framework="pt"  # ← forces PyTorch backend
+    )
+
+
+def _require_optimum():
+    try:
+        import optimum.onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "NLI_BACKEND=onnx needs optimum[onnxruntime], which is optional: "
+            "pip install -r requirements-onnx.txt, or unset NLI_BACKEND to use pytorch"
+        ) from e
+
+
+def export_onnx_int8(output_dir=NLI_ONNX_DIR):
+    """
+    Exports bart-large-mnli to ONNX and applies dynamic int8 quantization.
+    Skips the work if a quantized model is already in output_dir.
+    Returns the directory containing the quantized model and tokenizer.
+    """
+    output_dir = pathlib.Path(output_dir)
+    if (output_dir / QUANTIZED_FILE).exists():
+        return output_dir
+
+    _require_optimum()
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    print(f"Exporting {NLI_MODEL} to ONNX in {output_dir} (one-time)")
+    fp32_dir = output_dir / "fp32"
+    ORTModelForSequenceClassification.from_pretrained(NLI_MODEL, export=True).save_pretrained(fp32_dir)
+    AutoTokenizer.from_pretrained(NLI_MODEL).save_pretrained(output_dir)
+
+    quantization_config = getattr(AutoQuantizationConfig, NLI_ONNX_QUANT_ARCH)(is_static=False, per_channel=False)
+    ORTQuantizer.from_pretrained(fp32_dir).quantize(save_dir=output_dir, quantization_config=quantization_config)
+    return output_dir
+
+
+def load_onnx_classifier():
+    _require_optimum()
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from optimum.pipelines import pipeline
+    from transformers import AutoTokenizer
+
+    model_dir = export_onnx_int8()
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=QUANTIZED_FILE)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer, accelerator="ort")
+
+
+BACKENDS = {
+    "pytorch": load_pytorch_classifier,
+    "onnx": load_onnx_classifier,
+}
+
+
+def load_classifier(backend=None):
+    backend = (backend or NLI_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown NLI_BACKEND '{backend}', expected one of {sorted(BACKENDS)}")
+    print(f"Loading zero-shot classifier with the {backend} backend")
+    return BACKENDS[backend]()
@@ -1,341 +1,134 @@
-from transformers import pipeline
+import os
 import re
+import threading
 import dateparser
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 import pytz
 
-date_rewrite_pipeline = pipeline(
-    "text2text-generation",
-    model="google/flan-t5-base",
-    framework="pt"  # <- This forces PyTorch and skips all tf_keras errors
-)
+from model_registry import registry
+from datetime_grammar import resolve_date_rule, scan_datetime
+from text_normalizer import normalize_text  # re-exported: callers import it from here
+from ttl_cache import TTLCache
 
-def normalize_text(text: str) -> str:
+LOCAL_TIMEZONE = "America/Indiana/Indianapolis"
+
+# The FLAN-T5 fallback runs on its own executor so slow generations don't hold
+# up /chat workers: callers wait at most DATE_REWRITE_TIMEOUT_MS, and a result
+# that arrives later is still cached for the next time the phrase comes in.
+# While every worker is busy with other phrases, a new phrase isn't queued: the
+# caller goes straight to the rule-based default instead of waiting out the deadline.
+DATE_REWRITE_MODEL = os.getenv("DATE_REWRITE_MODEL", "google/flan-t5-base")
+DATE_REWRITE_TIMEOUT_MS = float(os.getenv("DATE_REWRITE_TIMEOUT_MS", "1500"))
+DATE_REWRITE_WORKERS = int(os.getenv("DATE_REWRITE_WORKERS", "1"))
+# "START=2023-06-07T15:00 END=2023-06-07T16:00" is about 30 T5 tokens
+DATE_REWRITE_MAX_NEW_TOKENS = int(os.getenv("DATE_REWRITE_MAX_NEW_TOKENS", "40"))
+DATE_REWRITE_CACHE_SIZE = int(os.getenv("DATE_REWRITE_CACHE_SIZE", "1024"))
+DATE_REWRITE_CACHE_TTL = float(os.getenv("DATE_REWRITE_CACHE_TTL", "21600"))
+
+DATETIME_SHAPE = re.compile(r"START=(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})\s+END=(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})")
+
+# Keyed on (normalized phrase, reference date, timezone); failed rewrites are cached too
+date_rewrite_cache = TTLCache(maxsize=DATE_REWRITE_CACHE_SIZE, ttl=DATE_REWRITE_CACHE_TTL)
+_date_rewrite_executor = ThreadPoolExecutor(max_workers=DATE_REWRITE_WORKERS, thread_name_prefix="date-rewrite")
+_date_rewrites_in_flight = {}
+_date_rewrites_lock = threading.Lock()
+
+class _DateRewriter:
     """
-    General purpose text normalizer that corrects common typos,
-    standardizes formats, and prepares text for further processing.
-    Works for all intents, not just date/time.
+    FLAN-T5 generation that stops as soon as every output in the batch holds a
+    complete START=... END=... pair, instead of running to a fixed max_length.
+    Called like the text2text pipeline it replaces: returns [{"generated_text": ...}]
+    with one entry per prompt.
     """
-    if not text:
-        return ""
-        
-    # Convert to lowercase
-    normalized = text.lower()
-    
-    # Fix common typos for all intents
-    typo_corrections = {
-        # General typos
-        r'\bnex\b': 'next',
-        r'\bwoth\b': 'with',
-        r'\bfro\b': 'for',
-        r'\bwiht\b': 'with',
-        r'\bfomr\b': 'from',
-        r'\bteh\b': 'the',
-        r'\babuot\b': 'about',
-        r'\bqucik\b': 'quick',
-        r'\bscheduel\b': 'schedule',
-        r'\bshcedule\b': 'schedule',
-        r'\bmeeting\b': 'meeting',
-        r'\bmeetinf\b': 'meeting',
-        r'\bmeetin\b': 'meeting',
-        r'\bschedul\b': 'schedule',
-        r'\bschdul\b': 'schedule',
-        r'\bemial\b': 'email',
-        r'\bemail\b': 'email',
-        r'\bemil\b': 'email',
-        r'\bsned\b': 'send',
-        r'\bsed\b': 'send',
-        r'\bsendd\b': 'send',
-        r'\bsalck\b': 'slack',
-        r'\bslak\b': 'slack',
-        r'\bslck\b': 'slack',
-        r'\bmesage\b': 'message',
-        r'\bmessg\b': 'message',
-        r'\bmsg\b': 'message',
-        r'\bretreive\b': 'retrieve',
-        r'\bretreve\b': 'retrieve',
-        r'\bretriev\b': 'retrieve',
-        r'\breatrieve\b': 'retrieve',
-        r'\bretrve\b': 'retrieve',
-        r'\bconacts\b': 'contacts',
-        r'\bcontcts\b': 'contacts',
-        r'\bcontact\b': 'contacts',
-        r'\btonigt\b': 'tonight',
-        r'\btomoro\b': 'tomorrow',
-        r'\btomorow\b': 'tomorrow',
-        r'\btmrw\b': 'tomorrow',
-        r'\btmr\b': 'tomorrow',
-        r'\btoday\b': 'today',
-        r'\btdy\b': 'today',
-        r'\byesterdy\b': 'yesterday',
-        r'\byestday\b': 'yesterday',
-        r'\byest\b': 'yesterday',
-        r'\bmonday\b': 'monday',
-        r'\bmon\b': 'monday',
-        r'\btuesday\b': 'tuesday',
-        r'\btue\b': 'tuesday',
-        r'\btues\b': 'tuesday',
-        r'\bwednesday\b': 'wednesday',
-        r'\bwed\b': 'wednesday',
-        r'\bthursday\b': 'thursday',
-        r'\bthu\b': 'thursday',
-        r'\bthur\b': 'thursday',
-        r'\bthurs\b': 'thursday',
-        r'\bfriday\b': 'friday',
-        r'\bfri\b': 'friday',
-        r'\bsaturday\b': 'saturday',
-        r'\bsat\b': 'saturday',
-        r'\bsunday\b': 'sunday',
-        r'\bsun\b': 'sunday',
-    }
-    
-    # Apply all typo corrections
-    for pattern, replacement in typo_corrections.items():
-        normalized = re.sub(pattern, replacement, normalized)
-    
-    # Standardize time formats
-    normalized = re.sub(r'(\d{1,2})pm', r'\1 pm', normalized)
-    normalized = re.sub(r'(\d{1,2})am', r'\1 am', normalized)
-    normalized = re.sub(r'(\d{1,2}):(\d{2})pm', r'\1:\2 pm', normalized)
-    normalized = re.sub(r'(\d{1,2}):(\d{2})am', r'\1:\2 am', normalized)
-    
-    # Standardize date phrases
-    normalized = re.sub(r'next\s+weeks?', 'next week', normalized)
-    normalized = re.sub(r'(\d+)\s*h(\s|$)', r'\1 hour\2', normalized)
-    normalized = re.sub(r'(\d+)\s*hr(\s|$)', r'\1 hour\2', normalized)
-    normalized = re.sub(r'(\d+)\s*hrs(\s|$)', r'\1 hours\2', normalized)
-    normalized = re.sub(r'(\d+)\s*min(\s|$)', r'\1 minute\2', normalized)
-    normalized = re.sub(r'(\d+)\s*m(\s|$)', r'\1 minute\2', normalized)
-    normalized = re.sub(r'(\d+)\s*mins(\s|$)', r'\1 minutes\2', normalized)
-    
-    # Standardize email related phrases
-    normalized = re.sub(r'send\s+mail', 'send email', normalized)
-    normalized = re.sub(r'send\s+a\s+mail', 'send email', normalized)
-    normalized = re.sub(r'send\s+a\s+email', 'send email', normalized)
-    normalized = re.sub(r'send\s+out\s+an?\s+email', 'send email', normalized)
-    
-    # Standardize slack related phrases
-    normalized = re.sub(r'send\s+a\s+slack', 'send slack', normalized)
-    normalized = re.sub(r'send\s+a\s+slack\s+message', 'send slack', normalized)
-    normalized = re.sub(r'post\s+to\s+slack', 'send slack', normalized)
-    normalized = re.sub(r'post\s+on\s+slack', 'send slack', normalized)
-    normalized = re.sub(r'slack\s+message', 'send slack', normalized)
-    
-    # Prevent duplication of "send" for slack messages
-    normalized = re.sub(r'send\s+send\s+slack', 'send slack', normalized)
-    normalized = re.sub(r'send\s+msg', 'send message', normalized)
-    normalized = re.sub(r'send\s+a\s+msg', 'send message', normalized)
-    
-    # Standardize slack message recognition with additional patterns
-    normalized = re.sub(r'slack\s+msg', 'send slack', normalized)
-    normalized = re.sub(r'message\s+on\s+slack', 'send slack', normalized)
-    normalized = re.sub(r'message\s+in\s+slack', 'send slack', normalized)
-    
-    # Standardize retrieval phrases
-    normalized = re.sub(r'get\s+emails?', 'retrieve email', normalized)
-    normalized = re.sub(r'check\s+emails?', 'retrieve email', normalized)
-    normalized = re.sub(r'show\s+me\s+emails?', 'retrieve email', normalized)
-    normalized = re.sub(r'get\s+slack\s+messages?', 'retrieve slack', normalized)
-    normalized = re.sub(r'check\s+slack', 'retrieve slack', normalized)
-    normalized = re.sub(r'show\s+me\s+slack\s+messages?', 'retrieve slack', normalized)
-    normalized = re.sub(r'get\s+contacts?', 'retrieve crm', normalized)
-    normalized = re.sub(r'show\s+me\s+contacts?', 'retrieve crm', normalized)
-    normalized = re.sub(r'get\s+hubspot\s+contacts?', 'retrieve crm', normalized)
-    normalized = re.sub(r'show\s+hubspot\s+contacts?', 'retrieve crm', normalized)
-    
-    return normalized.strip()
+
+    def __init__(self, model_name=DATE_REWRITE_MODEL):
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
+
+        self._torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+        tokenizer = self.tokenizer
+
+        class _ShapeComplete(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                texts = tokenizer.batch_decode(input_ids, skip_special_tokens=True)
+                return torch.tensor([bool(DATETIME_SHAPE.search(text)) for text in texts], device=input_ids.device)
+
+        self._stopping_criteria = StoppingCriteriaList([_ShapeComplete()])
+
+    def __call__(self, prompts, max_new_tokens=DATE_REWRITE_MAX_NEW_TOKENS):
+        batch = [prompts] if isinstance(prompts, str) else list(prompts)
+        encoded = self.tokenizer(batch, return_tensors="pt", padding=True, truncation=True)
+        with self._torch.no_grad():
+            output = self.model.generate(
+                **encoded,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+                stopping_criteria=self._stopping_criteria,
+            )
+        return [{"generated_text": text} for text in self.tokenizer.batch_decode(output, skip_special_tokens=True)]
+
+def _warmup_date_rewrite_pipeline(rewriter):
+    rewriter("Input: tomorrow at 10am\nOutput:", max_new_tokens=20)
+
+# Built in the background after startup (see main.on_startup)
+registry.register("date_rewrite_pipeline", _DateRewriter, _warmup_date_rewrite_pipeline)
 
 def intelligent_date_parse(text):
     """
     Uses dateparser library to intelligently parse dates from natural language.
     Returns a tuple of (start_datetime, end_datetime) or (None, None) if parsing fails.
+    Date, time and duration come from one scan with the compiled grammar in
+    datetime_grammar; dateparser is only tried when no grammar rule resolves.
     """
-    # First, try to extract time expressions
-    
     # Get timezone for consistent datetime handling
-    local_tz = pytz.timezone("America/Indiana/Indianapolis")
+    local_tz = pytz.timezone(LOCAL_TIMEZONE)
     now = datetime.now(local_tz)
-    
-    # Define common regex patterns
-    time_pattern = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?'
-    day_of_week_pattern = r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
-    month_pattern = r'(january|february|march|april|may|june|july|august|september|october|november|december)'
-    day_of_month_pattern = r'(\d{1,2})(?:st|nd|rd|th)?'
-    
-    # Extract duration
-    duration_hours = 1  # Default duration
-    duration_patterns = [
-        r'for\s+(\d+)\s*hours?',
-        r'for\s+(\d+)\s*h',
-        r'(\d+)\s*hours?\s+long',
-        r'(\d+)\s*hour\s+meeting',
-        r'(\d+)\s*h\s+meeting',
-        r'for\s+(\d+)\s*hr',
-        r'for\s+(\d+)\s*hrs',
-    ]
-    
-    for pattern in duration_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            try:
-                duration_hours = int(match.group(1))
-                break
-            except:
-                pass
-    
-    # Pattern list from most specific to most general
-    date_patterns = [
-        # Pattern: "next week Tuesday at 3pm"
-        {
-            'regex': r'next\s+week\s+' + day_of_week_pattern + r'\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_next_week_day_at_time(m, now, local_tz)
-        },
-        # Pattern: "next Monday at 2pm"
-        {
-            'regex': r'next\s+' + day_of_week_pattern + r'\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_next_day_at_time(m, now, local_tz)
-        },
-        # Pattern: "Tuesday next week at 2pm"
-        {
-            'regex': day_of_week_pattern + r'\s+next\s+week\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_day_next_week_at_time(m, now, local_tz)
-        },
-        # Pattern: "tomorrow at 3pm"
-        {
-            'regex': r'tomorrow\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_tomorrow_at_time(m, now, local_tz)
-        },
-        # Pattern: "today at 4pm"
-        {
-            'regex': r'today\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_today_at_time(m, now, local_tz)
-        },
-        # Pattern: "March 15 at 2pm" 
-        {
-            'regex': month_pattern + r'\s+' + day_of_month_pattern + r'\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_month_day_at_time(m, now, local_tz)
-        },
-        # Pattern: "15th March at 2pm"
-        {
-            'regex': day_of_month_pattern + r'\s+(?:of\s+)?' + month_pattern + r'\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_day_month_at_time(m, now, local_tz)
-        },
-        # Pattern: "in 3 days at 2pm"
-        {
-            'regex': r'in\s+(\d+)\s+days?\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_in_days_at_time(m, now, local_tz)
-        },
-        # Pattern: "next month on the 15th at 2pm"
-        {
-            'regex': r'next\s+month\s+(?:on\s+)?(?:the\s+)?' + day_of_month_pattern + r'\s+at\s+' + time_pattern,
-            'handler': lambda m: parse_next_month_day_at_time(m, now, local_tz)
-        },
-        # Fallback pattern
-        {
-            'regex': r'at\s+' + time_pattern,
-            'handler': lambda m: parse_time_only(m, now, local_tz)
-        }
-    ]
-    
-    # Try all patterns
-    for pattern in date_patterns:
-        match = re.search(pattern['regex'], text, re.IGNORECASE)
-        if match:
-            start_dt = pattern['handler'](match)
-            if start_dt:
-                end_dt = start_dt + timedelta(hours=duration_hours)
-                return start_dt, end_dt
-    
-    # Try dateparser as last resort
+
+    start_dt, end_dt, duration_hours = _parse_with_rules(text, now, local_tz)
+    if start_dt:
+        return start_dt, end_dt
+    return _parse_with_dateparser(text, local_tz, duration_hours)
+
+def _parse_with_rules(text, now, local_tz):
+    """
+    Grammar rules only. Returns (start_datetime, end_datetime, duration_hours),
+    with None for start and end if no rule resolved.
+    """
+    slots = scan_datetime(text)
+    duration_hours = slots["duration_hours"] or 1  # Default duration
+
+    # Rules in priority order; a rule naming a date that doesn't exist falls through to the next
+    for rule, values in slots["date"]:
+        start_dt = resolve_date_rule(rule, values, now, local_tz)
+        if start_dt:
+            end_dt = start_dt + timedelta(hours=duration_hours)
+            return start_dt, end_dt, duration_hours
+    return None, None, duration_hours
+
+def _parse_with_dateparser(text, local_tz, duration_hours):
+    # Any "at <time>" would have matched the time_only rule, so only dates
+    # without an explicit time get here.
     try:
-        # Extract time if present
-        time_match = re.search(r'at\s+' + time_pattern, text, re.IGNORECASE)
-        if time_match:
-            hour = int(time_match.group(1))
-            minute = int(time_match.group(2) or 0)
-            am_pm = time_match.group(3)
-            
-            # Adjust hour for PM
-            if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-                hour += 12
-            elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-                hour = 0
-                
-            # Remove time part to help dateparser
-            date_text = re.sub(r'at\s+' + time_pattern, '', text)
-            
-            # Special handling for specific date patterns like "April 2"
-            month_day_match = re.search(
-                r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+(\d{1,2})(?:st|nd|rd|th)?',
-                date_text,
-                re.IGNORECASE
-            )
-            
-            if month_day_match:
-                # We have a specific month and day
-                month_name = month_day_match.group(1).lower()
-                day = int(month_day_match.group(2))
-                
-                month_map = {
-                    'january': 1, 'february': 2, 'march': 3, 'april': 4,
-                    'may': 5, 'june': 6, 'july': 7, 'august': 8,
-                    'september': 9, 'october': 10, 'november': 11, 'december': 12
-                }
-                
-                month = month_map[month_name]
-                year = now.year
-                
-                # If the date is in the past, use next year
-                if (month < now.month) or (month == now.month and day < now.day):
-                    year += 1
-                
-                # Create naive datetime and localize it
-                naive_dt = datetime(year, month, day, hour, minute, 0, 0)
-                start_dt = local_tz.localize(naive_dt)
-                end_dt = start_dt + timedelta(hours=duration_hours)
-                return start_dt, end_dt
-            
-            # Try dateparser on the remaining text
-            date_settings = {'RETURN_AS_TIMEZONE_AWARE': True, 'TIMEZONE': local_tz}
-            parsed_date = dateparser.parse(date_text, settings=date_settings)
-            
-            if parsed_date:
-                # Create a naive datetime based on parsed date but with our exact hour/minute
-                naive_dt = datetime(
-                    parsed_date.year,
-                    parsed_date.month,
-                    parsed_date.day,
-                    hour,
-                    minute,
-                    0,
-                    0
-                )
-                # Properly localize it
-                start_dt = local_tz.localize(naive_dt)
-                end_dt = start_dt + timedelta(hours=duration_hours)
-                return start_dt, end_dt
-        
-        # No explicit time found, try full text
-        date_settings = {'RETURN_AS_TIMEZONE_AWARE': True, 'TIMEZONE': local_tz}
+        # dateparser wants the zone name; a pytz object fails every call
+        date_settings = {'RETURN_AS_TIMEZONE_AWARE': True, 'TIMEZONE': local_tz.zone}
         parsed_date = dateparser.parse(text, settings=date_settings)
         
         if parsed_date:
-            if time_match is None:
-                # Default to 3pm if no time specified, using naive datetime first
-                naive_dt = datetime(
-                    parsed_date.year,
-                    parsed_date.month,
-                    parsed_date.day,
-                    15,  # 3 PM
-                    0,
-                    0,
-                    0
-                )
-                # Properly localize it
-                start_dt = local_tz.localize(naive_dt)
-            else:
-                start_dt = parsed_date
-                
+            # Default to 3pm if no time specified, using naive datetime first
+            naive_dt = datetime(
+                parsed_date.year,
+                parsed_date.month,
+                parsed_date.day,
+                15,  # 3 PM
+                0,
+                0,
+                0
+            )
+            # Properly localize it
+            start_dt = local_tz.localize(naive_dt)
             end_dt = start_dt + timedelta(hours=duration_hours)
             return start_dt, end_dt
     except Exception as e:
@@ -344,338 +137,8 @@ def intelligent_date_parse(text):
     # No date/time could be parsed
     return None, None
 
-# Helper functions for date parsing
-def parse_next_week_day_at_time(match, now, local_tz):
-    weekday_map = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
-    weekday = match.group(1).lower()
-    hour = int(match.group(2))
-    minute = int(match.group(3) or 0)
-    am_pm = match.group(4)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    # Calculate days to next week's day
-    target_weekday = weekday_map[weekday]
-    current_weekday = now.weekday()
-    days_to_add = (target_weekday - current_weekday) % 7
-    
-    # Add 7 more days to get to next week
-    days_to_add += 7
-    
-    target_date = now + timedelta(days=days_to_add)
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        target_date.year, 
-        target_date.month, 
-        target_date.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    return local_tz.localize(naive_dt)
-
-def parse_next_day_at_time(match, now, local_tz):
-    weekday_map = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
-    weekday = match.group(1).lower()
-    hour = int(match.group(2))
-    minute = int(match.group(3) or 0)
-    am_pm = match.group(4)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    # Calculate days to next occurrence of the day
-    target_weekday = weekday_map[weekday]
-    current_weekday = now.weekday()
-    days_to_add = (target_weekday - current_weekday) % 7
-    if days_to_add == 0:
-        days_to_add = 7  # Next week's same day
-    
-    target_date = now + timedelta(days=days_to_add)
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        target_date.year, 
-        target_date.month, 
-        target_date.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    return local_tz.localize(naive_dt)
-
-def parse_day_next_week_at_time(match, now, local_tz):
-    weekday_map = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
-    weekday = match.group(1).lower()
-    hour = int(match.group(2))
-    minute = int(match.group(3) or 0)
-    am_pm = match.group(4)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    # Calculate days to specified day next week
-    target_weekday = weekday_map[weekday]
-    current_weekday = now.weekday()
-    
-    # Days until that day of next week
-    days_to_add = (target_weekday - current_weekday) % 7
-    
-    # Add 7 more days to get to next week
-    days_to_add += 7
-    
-    target_date = now + timedelta(days=days_to_add)
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        target_date.year, 
-        target_date.month, 
-        target_date.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    return local_tz.localize(naive_dt)
-
-def parse_tomorrow_at_time(match, now, local_tz):
-    hour = int(match.group(1))
-    minute = int(match.group(2) or 0)
-    am_pm = match.group(3)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    tomorrow = now + timedelta(days=1)
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        tomorrow.year, 
-        tomorrow.month, 
-        tomorrow.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    return local_tz.localize(naive_dt)
-
-def parse_today_at_time(match, now, local_tz):
-    hour = int(match.group(1))
-    minute = int(match.group(2) or 0)
-    am_pm = match.group(3)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        now.year, 
-        now.month, 
-        now.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    return local_tz.localize(naive_dt)
-
-def parse_month_day_at_time(match, now, local_tz):
-    month_map = {
-        'january': 1, 'february': 2, 'march': 3, 'april': 4,
-        'may': 5, 'june': 6, 'july': 7, 'august': 8,
-        'september': 9, 'october': 10, 'november': 11, 'december': 12
-    }
-    
-    month_name = match.group(1).lower()
-    day = int(match.group(2))
-    hour = int(match.group(3))
-    minute = int(match.group(4) or 0)
-    am_pm = match.group(5)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    month = month_map[month_name]
-    
-    # Determine year
-    year = now.year
-    # If the month & day combo is in the past, use next year
-    if (month < now.month) or (month == now.month and day < now.day):
-        year += 1
-    
-    try:
-        # Create a naive datetime first
-        naive_dt = datetime(year, month, day, hour, minute, 0, 0)
-        # Then localize it to the target timezone
-        return local_tz.localize(naive_dt)
-    except:
-        # Handle invalid dates (e.g., Feb 30)
-        return None
-
-def parse_day_month_at_time(match, now, local_tz):
-    month_map = {
-        'january': 1, 'february': 2, 'march': 3, 'april': 4,
-        'may': 5, 'june': 6, 'july': 7, 'august': 8,
-        'september': 9, 'october': 10, 'november': 11, 'december': 12
-    }
-    
-    day = int(match.group(1))
-    month_name = match.group(2).lower()
-    hour = int(match.group(3))
-    minute = int(match.group(4) or 0)
-    am_pm = match.group(5)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    month = month_map[month_name]
-    
-    # Determine year
-    year = now.year
-    # If the month & day combo is in the past, use next year
-    if (month < now.month) or (month == now.month and day < now.day):
-        year += 1
-    
-    try:
-        # Create a naive datetime first
-        naive_dt = datetime(year, month, day, hour, minute, 0, 0)
-        # Then localize it to the target timezone
-        return local_tz.localize(naive_dt)
-    except:
-        # Handle invalid dates (e.g., Feb 30)
-        return None
-
-def parse_in_days_at_time(match, now, local_tz):
-    days = int(match.group(1))
-    hour = int(match.group(2))
-    minute = int(match.group(3) or 0)
-    am_pm = match.group(4)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    target_date = now + timedelta(days=days)
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        target_date.year, 
-        target_date.month, 
-        target_date.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    return local_tz.localize(naive_dt)
-
-def parse_next_month_day_at_time(match, now, local_tz):
-    day = int(match.group(1))
-    hour = int(match.group(2))
-    minute = int(match.group(3) or 0)
-    am_pm = match.group(4)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    # Calculate next month
-    month = now.month + 1
-    year = now.year
-    
-    if month > 12:
-        month = 1
-        year += 1
-    
-    try:
-        # Create a naive datetime with the specified hour and minute
-        naive_dt = datetime(year, month, day, hour, minute, 0, 0)
-        
-        # Localize the naive datetime to the target timezone
-        return local_tz.localize(naive_dt)
-    except:
-        # Handle invalid dates (e.g., Feb 30)
-        return None
-
-def parse_time_only(match, now, local_tz):
-    hour = int(match.group(1))
-    minute = int(match.group(2) or 0)
-    am_pm = match.group(3)
-    
-    # Adjust hour for PM
-    if am_pm and ('pm' in am_pm.lower() or 'p.m' in am_pm.lower()) and hour < 12:
-        hour += 12
-    elif am_pm and ('am' in am_pm.lower() or 'a.m' in am_pm.lower()) and hour == 12:
-        hour = 0
-    
-    # Create a naive datetime with the specified hour and minute
-    naive_dt = datetime(
-        now.year, 
-        now.month, 
-        now.day, 
-        hour, 
-        minute, 
-        0, 
-        0
-    )
-    
-    # Localize the naive datetime to the target timezone
-    localized_dt = local_tz.localize(naive_dt)
-    
-    # If the time is earlier than current time, assume tomorrow
-    if localized_dt < now:
-        localized_dt = localized_dt + timedelta(days=1)
-    
-    return localized_dt
-
-def ai_clean_datetime(user_text: str) -> str:
-    """
-    Attempts to rewrite ambiguous datetime phrases into a clearer format.
-    Returns a string with START and END datetime in ISO format.
-    """
-    prompt = (
+def _date_rewrite_prompt(user_text, reference_date):
+    return (
         "You are a smart assistant that extracts date and time information from natural language.\n"
         "For the given input, extract the meeting date and time.\n"
         "Format your response as: START=YYYY-MM-DDThh:mm END=YYYY-MM-DDThh:mm\n\n"
@@ -686,51 +149,227 @@ def ai_clean_datetime(user_text: str) -> str:
         "Output: START=2023-05-31T10:00 END=2023-05-31T12:00\n\n"
         "Input: Schedule a meeting next week on Wednesday at 2pm\n"
         "Output: START=2023-06-07T14:00 END=2023-06-07T15:00\n\n"
+        f"Today is {reference_date.strftime('%A')}, {reference_date.isoformat()}.\n"
         f"Input: {user_text}\n"
         "Output:"
     )
 
+def _date_rewrite_key(user_text, reference_date):
+    return (" ".join(user_text.lower().split()), reference_date.isoformat(), LOCAL_TIMEZONE)
+
+def _extract_datetime_shape(generated_text):
+    match = DATETIME_SHAPE.search(generated_text)
+    return match.group(0) if match else ""
+
+def _run_date_rewrite(prompt):
+    date_rewrite_pipeline = registry.get("date_rewrite_pipeline")
+    return _extract_datetime_shape(date_rewrite_pipeline(prompt)[0]["generated_text"])
+
+def _submit_date_rewrite(key, prompt):
+    """
+    Starts (or joins) the generation for `key`; the result is cached when it
+    completes. Returns None when every worker is busy with other phrases.
+    """
+    with _date_rewrites_lock:
+        future = _date_rewrites_in_flight.get(key)
+        if future is not None:
+            return future
+        if len(_date_rewrites_in_flight) >= DATE_REWRITE_WORKERS:
+            return None
+        future = _date_rewrite_executor.submit(_run_date_rewrite, prompt)
+        _date_rewrites_in_flight[key] = future
+
+    def _store(done):
+        with _date_rewrites_lock:
+            _date_rewrites_in_flight.pop(key, None)
+        if done.exception() is None:
+            date_rewrite_cache.set(key, done.result())
+
+    # Outside the lock: a future that already finished runs the callback right here
+    future.add_done_callback(_store)
+    return future
+
+def ai_clean_datetime(user_text: str) -> str:
+    """
+    Attempts to rewrite ambiguous datetime phrases into a clearer format.
+    Returns "START=YYYY-MM-DDThh:mm END=YYYY-MM-DDThh:mm", or "" if the model
+    couldn't produce that, isn't loaded yet, is busy, or missed the deadline.
+    """
+    reference_date = datetime.now(pytz.timezone(LOCAL_TIMEZONE)).date()
+    key = _date_rewrite_key(user_text, reference_date)
+    cached = date_rewrite_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if registry.get("date_rewrite_pipeline") is None:
+        print("Date rewrite model not ready yet, skipping AI date cleaning")
+        return ""
+
+    future = _submit_date_rewrite(key, _date_rewrite_prompt(user_text, reference_date))
+    if future is None:
+        print("Date rewrite model busy with other phrases, skipping AI date cleaning")
+        return ""
     try:
-        response = date_rewrite_pipeline(prompt, max_length=100, do_sample=False)[0]["generated_text"]
-        return response.strip()
+        return future.result(timeout=DATE_REWRITE_TIMEOUT_MS / 1000)
+    except FutureTimeoutError:
+        print(f"AI date cleaning missed its {DATE_REWRITE_TIMEOUT_MS:.0f}ms deadline; caching the result when it finishes")
+        return ""
     except Exception as e:
         print(f"Error in AI date cleaning: {e}")
         return ""
 
-def normalize_datetime_input(user_text: str) -> str:
-    text = user_text.lower()
+# How much each parsing stage is trusted in parse_datetime_batch results
+DATETIME_CONFIDENCE = {"rules": 0.9, "dateparser": 0.6, "model": 0.4}
+DATE_REWRITE_BATCH_SIZE = int(os.getenv("DATE_REWRITE_BATCH_SIZE", "32"))
+
+def _datetime_result(phrase, start_dt, end_dt, source):
+    return {
+        "phrase": phrase,
+        "start": start_dt.isoformat() if start_dt else None,
+        "end": end_dt.isoformat() if end_dt else None,
+        "duration_hours": round((end_dt - start_dt).total_seconds() / 3600, 2) if start_dt else None,
+        "confidence": DATETIME_CONFIDENCE[source] if source else 0.0,
+        "source": source,
+    }
+
+def _rewrite_datetime_batch(unresolved, now, local_tz):
+    """
+    Model fallback for parse_datetime_batch: cached rewrites are reused and the
+    rest go through the date rewrite model in batched generate calls.
+    `unresolved` maps phrase -> normalized text. Returns phrase -> result.
+    """
+    reference_date = now.date()
+    rewrites = {}
+    pending = []
+    for phrase, normalized in unresolved.items():
+        key = _date_rewrite_key(normalized, reference_date)
+        cached = date_rewrite_cache.get(key)
+        if cached is not None:
+            rewrites[phrase] = cached
+        else:
+            pending.append((phrase, key, _date_rewrite_prompt(normalized, reference_date)))
+
+    date_rewrite_pipeline = registry.get("date_rewrite_pipeline")
+    if pending and date_rewrite_pipeline is None:
+        print(f"Date rewrite model not ready yet, leaving {len(pending)} phrases unparsed")
+        pending = []
+
+    for i in range(0, len(pending), DATE_REWRITE_BATCH_SIZE):
+        chunk = pending[i:i + DATE_REWRITE_BATCH_SIZE]
+        try:
+            # Same executor as ai_clean_datetime, so /chat and imports don't run the model concurrently
+            outputs = _date_rewrite_executor.submit(date_rewrite_pipeline, [prompt for _, _, prompt in chunk]).result()
+        except Exception as e:
+            print(f"Error in batched AI date cleaning: {e}")
+            continue
+        for (phrase, key, _), output in zip(chunk, outputs):
+            rewrite = _extract_datetime_shape(output["generated_text"])
+            date_rewrite_cache.set(key, rewrite)
+            rewrites[phrase] = rewrite
+
+    results = {}
+    for phrase, rewrite in rewrites.items():
+        match = DATETIME_SHAPE.search(rewrite)
+        if not match:
+            continue
+        start_dt = local_tz.localize(datetime.fromisoformat(match.group(1)))
+        end_dt = local_tz.localize(datetime.fromisoformat(match.group(2)))
+        if end_dt > start_dt:
+            results[phrase] = _datetime_result(phrase, start_dt, end_dt, "model")
+    return results
+
+def parse_datetime_batch(phrases, use_model=True):
+    """
+    Parses many free-text scheduling phrases at once (e.g. a spreadsheet import).
+    Returns one dict per phrase, in input order:
+        {"phrase", "start", "end", "duration_hours", "confidence", "source"}
+    start/end are ISO datetimes, or None when nothing could parse the phrase;
+    source is "rules", "dateparser", "model" or None.
+
+    Duplicate phrases are parsed once and every phrase shares one reference
+    time. Only phrases the grammar rules and dateparser can't resolve reach the
+    date rewrite model, DATE_REWRITE_BATCH_SIZE prompts per generate call.
+    """
+    local_tz = pytz.timezone(LOCAL_TIMEZONE)
+    now = datetime.now(local_tz)
 
+    results = {}
+    unresolved = {}
+    for phrase in dict.fromkeys(phrases):
+        normalized = normalize_datetime_input(phrase)
+        try:
+            start_dt, end_dt, duration_hours = _parse_with_rules(normalized, now, local_tz)
+        except ValueError:
+            # Out-of-range times such as "at 25pm"
+            start_dt, end_dt, duration_hours = None, None, 1
+        source = "rules"
+        if start_dt is None:
+            start_dt, end_dt = _parse_with_dateparser(normalized, local_tz, duration_hours)
+            source = "dateparser"
+        if start_dt is None:
+            unresolved[phrase] = normalized
+        else:
+            results[phrase] = _datetime_result(phrase, start_dt, end_dt, source)
+
+    if unresolved and use_model:
+        results.update(_rewrite_datetime_batch(unresolved, now, local_tz))
+    return [dict(results.get(phrase) or _datetime_result(phrase, None, None, None)) for phrase in phrases]
+
+_WEEKDAY_NAMES = r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+
+# Rewrites applied in order by normalize_datetime_input (later rules see earlier
+# rewrites). As in text_normalizer.PHRASE_RULES, the third item is a literal the
+# rule needs, so rules whose literal is missing are skipped without a regex.
+DATETIME_REWRITES = [
     # Fix common typos
-    text = re.sub(r'\bnex\b', 'next', text)
-    text = re.sub(r'\bmeetinf\b', 'meeting', text)
-    text = re.sub(r'\bmeetin\b', 'meeting', text)
-    
+    (r'\bnex\b', 'next', 'nex'),
+    (r'\bmeetinf\b', 'meeting', 'meetinf'),
+    (r'\bmeetin\b', 'meeting', 'meetin'),
+
     # Handle "for next week" or "next week" patterns
-    text = re.sub(r'for next week', 'next week', text)
-    
+    (r'for next week', 'next week', 'for next week'),
+
     # Handle patterns like "next week at X on [weekday]" -> "next [weekday] at X"
-    text = re.sub(r'next week at (\d{1,2}(?::\d{2})?\s*(?:am|pm)?) on (monday|tuesday|wednesday|thursday|friday|saturday|sunday)', 
-                 r'next \2 at \1', text)
-    
+    (r'next week at (\d{1,2}(?::\d{2})?\s*(?:am|pm)?) on ' + _WEEKDAY_NAMES, r'next \2 at \1', 'next week at'),
+
     # Handle patterns like "next week on [weekday] at X" -> "next [weekday] at X"
-    text = re.sub(r'next week on (monday|tuesday|wednesday|thursday|friday|saturday|sunday) at (\d{1,2}(?::\d{2})?\s*(?:am|pm)?)', 
-                 r'next \1 at \2', text)
-    
+    (r'next week on ' + _WEEKDAY_NAMES + r' at (\d{1,2}(?::\d{2})?\s*(?:am|pm)?)', r'next \1 at \2', 'next week on'),
+
     # Handle patterns like "next week on wednesday"
-    text = re.sub(r'next week (on )?(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', r'next \2', text)
-    
-    # Handle "on wednesday next week" → "next wednesday"
-    text = re.sub(r'on (monday|tuesday|wednesday|thursday|friday|saturday|sunday) next week', r'next \1', text)
-    
+    (r'next week (on )?' + _WEEKDAY_NAMES, r'next \2', 'next week'),
+
+    # Handle "on wednesday next week" -> "next wednesday"
+    (r'on ' + _WEEKDAY_NAMES + r' next week', r'next \1', 'next week'),
+
     # Handle patterns without explicit "next" but where we can infer it
-    text = re.sub(r'for (monday|tuesday|wednesday|thursday|friday|saturday|sunday) at', r'for next \1 at', text)
-    
+    (r'for ' + _WEEKDAY_NAMES + r' at', r'for next \1 at', 'for'),
+
     # Standardize time formats
-    text = re.sub(r'(\d{1,2})pm', r'\1 pm', text)
-    text = re.sub(r'(\d{1,2})am', r'\1 am', text)
+    (r'(\d{1,2})pm', r'\1 pm', 'pm'),
+    (r'(\d{1,2})am', r'\1 am', 'am'),
+]
+_COMPILED_DATETIME_REWRITES = [
+    (re.compile(pattern), replacement, literal) for pattern, replacement, literal in DATETIME_REWRITES
+]
 
+def normalize_datetime_input(user_text: str) -> str:
+    text = user_text.lower()
+    for regex, replacement, literal in _COMPILED_DATETIME_REWRITES:
+        if literal in text:
+            text = regex.sub(replacement, text)
     return text
 
+# schedule_meeting modifiers; slot_extractor builds its one-pass scan from these
+MEETING_PRIORITY_PATTERN = r'(?:high|important|urgent|critical|priority|essential)'
+MEETING_TYPE_PATTERNS = {
+    'call': r'(?:call|phone|conference|audio)',
+    'video': r'(?:video|zoom|teams|webex|google meet)',
+    'in_person': r'(?:in[- ]person|face[- ]to[- ]face|onsite|on[- ]site|in the office)',
+    'interview': r'(?:interview|screening|candidate)',
+    '1on1': r'(?:1[ -]on[ -]1|one[ -]on[ -]one|individual|personal)'
+}
+MEETING_ATTENDEES_PATTERN = r'with\s+([A-Za-z\s,]+)(?:and|,)?'
+
 def extract_intent_modifiers(text, intent):
     """
     Extract modifiers specific to different intents from complex sentences.
@@ -742,26 +381,18 @@ def extract_intent_modifiers(text, intent):
     
     if intent == "schedule_meeting":
         # Extract meeting importance/priority
-        priority_match = re.search(r'(?:high|important|urgent|critical|priority|essential)', text, re.IGNORECASE)
+        priority_match = re.search(MEETING_PRIORITY_PATTERN, text, re.IGNORECASE)
         if priority_match:
             modifiers['priority'] = 'high'
             
         # Extract meeting type
-        type_matches = {
-            'call': r'(?:call|phone|conference|audio)',
-            'video': r'(?:video|zoom|teams|webex|google meet)',
-            'in_person': r'(?:in[- ]person|face[- ]to[- ]face|onsite|on[- ]site|in the office)',
-            'interview': r'(?:interview|screening|candidate)',
-            '1on1': r'(?:1[ -]on[ -]1|one[ -]on[ -]one|individual|personal)'
-        }
-        
-        for meeting_type, pattern in type_matches.items():
+        for meeting_type, pattern in MEETING_TYPE_PATTERNS.items():
             if re.search(pattern, text, re.IGNORECASE):
                 modifiers['meeting_type'] = meeting_type
                 break
                 
         # Extract attendees
-        attendees_match = re.search(r'with\s+([A-Za-z\s,]+)(?:and|,)?', text, re.IGNORECASE)
+        attendees_match = re.search(MEETING_ATTENDEES_PATTERN, text, re.IGNORECASE)
         if attendees_match:
             attendees = attendees_match.group(1).strip()
             # Clean up the text
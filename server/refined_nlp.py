@@ -1,133 +1,227 @@
-from transformers import pipeline
 import re
 import openai
 import os
 
-zero_shot_classifier = pipeline(
-    "zero-shot-classification", 
-    model="facebook/bart-large-mnli", 
-    framework="pt"  # ← forces PyTorch backend
-)
+from model_registry import registry
+from nli_backends import load_classifier
+from micro_batcher import MicroBatcher
+from embedding_classifier import EmbeddingIntentClassifier
+from ttl_cache import TTLCache
+from intent_patterns import match_intent_pattern
+from intent_cascade import IntentCascade, load_tier_config
+from bulkheads import guarded
+from llm_client import get_async_openai
+
+def _warmup_intent_embedder(embedder):
+    embedder("schedule a meeting tomorrow at 3pm")
+
+def _load_zero_shot_classifier():
+    # Backend (PyTorch fp32 or ONNX Runtime int8) is picked by NLI_BACKEND
+    return load_classifier()
+
+def _warmup_zero_shot_classifier(classifier):
+    classifier("schedule a meeting tomorrow at 3pm", ["schedule_meeting", "general"])
+
+# Built in the background after startup (see main.on_startup).
+# The small embedding model goes first so the fast tier is available early.
+registry.register("intent_embedder", EmbeddingIntentClassifier, _warmup_intent_embedder)
+registry.register("zero_shot_classifier", _load_zero_shot_classifier, _warmup_zero_shot_classifier)
 
 api_key = os.getenv("OPENAI_API_KEY")
 if api_key:
     openai.api_key = api_key
 
+# Concurrent /chat requests reaching the NLI tier are grouped into one padded
+# batch: up to NLI_BATCH_MAX_SIZE messages or NLI_BATCH_MAX_WAIT_MS of waiting.
+# NLI_BATCH_MAX_SIZE=1 turns batching off.
+NLI_BATCH_MAX_SIZE = int(os.getenv("NLI_BATCH_MAX_SIZE", "8"))
+NLI_BATCH_MAX_WAIT_MS = float(os.getenv("NLI_BATCH_MAX_WAIT_MS", "5"))
+
+# Repeated utterances (the Analytics page re-sends the same strings on every
+# refresh) skip the model tiers and the GPT fallback entirely.
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "2048"))
+CLASSIFICATION_CACHE_TTL = float(os.getenv("CLASSIFICATION_CACHE_TTL", "600"))
+# Strip tokens that change on every request (e.g. the frontend's "timestamp=...")
+CLASSIFICATION_CACHE_STRIP_VOLATILE = os.getenv("CLASSIFICATION_CACHE_STRIP_VOLATILE", "true").lower() == "true"
+VOLATILE_TOKEN_PATTERN = re.compile(r'\btimestamp=\S*', re.IGNORECASE)
+
+classification_cache = TTLCache(maxsize=CLASSIFICATION_CACHE_SIZE, ttl=CLASSIFICATION_CACHE_TTL)
+
+CANDIDATE_LABELS = [
+    "schedule_meeting",
+    "create_crm",
+    "update_crm",
+    "send_email",
+    "retrieve_email",
+    "retrieve_slack",
+    "send_slack", 
+    "retrieve_crm",
+    "general"
+]
+
+def _classify_nli_batch(texts):
+    """
+    Runs the zero-shot classifier over several messages at once.
+    Every (message, label) pair goes through the model in a single forward batch.
+    """
+    zero_shot_classifier = registry.get("zero_shot_classifier")
+    results = zero_shot_classifier(
+        texts, CANDIDATE_LABELS, batch_size=len(texts) * len(CANDIDATE_LABELS)
+    )
+    return [results] if isinstance(results, dict) else results
+
+nli_batcher = MicroBatcher(
+    _classify_nli_batch,
+    max_batch_size=NLI_BATCH_MAX_SIZE,
+    max_wait_ms=NLI_BATCH_MAX_WAIT_MS,
+    name="nli-batcher",
+)
+
+
+def _regex_tier(user_text):
+    pattern_match = match_intent_pattern(user_text)
+    if pattern_match:
+        return pattern_match[0], 1.0
+    # No pattern matched: nothing to accept or reject
+    return None
+
+def _embedding_tier(user_text):
+    intent_embedder = registry.get("intent_embedder")
+    if intent_embedder is None:
+        return None
+    result = intent_embedder(user_text)
+    # Confidence is the margin over the runner-up, not the raw cosine similarity
+    return result["labels"][0], result["scores"][0] - result["scores"][1]
+
+def _nli_tier(user_text):
+    if not registry.is_ready("zero_shot_classifier"):
+        print("Zero-shot classifier not ready yet, skipping BART tier")
+        return None
+    result = nli_batcher.submit(user_text)
+    return result["labels"][0].lower(), result["scores"][0]
+
+_gpt_client = None
+
+def _get_gpt_client():
+    # No client retries: a retried call would outlive the tier's deadline and
+    # keep one of the cascade's few workers busy
+    global _gpt_client
+    if _gpt_client is None:
+        _gpt_client = openai.OpenAI(api_key=api_key, max_retries=0)
+    return _gpt_client
+
+GPT_TIER_SYSTEM_PROMPT = (
+    "You are a classifier. Classify the user's message into "
+    "one of these intents: schedule_meeting, send_email, retrieve_email, "
+    "send_slack, retrieve_slack, retrieve_crm or general. "
+    "Output ONLY the intent name, nothing else."
+)
+
+def _gpt_tier_request(user_text):
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": GPT_TIER_SYSTEM_PROMPT},
+            {"role": "user", "content": user_text}
+        ],
+        max_tokens=10,
+        temperature=0.0,
+        # The cascade stops waiting at the deadline; this stops the request itself
+        timeout=intent_cascade.config["gpt"]["budget_ms"] / 1000,
+    )
+
+def _gpt_tier_result(gpt_resp):
+    gpt_intent = gpt_resp.choices[0].message.content.strip().lower()
+    return gpt_intent, 1.0 if gpt_intent in CANDIDATE_LABELS else 0.0
+
+@guarded("openai")
+def _gpt_tier(user_text):
+    if not api_key:
+        return None
+    return _gpt_tier_result(_get_gpt_client().chat.completions.create(**_gpt_tier_request(user_text)))
+
+@guarded("openai")
+async def _async_gpt_tier(user_text):
+    """The GPT tier for classify_async: awaited on the event loop, cancelled at the deadline."""
+    if not api_key:
+        return None
+    client = get_async_openai().with_options(max_retries=0)
+    return _gpt_tier_result(await client.chat.completions.create(**_gpt_tier_request(user_text)))
+
+# Tier settings (see IntentCascade). Override any of them with a JSON object in
+# INTENT_CASCADE_CONFIG, e.g. '{"gpt": {"budget_ms": 1500}, "nli": {"threshold": 0.6}}'.
+# EMBEDDING_MIN_MARGIN is kept as a shortcut for the embedding threshold.
+INTENT_CASCADE_TIERS = {
+    "regex": {"threshold": 1.0, "budget_ms": 1, "cost": 0},
+    "embedding": {
+        "threshold": float(os.getenv("EMBEDDING_MIN_MARGIN", "0.08")),
+        "budget_ms": 25,
+        "cost": 1,
+    },
+    "nli": {"threshold": 0.5, "budget_ms": 300, "cost": 10, "fallback_threshold": 0.3},
+    # OpenAI round trips sometimes take several seconds; past the deadline the
+    # best local answer (or "general") is returned instead
+    "gpt": {"threshold": 1.0, "budget_ms": 2500, "cost": 100, "async": True, "backend": "openai"},
+}
+# Optional cap on the summed cost of the tiers tried per message,
+# e.g. INTENT_CASCADE_MAX_COST=50 keeps classification fully local
+INTENT_CASCADE_MAX_COST = os.getenv("INTENT_CASCADE_MAX_COST")
+
+intent_cascade = IntentCascade(
+    [("regex", _regex_tier), ("embedding", _embedding_tier), ("nli", _nli_tier), ("gpt", _gpt_tier)],
+    load_tier_config(INTENT_CASCADE_TIERS, os.getenv("INTENT_CASCADE_CONFIG")),
+    max_cost=float(INTENT_CASCADE_MAX_COST) if INTENT_CASCADE_MAX_COST else None,
+    async_tiers={"gpt": _async_gpt_tier},
+)
+
+def classification_cache_key(user_text: str) -> str:
+    key = user_text.lower()
+    if CLASSIFICATION_CACHE_STRIP_VOLATILE:
+        key = VOLATILE_TOKEN_PATTERN.sub(' ', key)
+    return ' '.join(key.split())
+
+def _cache_classification(key, intent, decided_by):
+    # Only cache answers a tier accepted; fallbacks (GPT timed out, models still
+    # loading) get another chance on the next request
+    if decided_by in intent_cascade.config:
+        classification_cache.set(key, intent)
+
 def bert_classify(user_text: str):
     """
     Classifies user_text into one of our known intents using zero-shot classification.
     Returns a string like 'schedule_meeting', 'send_email', etc.
     Also uses common pattern detection for reliability.
+    Results are cached by normalized text (see classification_cache).
     """
-    pattern_intents = {
-        'schedule_meeting': [
-            r'schedule\s+(?:a\s+)?(?:new\s+)?(?:meeting|appointment|event|call)',
-            r'set\s+up\s+(?:a\s+)?(?:meeting|appointment|event|call)',
-            r'book\s+(?:a\s+)?(?:meeting|appointment|slot|time)',
-            r'calendar\s+(?:meeting|appointment|event)',
-            r'plan\s+(?:a\s+)?(?:meeting|appointment|event|call)',
-            r'next\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
-        ],
-        'create_crm': [
-            r'create\s+(?:a\s+)?(?:hubspot|crm)\s+(?:contact|record)',
-            r'add\s+(?:a\s+)?(?:hubspot|crm)\s+contact'
-        ],
-        'update_crm': [
-            r'(?:update|change)\s+(?:hubspot|crm)\s+.*?\s+to\s+.*',
-            r'(?:update|change)\s+(?:hubspot|crm)\s+(?:contact|record)\s+(?:with\s+id\s+|id\s*[:#]?)\s*(\d+)',
-            r'(?:update|change)\s+(?:hubspot|crm)\s+(?:contact|record|name|email).*?\s+to\s+.*',
-            r'modify\s+(?:a\s+)?(?:hubspot|crm)\s+contact'
-        ],
+    key = classification_cache_key(user_text)
+    intent = classification_cache.get(key)
+    if intent is not None:
+        return intent
 
-        'send_email': [
-            r'send\s+(?:a\s+)?(?:email|mail|message)',
-            r'write\s+(?:a\s+)?(?:email|mail|message|note)',
-            r'compose\s+(?:a\s+)?(?:email|mail|message)',
-            r'draft\s+(?:a\s+)?(?:email|mail|message)',
-            r'email\s+to\s+',
-            r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}'
-        ],
-        'send_slack': [
-            r'send\s+(?:a\s+)?(?:slack|channel)\s+(?:message|note|update)',
-            r'post\s+(?:a\s+)?(?:message|note|update)\s+(?:to|on|in)\s+(?:slack|channel)',
-            r'slack\s+(?:message|note|update)',
-            r'message\s+(?:to|on|in)\s+(?:#[\w-]+)',
-            r'post\s+(?:to|on|in)\s+(?:#[\w-]+)'
-        ],
-        'retrieve_slack': [
-            r'get\s+(?:slack|channel)\s+(?:messages?|history|conversation)',
-            r'check\s+(?:slack|channel)\s+(?:messages?|history|conversation)',
-            r'show\s+(?:me\s+)?(?:slack|channel)\s+(?:messages?|history|conversation)',
-            r'retrieve\s+(?:slack|channel)\s+(?:messages?|history|conversation)',
-            r'read\s+(?:slack|channel)\s+(?:messages?|history|conversation)'
-        ],
-        'retrieve_email': [
-            r'get\s+(?:my\s+)?(?:emails?|mails?|inbox)',
-            r'check\s+(?:my\s+)?(?:emails?|mails?|inbox)',
-            r'show\s+(?:me\s+)?(?:my\s+)?(?:emails?|mails?|inbox)',
-            r'read\s+(?:my\s+)?(?:emails?|mails?|inbox)',
-            r'fetch\s+(?:my\s+)?(?:emails?|mails?|inbox)'
-        ],
-        'retrieve_crm': [
-            r'get\s+(?:crm|hubspot|customer|contacts?)',
-            r'show\s+(?:me\s+)?(?:crm|hubspot|customer|contacts?)',
-            r'retrieve\s+(?:crm|hubspot|customer|contacts?)',
-            r'fetch\s+(?:crm|hubspot|customer|contacts?)',
-            r'find\s+(?:crm|hubspot|customer|contacts?)'
-        ]
+    intent, decided_by = intent_cascade.classify(user_text)
+    _cache_classification(key, intent, decided_by)
+    return intent
+
+async def async_bert_classify(user_text: str, run_local):
+    """
+    bert_classify for async endpoints. The local tiers go through
+    run_local(fn, *args) (the NLP pool under the local_model bulkhead in
+    main.py); the GPT tier is awaited on the event loop, so a slow OpenAI
+    holds neither a pool thread nor a local_model slot.
+    """
+    key = classification_cache_key(user_text)
+    intent = classification_cache.get(key)
+    if intent is not None:
+        return intent
+
+    intent, decided_by = await intent_cascade.classify_async(user_text, run_local)
+    _cache_classification(key, intent, decided_by)
+    return intent
+
+def classification_stats():
+    """Per-tier hit rates and latencies plus cache counters, for tuning thresholds."""
+    return {
+        "tiers": intent_cascade.snapshot(),
+        "max_cost": intent_cascade.max_cost,
+        "cache": classification_cache.stats(),
     }
-    
-    user_text_lower = user_text.lower()
-    for intent, patterns in pattern_intents.items():
-        for pattern in patterns:
-            if re.search(pattern, user_text_lower):
-                return intent
-    
-    candidate_labels = [
-        "schedule_meeting",
-        "create_crm",
-        "update_crm",
-        "send_email",
-        "retrieve_email",
-        "retrieve_slack",
-        "send_slack", 
-        "retrieve_crm",
-        "general"
-    ]
-    
-    try:
-        result = zero_shot_classifier(user_text, candidate_labels)
-        top_label = result["labels"][0]
-        top_score = result["scores"][0]
-        if top_score > 0.5:
-            return top_label.lower()
-    except Exception as e:
-        print(f"Error in BERT classification: {e}")
-    
-    try:
-        if api_key:
-            gpt_resp = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a classifier. Classify the user's message into "
-                            "one of these intents: schedule_meeting, send_email, retrieve_email, "
-                            "send_slack, retrieve_slack, retrieve_crm or general. "
-                            "Output ONLY the intent name, nothing else."
-                        )
-                    },
-                    {"role": "user", "content": user_text}
-                ],
-                max_tokens=10,
-                temperature=0.0,
-            )
-            gpt_intent = gpt_resp.choices[0].message.content.strip().lower()
-            valid_intents = set(candidate_labels)
-            if gpt_intent in valid_intents:
-                return gpt_intent
-    except Exception as e:
-        print(f"Error in GPT classification: {e}")
-    
-    return "general"
@@ -2,12 +2,18 @@
 import os
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
 from dotenv import load_dotenv
 
+from bulkheads import guarded
+from tracing import mark_error, traced
+
 load_dotenv()  # If you haven't already in main
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 
+@traced("slack.send", backend="slack")
+@guarded("slack")
 def send_slack_message(channel: str, text: str) -> bool:
     """
     Sends a Slack message to the specified channel using your bot token.
@@ -20,8 +26,11 @@ def send_slack_message(channel: str, text: str) -> bool:
         return True
     except SlackApiError as e:
         print(f"Slack API Error: {e.response['error']}")
+        mark_error()
         return False
 
+@traced("slack.history", backend="slack")
+@guarded("slack")
 def get_latest_slack_messages(channel: str, limit: int = 5):
     """
     Retrieves the latest 'limit' messages from the given Slack channel.
@@ -32,4 +41,39 @@ def get_latest_slack_messages(channel: str, limit: int = 5):
         return response["messages"]
     except SlackApiError as e:
         print(f"Slack API Error: {e.response['error']}")
+        mark_error()
+        return []
+
+
+# Async variants for the async /chat pipeline (AsyncWebClient runs on aiohttp)
+_async_client = None
+
+def _get_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncWebClient(token=SLACK_BOT_TOKEN)
+    return _async_client
+
+@traced("slack.send", backend="slack")
+@guarded("slack")
+async def async_send_slack_message(channel: str, text: str) -> bool:
+    """Async version of send_slack_message."""
+    try:
+        await _get_async_client().chat_postMessage(channel=channel, text=text)
+        return True
+    except SlackApiError as e:
+        print(f"Slack API Error: {e.response['error']}")
+        mark_error()
+        return False
+
+@traced("slack.history", backend="slack")
+@guarded("slack")
+async def async_get_latest_slack_messages(channel: str, limit: int = 5):
+    """Async version of get_latest_slack_messages."""
+    try:
+        response = await _get_async_client().conversations_history(channel=channel, limit=limit)
+        return response["messages"]
+    except SlackApiError as e:
+        print(f"Slack API Error: {e.response['error']}")
+        mark_error()
         return []
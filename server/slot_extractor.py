@@ -0,0 +1,190 @@
+# server/slot_extractor.py
+"""
+One-pass slot filling for schedule_meeting requests.
+
+extract_meeting_frame() turns a request into a MeetingFrame (start/end,
+duration, attendees, meeting_type, priority, description) with every regex
+compiled once at import:
+  - priority and meeting type come from a single scan of the original text
+    that records every keyword family it passes, instead of one search per
+    family;
+  - attendees and description use precompiled patterns on the original text;
+  - start, end and duration come from the normalized text through the
+    datetime grammar (intelligent_date_parse), then the date rewrite model,
+    then parse_event_time's "next <weekday> at <time>" guess;
+  - recurrence ("every weekday ... for the next month") becomes an RRULE,
+    moving the start to the first day the rule allows.
+The slots are the same ones extract_intent_modifiers, intelligent_date_parse,
+ai_clean_datetime, parse_event_time and extract_meeting_description used to
+produce separately for chat_endpoint.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytz
+
+from datetime_grammar import recurrence_rule, scan_event_slots
+from nlp_datetime_cleaner import (
+    DATETIME_SHAPE,
+    LOCAL_TIMEZONE,
+    MEETING_ATTENDEES_PATTERN,
+    MEETING_PRIORITY_PATTERN,
+    MEETING_TYPE_PATTERNS,
+    ai_clean_datetime,
+    intelligent_date_parse,
+    normalize_datetime_input,
+    normalize_text,
+)
+from tracing import span
+
+# Group names must be identifiers ('1on1' isn't), so types are numbered.
+# Every alternative sits inside a lookahead, so the scan tests each position
+# without consuming text and overlapping keywords are all seen. The keywords
+# are lowercase and the text is lowercased once: case-insensitive matching
+# across this many branches costs more than the separate searches did.
+_MEETING_TYPES = list(MEETING_TYPE_PATTERNS)
+_KEYWORD_SCAN = re.compile(
+    r'(?=(?P<priority>' + MEETING_PRIORITY_PATTERN + ')|'
+    + '|'.join(f'(?P<type{i}>{pattern})' for i, pattern in enumerate(MEETING_TYPE_PATTERNS.values()))
+    + ')'
+)
+_ATTENDEES = re.compile(MEETING_ATTENDEES_PATTERN, re.IGNORECASE)
+_ATTENDEE_SEPARATORS = re.compile(r'(?:and|,)+')
+_DESCRIPTION_ABOUT = re.compile(r'(?:about|regarding|concerning|for|on)\s+([^.,!?]+)', re.IGNORECASE)
+_DESCRIPTION_WITH = re.compile(r'(?:with|to discuss|to talk about)\s+([^.,!?]+)', re.IGNORECASE)
+
+
+@dataclass
+class MeetingFrame:
+    start: datetime
+    end: datetime
+    # "parser" (grammar rules or dateparser), "model" (date rewrite model) or
+    # "default" (parse_event_time's guess)
+    date_source: str
+    attendees: Optional[str] = None
+    meeting_type: Optional[str] = None
+    priority: Optional[str] = None
+    description: Optional[str] = None
+    # RRULE string for recurring meetings
+    recurrence: Optional[str] = None
+
+    @property
+    def date(self):
+        return self.start.date()
+
+    @property
+    def time(self):
+        return self.start.time()
+
+    @property
+    def duration_hours(self):
+        return (self.end - self.start).total_seconds() / 3600
+
+    def modifiers(self):
+        """The modifiers dict schedule_google_event takes (only slots that were found)."""
+        slots = {"priority": self.priority, "meeting_type": self.meeting_type, "attendees": self.attendees}
+        return {name: value for name, value in slots.items() if value is not None}
+
+
+def extract_meeting_frame(original_text, user_text=None):
+    """
+    Fills a MeetingFrame from a schedule_meeting request. `user_text` is the
+    normalize_text() form of `original_text` (computed if not given): keyword
+    slots are read from the original wording, dates from the normalized one.
+    """
+    if user_text is None:
+        user_text = normalize_text(original_text)
+
+    hits = {match.lastgroup for match in _KEYWORD_SCAN.finditer(original_text.lower())}
+    meeting_type = next(
+        (meeting_type for i, meeting_type in enumerate(_MEETING_TYPES) if f"type{i}" in hits), None
+    )
+
+    attendees = None
+    attendees_match = _ATTENDEES.search(original_text)
+    if attendees_match:
+        attendees = _ATTENDEE_SEPARATORS.sub(',', attendees_match.group(1).strip())
+
+    normalized_text = normalize_datetime_input(user_text)
+    start, end, date_source = _extract_when(normalized_text)
+    recurrence = recurrence_rule(normalized_text, start, pytz.timezone(LOCAL_TIMEZONE))
+    if recurrence:
+        recurrence, first_start = recurrence
+        start, end = first_start, first_start + (end - start)
+    return MeetingFrame(
+        start=start,
+        end=end,
+        date_source=date_source,
+        attendees=attendees,
+        meeting_type=meeting_type,
+        priority="high" if "priority" in hits else None,
+        description=extract_meeting_description(original_text),
+        recurrence=recurrence,
+    )
+
+
+def _extract_when(normalized_text):
+    with span("datetime.parse"):
+        start, end = intelligent_date_parse(normalized_text)
+    if start and end:
+        return start, end, "parser"
+
+    with span("datetime.model", backend="local_model"):
+        model_output = ai_clean_datetime(normalized_text)
+    match = DATETIME_SHAPE.search(model_output)
+    if match:
+        return datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2)), "model"
+
+    start, end = parse_event_time(normalized_text)
+    return datetime.fromisoformat(start), datetime.fromisoformat(end), "default"
+
+
+def extract_meeting_description(text):
+    about_match = _DESCRIPTION_ABOUT.search(text)
+    if about_match:
+        return about_match.group(1).strip()
+    with_match = _DESCRIPTION_WITH.search(text)
+    if with_match:
+        return with_match.group(1).strip()
+    return None
+
+
+def parse_event_time(user_text: str):
+    local_tz = pytz.timezone(LOCAL_TIMEZONE)
+    now_local = datetime.now(local_tz)
+    # Duration, "next <weekday>" and "at <time>" come from one scan (see datetime_grammar)
+    slots = scan_event_slots(user_text.lower())
+    duration_hours = slots["duration_hours"] or 1
+
+    weekday_map = {
+        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+        "friday": 4, "saturday": 5, "sunday": 6
+    }
+    weekday_str = slots["weekday"]
+
+    if weekday_str:
+        target_weekday = weekday_map[weekday_str]
+        current_weekday = now_local.weekday()
+        days_to_add = 7 - current_weekday + target_weekday
+        if days_to_add >= 7:
+            days_to_add = days_to_add % 7
+        days_to_add += 7
+        dt_local = now_local + timedelta(days=days_to_add)
+    else:
+        dt_local = now_local
+
+    if slots["time"]:
+        hour, minute, meridiem = slots["time"]
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        dt_local = dt_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    else:
+        dt_local = dt_local.replace(hour=15, minute=0, second=0, microsecond=0)
+
+    end_dt_local = dt_local + timedelta(hours=duration_hours)
+    return dt_local.isoformat(), end_dt_local.isoformat()
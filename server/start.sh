@@ -1,2 +1,6 @@
 cd server
-uvicorn main:app --host 0.0.0.0 --port 10000
\ No newline at end of file
+if [ -n "$MODEL_SERVER_SOCKET" ]; then
+  # Host the transformers pipelines once and share them across workers
+  python model_server.py &
+fi
+uvicorn main:app --host 0.0.0.0 --port 10000 ${UVICORN_WORKERS:+--workers $UVICORN_WORKERS}
@@ -0,0 +1,153 @@
+# server/text_normalizer.py
+
+import re
+from functools import lru_cache
+
+# Common typos for all intents, applied to whole words only
+TYPO_CORRECTIONS = {
+    # General typos
+    'nex': 'next',
+    'woth': 'with',
+    'fro': 'for',
+    'wiht': 'with',
+    'fomr': 'from',
+    'teh': 'the',
+    'abuot': 'about',
+    'qucik': 'quick',
+    'scheduel': 'schedule',
+    'shcedule': 'schedule',
+    'meetinf': 'meeting',
+    'meetin': 'meeting',
+    'schedul': 'schedule',
+    'schdul': 'schedule',
+    'emial': 'email',
+    'emil': 'email',
+    'sned': 'send',
+    'sed': 'send',
+    'sendd': 'send',
+    'salck': 'slack',
+    'slak': 'slack',
+    'slck': 'slack',
+    'mesage': 'message',
+    'messg': 'message',
+    'msg': 'message',
+    'retreive': 'retrieve',
+    'retreve': 'retrieve',
+    'retriev': 'retrieve',
+    'reatrieve': 'retrieve',
+    'retrve': 'retrieve',
+    'conacts': 'contacts',
+    'contcts': 'contacts',
+    'contact': 'contacts',
+    'tonigt': 'tonight',
+    'tomoro': 'tomorrow',
+    'tomorow': 'tomorrow',
+    'tmrw': 'tomorrow',
+    'tmr': 'tomorrow',
+    'tdy': 'today',
+    'yesterdy': 'yesterday',
+    'yestday': 'yesterday',
+    'yest': 'yesterday',
+    'mon': 'monday',
+    'tue': 'tuesday',
+    'tues': 'tuesday',
+    'wed': 'wednesday',
+    'thu': 'thursday',
+    'thur': 'thursday',
+    'thurs': 'thursday',
+    'fri': 'friday',
+    'sat': 'saturday',
+    'sun': 'sunday',
+}
+
+# Phrase standardizations, applied in order (later rules see earlier rewrites,
+# e.g. "send a slack message" -> "send slack message" -> "send send slack" ->
+# "send slack"). The third item is a literal that must be present for the rule
+# to match at all, which lets most rules be skipped without running a regex.
+PHRASE_RULES = [
+    # Standardize time formats
+    (r'(\d{1,2})pm', r'\1 pm', 'pm'),
+    (r'(\d{1,2})am', r'\1 am', 'am'),
+    (r'(\d{1,2}):(\d{2})pm', r'\1:\2 pm', 'pm'),
+    (r'(\d{1,2}):(\d{2})am', r'\1:\2 am', 'am'),
+
+    # Standardize date phrases
+    (r'next\s+weeks?', 'next week', 'next'),
+    (r'(\d+)\s*h(\s|$)', r'\1 hour\2', 'h'),
+    (r'(\d+)\s*hr(\s|$)', r'\1 hour\2', 'hr'),
+    (r'(\d+)\s*hrs(\s|$)', r'\1 hours\2', 'hrs'),
+    (r'(\d+)\s*min(\s|$)', r'\1 minute\2', 'min'),
+    (r'(\d+)\s*m(\s|$)', r'\1 minute\2', 'm'),
+    (r'(\d+)\s*mins(\s|$)', r'\1 minutes\2', 'mins'),
+
+    # Standardize email related phrases
+    (r'send\s+mail', 'send email', 'send'),
+    (r'send\s+a\s+mail', 'send email', 'send'),
+    (r'send\s+a\s+email', 'send email', 'send'),
+    (r'send\s+out\s+an?\s+email', 'send email', 'send'),
+
+    # Standardize slack related phrases
+    (r'send\s+a\s+slack', 'send slack', 'slack'),
+    (r'send\s+a\s+slack\s+message', 'send slack', 'slack'),
+    (r'post\s+to\s+slack', 'send slack', 'slack'),
+    (r'post\s+on\s+slack', 'send slack', 'slack'),
+    (r'slack\s+message', 'send slack', 'slack'),
+
+    # Prevent duplication of "send" for slack messages
+    (r'send\s+send\s+slack', 'send slack', 'slack'),
+    (r'send\s+msg', 'send message', 'msg'),
+    (r'send\s+a\s+msg', 'send message', 'msg'),
+
+    # Standardize slack message recognition with additional patterns
+    (r'slack\s+msg', 'send slack', 'msg'),
+    (r'message\s+on\s+slack', 'send slack', 'slack'),
+    (r'message\s+in\s+slack', 'send slack', 'slack'),
+
+    # Standardize retrieval phrases
+    (r'get\s+emails?', 'retrieve email', 'get'),
+    (r'check\s+emails?', 'retrieve email', 'check'),
+    (r'show\s+me\s+emails?', 'retrieve email', 'show'),
+    (r'get\s+slack\s+messages?', 'retrieve slack', 'get'),
+    (r'check\s+slack', 'retrieve slack', 'check'),
+    (r'show\s+me\s+slack\s+messages?', 'retrieve slack', 'show'),
+    (r'get\s+contacts?', 'retrieve crm', 'get'),
+    (r'show\s+me\s+contacts?', 'retrieve crm', 'show'),
+    (r'get\s+hubspot\s+contacts?', 'retrieve crm', 'get'),
+    (r'show\s+hubspot\s+contacts?', 'retrieve crm', 'show'),
+]
+
+_TYPO_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(sorted(TYPO_CORRECTIONS, key=len, reverse=True)) + r')\b'
+)
+_COMPILED_PHRASE_RULES = [
+    (re.compile(pattern), replacement, literal) for pattern, replacement, literal in PHRASE_RULES
+]
+
+
+def _fix_typo(match):
+    return TYPO_CORRECTIONS[match.group(0)]
+
+
+@lru_cache(maxsize=4096)
+def normalize_text(text: str) -> str:
+    """
+    General purpose text normalizer that corrects common typos,
+    standardizes formats, and prepares text for further processing.
+    Works for all intents, not just date/time.
+
+    Typos are fixed in a single tokenize-and-lookup pass; phrase rules are
+    precompiled and skipped when their literal isn't in the text. Results are
+    memoized, so the several calls made while handling one /chat request
+    (chat_endpoint, extract_email_and_message, the Slack extractors) only
+    normalize a given text once.
+    """
+    if not text:
+        return ""
+
+    normalized = _TYPO_PATTERN.sub(_fix_typo, text.lower())
+
+    for regex, replacement, literal in _COMPILED_PHRASE_RULES:
+        if literal in normalized:
+            normalized = regex.sub(replacement, normalized)
+
+    return normalized.strip()
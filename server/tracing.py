@@ -0,0 +1,179 @@
+# server/tracing.py
+"""
+Per-request stage tracing, exported two ways:
+  - a Server-Timing response header listing how long each stage of the
+    request took (visible in the browser's network panel), and
+  - Prometheus histograms and error counters on /metrics, labelled by stage,
+    backend and intent, for percentiles under real load.
+
+Code marks a stage with `with span("gmail.list", backend="gmail"):` or the
+@traced(...) decorator (sync and async functions). Integrations that catch
+their own errors and return None/[] call mark_error() so the failure still
+counts. TracingMiddleware starts a trace per HTTP request; chat_endpoint
+labels it with set_intent() once the message is classified. Spans also
+work outside a request (only the Prometheus side is recorded then), and
+inside executors.run_blocking, which carries the trace to the worker thread.
+"""
+
+import contextvars
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Stages range from sub-millisecond regex checks to multi-second OpenAI calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_SECONDS = Histogram(
+    "workflowx_request_seconds", "HTTP request latency", ["path", "intent"], buckets=LATENCY_BUCKETS
+)
+REQUEST_ERRORS = Counter(
+    "workflowx_request_errors_total", "HTTP requests that failed with a 5xx", ["path", "intent"]
+)
+STAGE_SECONDS = Histogram(
+    "workflowx_stage_seconds", "Latency of one request stage", ["stage", "backend", "intent"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "workflowx_stage_errors_total", "Stages that raised or reported a failure", ["stage", "backend", "intent"]
+)
+
+NO_INTENT = "none"
+
+
+class RequestTrace:
+    def __init__(self):
+        self.intent = NO_INTENT
+        # (stage, seconds), appended from the event loop and worker threads
+        self.stages = []
+
+
+class _Span:
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+
+_trace = contextvars.ContextVar("request_trace", default=None)
+_span = contextvars.ContextVar("current_span", default=None)
+
+
+def set_intent(intent):
+    trace = _trace.get()
+    if trace is not None:
+        trace.intent = intent
+
+
+def mark_error():
+    """Counts the innermost open span as failed (for errors that are caught and turned into a return value)."""
+    current = _span.get()
+    if current is not None:
+        current.failed = True
+
+
+@contextmanager
+def span(stage, backend="local"):
+    current = _Span()
+    token = _span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception:
+        current.failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        _span.reset(token)
+        trace = _trace.get()
+        intent = trace.intent if trace is not None else NO_INTENT
+        if trace is not None:
+            trace.stages.append((stage, elapsed))
+        STAGE_SECONDS.labels(stage, backend, intent).observe(elapsed)
+        if current.failed:
+            STAGE_ERRORS.labels(stage, backend, intent).inc()
+
+
+def traced(stage, backend="local"):
+    """Decorator form of span() for a whole function call."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage, backend):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, backend):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def server_timing(trace, total_seconds):
+    """Header value: one entry per stage name (repeats summed, with a call count), then the total."""
+    totals = {}
+    counts = {}
+    for stage, seconds in list(trace.stages):
+        totals[stage] = totals.get(stage, 0.0) + seconds
+        counts[stage] = counts.get(stage, 0) + 1
+    entries = []
+    for stage, seconds in totals.items():
+        entry = f"{stage};dur={seconds * 1000:.1f}"
+        if counts[stage] > 1:
+            entry += f';desc="{counts[stage]} calls"'
+        entries.append(entry)
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one RequestTrace per HTTP request. Server-Timing covers
+    the stages finished when the response starts, so for /chat/stream it
+    only shows the time to the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(trace, time.perf_counter() - started).encode("latin-1")))
+                # Lets the frontend (another origin) read the timings too
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _trace.reset(token)
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.labels(path, trace.intent).observe(time.perf_counter() - started)
+            if status >= 500:
+                REQUEST_ERRORS.labels(path, trace.intent).inc()
+
+
+def metrics_response_body():
+    """(body, content type) for the /metrics endpoint."""
+    return generate_latest(), CONTENT_TYPE_LATEST